@@ -0,0 +1,369 @@
+# path: bench/pipeline.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR パイプラインのベンチマーク（段ごと・通し）。
+
+プリセットの ROI に文字を描いた合成ページを作り、
+読込 / 向き補正 / 位置合わせ / 前処理 / 認識 / 正規化 / レイアウト / 列ルール / CSV 書込み を
+1 段ずつ（前段の出力を事前に用意して）と、通し（e2e）で計測する。
+エンジンは何もしないスタブ（stub。固定の文字列を返す null エンジン）と、
+使える環境なら実エンジン（real。constants.OCR_IMPL）の両方で測る。
+"replay:記録ファイル" などエンジン指定（core.ocr.engines.get_engine）をそのまま渡してもよい。
+結果（スループット・遅延のパーセンタイル・メモリ確保のピーク）は JSON で保存でき、
+--compare で以前の結果と比べられる。OCR 結果キャッシュは読み書きしない。
+
+    python -m bench.pipeline [--preset NAME] [--rois 12] [--pages 30] [--engine stub,real]
+                             [--out result.json] [--compare base.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.app.constants import APP_VERSION
+from core.csvio.layout import LayoutPlan
+from core.csvio.writer import write_rows
+from core.image.loader import load_page
+from core.image.register import build_template, estimate_transform
+from core.ocr.buffers import ROIBuffers
+from core.ocr.engines import get_engine, warm_up
+from core.ocr.engines.null import NullEngine
+from core.ocr.pipeline import (
+    _prepare_roi_image,
+    fields_from_texts,
+    orient_page,
+    postprocess_texts,
+    prepare_rois,
+    recognize_rois,
+)
+from core.postprocess import apply_rules_to_row
+from core.presets.models import Preset, ROI
+
+# スタブが返す文字列（正規化・列ルールに仕事をさせるため全角英数と余分な空白を含める）
+STUB_TEXT = "ＦＯＲＭ　１２３  2024-01-02"
+
+_WORDS = ["YAMADA TARO", "03-1234-5678", "2024-04-01", "TOKYO CHIYODA 1-2-3", "1,234,500", "A-0042"]
+
+
+# ---------- 合成ページ ----------
+
+def synthetic_preset(n_rois: int) -> Preset:
+    """
+    A4 300dpi 相当の基準サイズに、4 列の表形式で ROI を並べたプリセット。
+    """
+    w, h = 2480, 3508
+    cols = 4
+    rows = (n_rois + cols - 1) // cols
+    cw = (w - 300) // cols
+    rh = min(160, (h - 400) // max(1, rows))
+
+    rois = []
+    for i in range(n_rois):
+        r, c = divmod(i, cols)
+        rois.append(ROI(150 + c * cw + 10, 200 + r * rh + 10, cw - 20, rh - 20, "auto"))
+
+    layout = "\n".join(
+        "".join(f"{{{i + 1}}}" for i in range(r * cols, min(n_rois, (r + 1) * cols)))
+        for r in range(rows)
+    )
+    return Preset(name="bench", image_w=w, image_h=h, rois=rois, layout_text=layout)
+
+
+def render_form(preset: Preset, seed: int) -> np.ndarray:
+    """
+    preset の各 ROI に枠と文字を描いた BGR ページ。4 つに 1 つは空欄にする。
+    """
+    rng = np.random.default_rng(seed)
+    w = preset.image_w or 2480
+    h = preset.image_h or 3508
+    page = np.full((h, w, 3), 255, np.uint8)
+
+    for i, r in enumerate(preset.rois):
+        cv2.rectangle(page, (r.x - 4, r.y - 4), (r.x + r.w + 3, r.y + r.h + 3), (0, 0, 0), 2)
+        if (i + seed) % 4 == 3:
+            continue
+
+        text = _WORDS[int(rng.integers(len(_WORDS)))]
+        scale = max(0.4, min(r.h / 60.0, r.w / (24.0 * len(text))))
+        y = r.y + int(r.h * 0.7)
+        cv2.putText(page, text, (r.x + 8, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 2)
+
+    # スキャンらしく少しだけ雑音を乗せる
+    noise = rng.integers(0, 6, size=page.shape[:2], dtype=np.uint8)
+    page = cv2.subtract(page, cv2.merge([noise, noise, noise]))
+    return page
+
+
+# ---------- 計測 ----------
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    a = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "mean": round(float(a.mean()), 4),
+        "p50": round(float(np.percentile(a, 50)), 4),
+        "p90": round(float(np.percentile(a, 90)), 4),
+        "p99": round(float(np.percentile(a, 99)), 4),
+        "max": round(float(a.max()), 4),
+    }
+
+
+def _peak_kib(fn: Callable[[Any], Any], inputs: List[Any]) -> float:
+    """
+    1 ページ分の処理中に確保されたメモリのピーク（tracemalloc。Python / NumPy の確保のみ）。
+    """
+    peak_all = 0
+    for x in inputs:
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        out = fn(x)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del out
+        peak_all = max(peak_all, peak - base)
+    return round(peak_all / 1024.0, 1)
+
+
+def measure(
+    fn: Callable[[Any], Any],
+    inputs: List[Any],
+    pages: int,
+    rois: int = 0,
+    mem_pages: int = 2,
+) -> Dict[str, Any]:
+    """
+    inputs を順に使い回して fn を pages 回呼び、ページあたりの遅延と処理量を返す。
+    rois > 0 なら ROI あたりの処理量も出す。
+    """
+    fn(inputs[0])  # 初回の確保・読込みを除く
+
+    samples = []
+    t0 = time.perf_counter()
+    for i in range(pages):
+        x = inputs[i % len(inputs)]
+        t = time.perf_counter()
+        fn(x)
+        samples.append((time.perf_counter() - t) * 1000.0)
+    total = time.perf_counter() - t0
+
+    out = {
+        "pages": pages,
+        "total_s": round(total, 4),
+        "pages_per_s": round(pages / max(1e-9, total), 2),
+        "latency_ms": _percentiles(samples),
+        "peak_kib": _peak_kib(fn, inputs[:max(1, mem_pages)]),
+    }
+    if rois:
+        out["rois_per_s"] = round(pages * rois / max(1e-9, total), 1)
+    return out
+
+
+def run_engine(engine: Any, preset: Preset, variants: List[np.ndarray], args: argparse.Namespace, tmpdir: str) -> Dict[str, Any]:
+    """
+    1 つのエンジンで各段と通しを測る。段の入力は前段の出力を事前に計算して使う。
+    """
+    n = len(preset.rois)
+    pages = args.pages
+    mem = args.mem_pages
+    bufs = ROIBuffers().reserve(preset)
+    csv_path = os.path.join(tmpdir, "bench.csv")
+
+    encoded = [cv2.imencode(".png", p)[1].tobytes() for p in variants]
+    decoded = [load_page(b) for b in encoded]
+
+    def prepare(page: np.ndarray) -> List[Optional[np.ndarray]]:
+        return [_prepare_roi_image(page, r, None, bufs, i) for i, r in enumerate(preset.rois)]
+
+    # 前処理の出力は bufs のビューなので、次段の入力には写しを持っておく
+    prepared = [[None if im is None else im.copy() for im in prepare(p)] for p in decoded]
+    texts = [recognize_rois(engine, imgs, use_cache=False) for imgs in prepared]
+    fields = [fields_from_texts(t) for t in texts]
+    # 位置合わせは合成ページ 1 枚目を基準にする（プリセットのサイドカーは使わない）
+    tmpl = build_template(decoded[0])
+    plan = LayoutPlan(preset.layout_text or "")
+    rows = [plan.materialize(f) for f in fields]
+
+    def write(rs: List[List[str]]) -> int:
+        return write_rows(csv_path, rs, append=True)
+
+    def e2e(data: bytes) -> int:
+        page = load_page(data)
+        imgs = prepare_rois(page, preset, None, engine, bufs)
+        _, rs = postprocess_texts(recognize_rois(engine, imgs, use_cache=False), preset)
+        return write_rows(csv_path, rs, append=True)
+
+    stages: List[Tuple[str, Callable[[Any], Any], List[Any], int]] = [
+        ("load", load_page, encoded, 0),
+        ("orient", lambda p: orient_page(p, preset, engine), decoded, 0),
+        ("register", lambda p: estimate_transform(tmpl, p), decoded, 0),
+        ("preprocess", prepare, decoded, n),
+        ("recognize", lambda imgs: recognize_rois(engine, imgs, use_cache=False), prepared, n),
+        ("normalize", fields_from_texts, texts, n),
+        ("layout", plan.materialize, fields, 0),
+        ("rules", lambda rs: [apply_rules_to_row(r) for r in rs], rows, 0),
+        ("write", write, rows, 0),
+        ("e2e", e2e, encoded, n),
+    ]
+
+    selected = set(args.stages.split(",")) if args.stages else None
+    out: Dict[str, Any] = {}
+    for name, fn, inputs, rois in stages:
+        if selected is not None and name not in selected:
+            continue
+        out[name] = measure(fn, inputs, pages, rois, mem)
+        print(_format_row(name, out[name]), flush=True)
+
+    return out
+
+
+def _format_row(name: str, r: Dict[str, Any]) -> str:
+    lat = r["latency_ms"]
+    rois = f"  {r['rois_per_s']:9.1f} ROI/s" if "rois_per_s" in r else " " * 16
+    return (
+        f"  {name:<10} {r['pages_per_s']:9.2f} page/s{rois}"
+        f"  p50 {lat['p50']:9.3f}  p90 {lat['p90']:9.3f}  p99 {lat['p99']:9.3f} ms"
+        f"  peak {r['peak_kib']:10.1f} KiB"
+    )
+
+
+# ---------- 実行環境 ----------
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def _max_rss_mib() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB、macOS は byte
+    if sys.platform == "darwin":
+        rss /= 1024.0
+    return round(rss / 1024.0, 1)
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "app_version": APP_VERSION,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(base: Dict[str, Any], cur: Dict[str, Any]) -> None:
+    """
+    2 つの結果の p50 とスループットを段ごとに比べて表示する。
+    """
+    print(f"\ncompare: {base.get('env', {}).get('commit', '?')} -> {cur.get('env', {}).get('commit', '?')}")
+    for eng, stages in cur.get("engines", {}).items():
+        old = base.get("engines", {}).get(eng) or {}
+        if "error" in stages or "error" in old:
+            continue
+        print(f" [{eng}]")
+        for name, r in stages.items():
+            o = old.get(name)
+            if not o:
+                continue
+            p_old, p_new = o["latency_ms"]["p50"], r["latency_ms"]["p50"]
+            ratio = p_new / p_old if p_old > 0 else float("nan")
+            print(f"  {name:<10} p50 {p_old:9.3f} -> {p_new:9.3f} ms  ({(ratio - 1.0) * 100.0:+6.1f}%)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="OCR パイプラインのベンチマーク")
+    ap.add_argument("--preset", default="", help="プリセット名（省略時は合成プリセット）")
+    ap.add_argument("--rois", type=int, default=12, help="合成プリセットの ROI 数")
+    ap.add_argument("--pages", type=int, default=30, help="段ごとに処理するページ数")
+    ap.add_argument("--variants", type=int, default=4, help="合成ページの種類（使い回す）")
+    ap.add_argument("--mem-pages", type=int, default=2, help="メモリ計測に使うページ数")
+    ap.add_argument("--engine", default="stub,real", help="stub / real / エンジン指定 をカンマ区切りで")
+    ap.add_argument("--stages", default="", help="測る段をカンマ区切りで（省略時はすべて）")
+    ap.add_argument("--out", default="", help="結果を JSON で保存する")
+    ap.add_argument("--compare", default="", help="以前の結果（JSON）と比べる")
+    args = ap.parse_args(argv)
+
+    if args.preset:
+        from core import presets
+        preset = presets.load(args.preset)
+    else:
+        preset = synthetic_preset(args.rois)
+
+    variants = [render_form(preset, seed) for seed in range(max(1, args.variants))]
+    h, w = variants[0].shape[:2]
+    print(f"preset {preset.name}: {len(preset.rois)} ROIs, page {w}x{h}, {args.pages} pages / stage")
+
+    result: Dict[str, Any] = {
+        "env": environment(),
+        "config": {
+            "preset": preset.name,
+            "rois": len(preset.rois),
+            "page": [w, h],
+            "pages": args.pages,
+            "variants": len(variants),
+        },
+        "engines": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="fx-bench-") as tmpdir:
+        for name in [e.strip() for e in args.engine.split(",") if e.strip()]:
+            if name == "stub":
+                engine = NullEngine(STUB_TEXT)
+            else:
+                try:
+                    engine = get_engine(None if name == "real" else name)
+                    warm_up(engine)
+                except ValueError as e:
+                    print(str(e), file=sys.stderr)
+                    return 2
+                except Exception as e:
+                    print(f"[{name}] 使えません: {e}")
+                    result["engines"][name] = {"error": str(e)}
+                    continue
+
+            print(f"[{name}]")
+            result["engines"][name] = run_engine(engine, preset, variants, args, tmpdir)
+
+    result["max_rss_mib"] = _max_rss_mib()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"saved: {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# path: bench/roi_preprocess.py
+# -*- coding: utf-8 -*-
+
+"""
+ROI 前処理のマイクロベンチマーク（OCR エンジンは使わない）。
+
+従来の段ごとに確保する経路と、作業領域を使い回す経路とで、
+ROI 1 つあたりの処理時間と確保回数・確保量（tracemalloc）を比べる。
+
+空欄判定（枠だけの欄は飛ばし、1 文字だけの欄は残す）も合わせて確かめる。
+
+    python -m bench.roi_preprocess [--rois 12] [--pages 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+import cv2
+import numpy as np
+
+from core.presets.models import Preset, ROI
+from core.ocr.buffers import ROIBuffers
+from core.ocr.pipeline import _prepare_roi_image
+from core.ocr.preprocess import (
+    to_gray,
+    bilateral,
+    binarize,
+    rotate_if_needed,
+    crop_to_roi,
+    analyze_ink,
+    trim_to_bbox,
+    estimate_text_height,
+    roi_scale_factor,
+    resize_by,
+)
+
+
+def make_page(n_rois: int, seed: int = 0):
+    """
+    A4 300dpi 相当の BGRA ページに、文字入りの枠を n_rois 個描いたものとプリセットを作る。
+    """
+    rng = np.random.default_rng(seed)
+    h, w = 3508, 2480
+    page = np.full((h, w, 4), 255, np.uint8)
+
+    rois = []
+    for i in range(n_rois):
+        rw = int(rng.integers(300, 1200))
+        rh = int(rng.integers(60, 160))
+        x = int(rng.integers(0, w - rw))
+        y = int(rng.integers(0, h - rh))
+
+        cv2.rectangle(page, (x, y), (x + rw - 1, y + rh - 1), (0, 0, 0, 255), 2)
+        if i % 4 != 3:
+            cv2.putText(page, f"FORM {i:03d} 2024-{i % 12 + 1:02d}", (x + 12, y + rh * 2 // 3),
+                        cv2.FONT_HERSHEY_SIMPLEX, rh / 90.0, (0, 0, 0, 255), 2)
+
+        rois.append(ROI(x, y, rw, rh, "0"))
+
+    return page, Preset(name="bench", image_w=w, image_h=h, rois=rois, layout_text="")
+
+
+def legacy_prepare(page: np.ndarray, roi: ROI):
+    """
+    作業領域を使い回す前の経路（段ごとに新しい配列を確保し、最後に RGB 変換する）。
+    """
+    patch = crop_to_roi(page, roi.x, roi.y, roi.w, roi.h).copy()
+    patch = rotate_if_needed(patch, roi.orientation)
+    gray = to_gray(patch)
+
+    ink, ratio, bbox = analyze_ink(gray)
+    if bbox is None:
+        return None
+    gray = trim_to_bbox(gray, bbox)
+
+    f = roi_scale_factor(gray.shape, estimate_text_height(gray))
+    if f < 1.0:
+        gray = resize_by(gray, f)
+
+    gray = bilateral(gray)
+    gray = binarize(gray)
+    if f > 1.0:
+        gray = resize_by(gray, f)
+
+    proc = np.stack([gray, gray, gray], axis=2)
+    return cv2.cvtColor(proc, cv2.COLOR_BGR2RGB)
+
+
+def run_legacy(page, preset) -> List:
+    return [legacy_prepare(page, r) for r in preset.rois]
+
+
+def make_fused(preset) -> Callable:
+    bufs = ROIBuffers().reserve(preset)
+
+    def run(page, preset_) -> List:
+        return [_prepare_roi_image(page, r, None, bufs, i) for i, r in enumerate(preset_.rois)]
+
+    return run
+
+
+def measure(name: str, fn: Callable, page, preset, pages: int) -> None:
+    n_rois = len(preset.rois)
+
+    fn(page, preset)  # 初回の確保・キャッシュを除く
+
+    t0 = time.perf_counter()
+    for _ in range(pages):
+        fn(page, preset)
+    dt = time.perf_counter() - t0
+
+    # 1 ページ分の確保量。peak は処理中の最大、retained は結果として新たに残った分
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    out = fn(page, preset)
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del out
+
+    print(
+        f"{name:8s} {dt * 1e6 / (pages * n_rois):10.1f} us/ROI"
+        f"  peak {(peak - base) / 1024:10.1f} KiB/page"
+        f"  retained {(cur - base) / n_rois / 1024:8.1f} KiB/ROI"
+    )
+
+
+def check_same(page, preset) -> bool:
+    fused = make_fused(preset)(page, preset)
+    legacy = run_legacy(page, preset)
+    for a, b in zip(fused, legacy):
+        if (a is None) != (b is None):
+            return False
+        if a is not None and not np.array_equal(a, b):
+            return False
+    return True
+
+
+def _blank_case(w: int, h: int, framed: bool, glyph: bool) -> np.ndarray:
+    """
+    w x h の BGR の欄。framed なら 2px の枠、glyph なら中央に縦棒 1 本（「1」相当）を描く。
+    """
+    img = np.full((h, w, 3), 255, np.uint8)
+    if framed:
+        cv2.rectangle(img, (0, 0), (w - 1, h - 1), (0, 0, 0), 2)
+    if glyph:
+        cx, cy = w // 2, h // 2
+        cv2.line(img, (cx, cy - h // 4), (cx, cy + h // 4), (0, 0, 0), 4)
+    return img
+
+
+def check_blank() -> List[str]:
+    """
+    空欄判定の回帰確認。期待と違ったケース名の一覧を返す（空なら問題なし）。
+    """
+    cases = [
+        # (名前, 画像, 空欄になるべきか)
+        ("empty framed box", _blank_case(600, 120, True, False), True),
+        ("framed short glyph", _blank_case(600, 120, True, True), False),
+        ("unframed short glyph", _blank_case(1181, 161, False, True), False),
+    ]
+
+    failed = []
+    for name, img, want_blank in cases:
+        h, w = img.shape[:2]
+        got = _prepare_roi_image(img, ROI(0, 0, w, h, "0"), None, None, 0)
+        if (got is None) != want_blank:
+            failed.append(name)
+    return failed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="ROI 前処理のマイクロベンチマーク")
+    ap.add_argument("--rois", type=int, default=12)
+    ap.add_argument("--pages", type=int, default=50)
+    args = ap.parse_args()
+
+    page, preset = make_page(args.rois)
+    print(f"page {page.shape[1]}x{page.shape[0]} BGRA, {len(preset.rois)} ROIs, {args.pages} pages")
+
+    measure("legacy", run_legacy, page, preset, args.pages)
+    measure("fused", make_fused(preset), page, preset, args.pages)
+    print("output identical:", check_same(page, preset))
+
+    failed = check_blank()
+    print("blank detection:", "ok" if not failed else "NG " + ", ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
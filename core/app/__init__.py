@@ -7,11 +7,12 @@ App layer public API (slim)
 - DataStore: appdata.json のKVストア
 - bind_with_datastore: ウィンドウ位置/サイズの保存・復元
 - app_data_dir, presets_dir: 各種保存先ディレクトリ
+
+bind_with_datastore は Qt を使うため、参照されたときに読み込む。
 """
 
 from . import constants as C
 from .datastore import DataStore
-from .window_state import bind_with_datastore
 from .app_paths import appdata_dir, presets_dir
 
 __all__ = [
@@ -21,3 +22,11 @@ __all__ = [
     "appdata_dir",
     "presets_dir",
 ]
+
+
+def __getattr__(name):
+    if name == "bind_with_datastore":
+        from .window_state import bind_with_datastore
+        return bind_with_datastore
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -17,24 +17,103 @@ MIGRATE_BUILTIN_PRESETS = True
 # ===== UI 既定 =====
 CSV_APPEND_DEFAULT = True
 ALLOW_DUPLICATE_DROPS = False
+DEDUP_EXACT = "skip"                # 内容が同じページ: "skip"（印を付け一括OCRで飛ばす）| "mark"（印だけ）| "off"
+DEDUP_NEAR = "mark"                 # 見た目がほぼ同じページ（再スキャン等）: 同上
+DEDUP_HASH_SIZE = 16                # 近似判定の dHash の一辺（16 なら 256bit）
+DEDUP_NEAR_BITS = 10                # dHash の距離がこれ以下なら近似重複
 ROI_MIN_W = 5
 ROI_MIN_H = 5
 ZOOM_STEP_RATIO = 1.15
 UNDO_STACK_LIMIT = 200
+LIST_THUMB_SIZE = 64                # ファイルリストのサムネイル（長辺 px）
+PAGE_CACHE_MAX_MB = 512             # プレビュー等で展開したページ画像を保持する上限（LRU）
+INGEST_THREADS = 0                  # D&D 取込みのサムネイル生成スレッド数（0: 自動）
+INGEST_BATCH = 64                   # 取込み結果をリストへ追加する単位（件）
+PREVIEW_SIZES = (480, 960, 1920)    # プレビュー用に事前縮小しておく長辺サイズ(px)
+PREVIEW_CACHE_MAX_MB = 256          # 事前縮小したプレビューを保持する上限（LRU）
+PREVIEW_PREFETCH = 2                # 選択項目の前後何件を先読みするか
+PREVIEW_DEBOUNCE_MS = 80            # リサイズ後、再描画までの待ち(ms)
 
 # ===== ファイル／CSV =====
 CSV_BOM_UTF8 = True
 CSV_NEWLINE = ""
+CSV_FSYNC = "interval"              # 逐次書込みの fsync: "none" | "page"（毎ページ）| "interval"
+CSV_FSYNC_INTERVAL_SEC = 2.0        # "interval" のときの最短間隔（終了時は必ず fsync）
+CSV_WRITER_QUEUE = 64               # 書込みスレッドへ渡す待ち行列の上限（ページ数）
+JOB_JOURNAL_ENABLED = True          # 出力 CSV ごとに処理記録を残し、追記時は処理済みの入力を飛ばす
+
+# ===== フォルダ監視（ホットフォルダ） =====
+WATCH_STABLE_SEC = 2.0              # サイズ・更新時刻がこの秒数変わらなければ書込み完了とみなす
+WATCH_POLL_MS = 1000                # 受信フォルダの走査間隔（変更通知が来れば前倒し）
+WATCH_DONE_DIR = "done"             # 処理済みファイルの移動先（受信フォルダからの相対、絶対パスも可）
+WATCH_FAILED_DIR = "failed"         # 失敗したファイルの移動先
 IMAGE_EXTS = [".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"]
+PDF_EXTS = [".pdf"]                 # PyMuPDF(fitz) がある場合のみ読める
+PDF_RENDER_DPI = 300                # PDF をページ画像に描画するときの解像度
 
 # ===== OCR =====
-OCR_IMPL = "paddle"                 # 将来 "tesseract" 等を想定
+OCR_IMPL = "paddle"                 # 既定のエンジン指定（登録名。"null" / "replay:記録ファイル" なども可）
+OCR_RECORD_BASE = "paddle"          # record エンジンが実際に認識させるエンジン
 PADDLE_LANG = "japan"
 PADDLE_USE_ANGLE_CLS = True
 PREPROCESS_BILATERAL = True
 PREPROCESS_BINARIZE = False
 UPSCALE_FACTOR = 1.0
 
+# ROI の拡大縮小方式
+# "adaptive": ROI ごとに文字高さを推定し TEXT_TARGET_HEIGHT へ拡大/縮小
+# "fixed":    全 ROI を UPSCALE_FACTOR 倍（従来動作）
+UPSCALE_MODE = "adaptive"
+TEXT_TARGET_HEIGHT = 32             # 認識器に渡す文字高さの目標(px)
+ADAPTIVE_SCALE_MIN = 0.25
+ADAPTIVE_SCALE_MAX = 4.0
+ROI_MAX_PIXELS = 600_000            # 1 ROI あたりの画素数上限（拡大後）
+
+# ROI 前処理の作業領域をプリセットの最大 ROI に合わせて確保し、ページ間で使い回す
+# （False なら処理ごとに確保する従来動作）
+PREPROCESS_REUSE_BUFFERS = True
+ROI_BUFFERS_KEEP = 4                # 使い回し用に保持しておく作業領域の組数
+
+# True: ROI は既に文字枠なので検出(det)・角度分類(cls)を省略し、
+#       1ページ分の ROI をまとめて認識器(rec)に渡す（高速）
+# False: ROI ごとに det+cls+rec のフル経路で読む（複数行フィールド向け）
+OCR_REC_ONLY = True
+OCR_REC_BATCH_SIZE = 16             # 認識器 1 回あたりの ROI 数
+
+# ROI の orientation="auto" をページ単位の向き推定として扱う
+# （縮小画像で 1 回だけ推定してページを回転し、ROI ごとの角度分類は行わない）
+PAGE_ORIENT_AUTO = True
+PAGE_ORIENT_MAX_SIDE = 1600         # 推定に使う縮小画像の長辺(px)
+PAGE_ORIENT_SAMPLES = 4             # 上下判定に使う ROI 数
+
+# ===== 様式の位置合わせ =====
+# プリセット保存時に基準画像の特徴点（ORB）を控えておき、ページごとに縮小画像で
+# 拡大縮小・平行移動・回転を推定して ROI を写してから切り出す（DPI 違い・送りずれ対策）
+REGISTER_ENABLED = True
+REGISTER_MAX_SIDE = 1000            # 特徴点を取る縮小画像の長辺(px)
+REGISTER_FEATURES = 1500            # 1 画像あたりの特徴点数の上限
+REGISTER_RATIO = 0.75               # 対応点の比率テスト（小さいほど厳しい）
+REGISTER_MIN_INLIERS = 20           # これ未満の一致しか得られなければ位置合わせしない
+REGISTER_RANSAC_PX = 3.0            # 縮小画像上の許容誤差(px)
+REGISTER_MAX_ROTATION_DEG = 10.0    # これを超える回転・下記を超える倍率は誤推定とみなす
+REGISTER_SCALE_RANGE = (0.5, 2.0)
+
+# ===== インク解析（OCR 前の空欄判定・余白トリム） =====
+INK_SKIP_BLANK = True               # インクの無い ROI は OCR せず "" にする
+INK_TRIM = True                     # ROI をインクの外接矩形まで詰めてから拡大・認識
+INK_THRESHOLD = 128                 # これより暗い画素をインクとみなす（0..255）
+INK_MIN_PIXELS = 8                  # 罫線を除いたインク画素数がこれ未満なら空欄
+INK_RULE_RATIO = 0.8                # 行/列の 8 割以上がインクなら罫線として除外
+INK_RULE_BORDER = 0.15              # 罫線とみなす位置: ROI の端からこの割合の帯の中
+INK_RULE_MIN_ASPECT = 8.0           # 帯の外でも、線の長さが ROI の短い辺のこの倍以上なら罫線
+INK_TRIM_MARGIN = 4                 # トリム時に残す余白(px)
+
+# ===== OCR 結果キャッシュ =====
+# 前処理済み ROI の画素＋設定値をキーに認識結果をディスクへ保存し、
+# 同じ切り出しは実行をまたいでも再認識しない
+OCR_CACHE_ENABLED = True
+OCR_CACHE_MAX_MB = 256              # 超えたら最終利用の古い順に削除
+
 # ===== ポストプロセス制御 =====
 # 全体の強度（参照用ラベル。実際の挙動は個別フラグと列別設定で決まる）
 POSTPROCESS_LEVEL = "safe"          # "none" | "safe" | "aggressive"
@@ -55,4 +134,19 @@ PP_BY_COL = {
 
 # ===== ワーカー／ログ =====
 ALLOW_INTERRUPT = True
+
+# OCR の並列プロセス数
+# 1: 従来どおり 1 スレッドで逐次処理 / 0: CPU コア数から自動 / N: N プロセス
+OCR_WORKERS = 1
+OCR_POOL_INFLIGHT_PER_WORKER = 2    # 1 プロセスあたりの先行投入ページ数
+
+# 逐次モードの段階パイプライン（読込→前処理→認識→後処理→書出し）の
+# 段間キュー長。各段で保持するページ数の上限になる（メモリ上限）
+OCR_STAGE_QUEUE_SIZE = 2
+
+# 段ごとの所要時間（読込・切出し・前処理・認識・正規化・レイアウト・列ルール・書込み）
+TIMING_ENABLED = True               # ページ・ROI ごとに計測する
+TIMING_LOG_SUMMARY = True           # GUI の実行終了時に段ごとの集計をログへ出す
+TIMING_TRACE_PATH = ""              # 空でなければ書き出す（.json: Chrome トレース / それ以外: JSONL）
+PROFILE_PATH = ""                   # 空でなければ OCR 実行を cProfile で計測し pstats を保存（逐次実行になる）
 LOG_VERBOSE = True
@@ -0,0 +1,509 @@
+# path: core/cli.py
+# -*- coding: utf-8 -*-
+
+"""
+ヘッドレス一括抽出（GUI なし。QApplication を作らない）。
+
+    python main.py batch --preset NAME --csv out.csv INPUT...
+    python -m core.cli batch --preset NAME --csv out.csv INPUT...
+    python main.py watch --preset NAME --csv out.csv INBOX
+
+INPUT はファイル、ディレクトリ（中の画像）、glob（"scans/**/*.png" など）。
+1 ページ処理するごとに CSV へ行を追記し、終了時に処理速度と失敗件数を表示する。
+追記（--append）では出力 CSV ごとのジョブ記録を見て、同じプリセットで処理済みの入力を飛ばす
+（中断した一括処理は同じコマンドでそのまま再開できる。--rerun で全件やり直し）。
+内容が同じページ（別名で保存された同じスキャンなど）は、DEDUP_EXACT="skip" なら 2 件目以降を OCR しない。
+--timing で段ごとの所要時間を表示し、--trace FILE でページ・ROI ごとの所要時間を書き出す
+（.json なら Chrome トレース、それ以外は JSONL）。--profile FILE で cProfile の pstats を保存する（逐次実行になる）。
+--engine SPEC で OCR エンジンを選ぶ（既定は constants.OCR_IMPL）。
+"null" は何も認識しない（OCR 以外の計測用）。"record:FILE" は認識結果を FILE へ記録し、
+"replay:FILE" はその記録から結果を返す（モデルなしで同じ入力を再処理できる）。
+watch は受信フォルダを見張り続け、届いたファイルを OCR して CSV へ追記し、done / failed へ移す（Ctrl+C で終了）。
+失敗が 1 件でもあれば終了コード 1、引数・プリセットの誤りは 2、中断は 130。
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import signal
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.app.constants import APP_NAME, CSV_APPEND_DEFAULT, DEDUP_EXACT, JOB_JOURNAL_ENABLED
+from core.image.io_utils import is_image_ext, iter_image_files
+from core.image.loader import load_page
+from core.image.pages import iter_pages
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def iter_inputs(specs: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """
+    入力指定を画像ファイルのパスへ展開する（重複は除く）。
+    - ディレクトリ: 直下の画像（recursive=True なら配下すべて）を名前順
+    - glob: 一致した画像を名前順（"**" 可）
+    - それ以外: そのまま（存在しなければ読込み時に失敗として数える）
+    """
+    seen = set()
+
+    def once(p: str) -> bool:
+        key = os.path.normcase(os.path.abspath(p))
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    for spec in specs:
+        if os.path.isdir(spec):
+            for p in iter_image_files([spec], recursive):
+                if once(p):
+                    yield p
+            continue
+
+        if glob.has_magic(spec):
+            for p in sorted(glob.glob(spec, recursive=True)):
+                if os.path.isfile(p) and is_image_ext(p) and once(p):
+                    yield p
+            continue
+
+        if once(spec):
+            yield spec
+
+
+class BatchWriter:
+    """
+    1 ページ分の結果が届くたびに CSV と OCR 結果（再出力用）へ書き足す（CSVStreamWriter 経由）。
+    overwrite=True なら最初の書込みで置き換え、以降は追記する。
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        overwrite: bool,
+        quiet: bool = False,
+        journal: bool = True,
+        timing: Any = None,
+        engine: Optional[str] = None,
+    ) -> None:
+        from core.csvio.journal import JobJournal
+        from core.csvio.stream_writer import CSVStreamWriter
+
+        self.csv_path = csv_path
+        self.quiet = quiet
+        self.timing = timing
+        self.journal = JobJournal(csv_path, engine=engine) if journal else None
+        self.out = CSVStreamWriter(csv_path, append=not overwrite, journal=self.journal)
+
+        self.pages = 0
+        self.skipped = 0
+        self.stats: Dict[str, Any] = {}
+        self.duplicates: List[Dict[str, str]] = []
+        self.ok = 0
+        self.rows = 0
+        self.failures: List[Dict[str, str]] = []
+
+    def _log(self, msg: str) -> None:
+        if not self.quiet:
+            print(msg, file=sys.stderr, flush=True)
+
+    def is_done(self, task: Any) -> bool:
+        """
+        追記先の CSV へ同じプリセット・エンジンで処理済みの入力か（上書き時は常に False）。
+        """
+        if self.journal is None or not self.out.append:
+            return False
+        return self.journal.is_done(task.content_digest(), task.preset)
+
+    def write(self, task: Any, res: Dict[str, Any]) -> None:
+        from core.csvio.journal import make_entry
+        from core.ocr.timing import pop_spans
+
+        self.pages += 1
+        spans = pop_spans(res.get("stats"))
+        if self.timing is not None:
+            self.timing.add_page(task.display_name or task.src_path, spans)
+        for k, v in (res.get("stats") or {}).items():
+            self.stats[k] = self.stats.get(k, 0) + v
+        name = task.display_name or task.src_path
+
+        rows = res["rows"] if res["ok"] else []
+        if res["ok"]:
+            self.ok += 1
+            self.rows += len(rows)
+            self._log(f"[{self.pages}] OK: {name} -> {len(rows)} 行")
+        else:
+            self.failures.append({"name": name, "error": res["error"]})
+            self._log(f"[{self.pages}] 失敗: {name} / {res['error']}")
+
+        record = {
+            "name": task.display_name,
+            "src_path": task.src_path,
+            "preset": getattr(task.preset, "name", ""),
+            "fields": res.get("fields", []),
+            "ok": bool(res["ok"]),
+        }
+        entry = None
+        if self.journal is not None and task.content_digest():
+            entry = make_entry(task.content_key, task, res["ok"], len(rows), res["error"])
+
+        self.out.write(rows, record, entry)
+
+    def close(self) -> None:
+        """
+        書き残しを書き切る。CSV の書込みに失敗していればその例外を送出する。
+        """
+        try:
+            self.out.close()
+        finally:
+            if self.timing is not None:
+                if self.out.pages:
+                    self.timing.add("write", self.out.write_sec, self.out.pages)
+                self.timing.close()
+        if self.out.store_error is not None:
+            self._log(f"[warn] OCR結果の保存に失敗（再出力は利用できません）: {self.out.store_error}")
+        if self.out.journal_error is not None:
+            self._log(f"[warn] 処理記録の保存に失敗（次回の再開時に再処理されます）: {self.out.journal_error}")
+
+
+def run_batch(
+    preset_name: str,
+    csv_path: str,
+    inputs: List[str],
+    overwrite: bool = False,
+    recursive: bool = False,
+    workers: Optional[int] = None,
+    quiet: bool = False,
+    rerun: bool = False,
+    timing: bool = False,
+    trace: str = "",
+    profile: str = "",
+    engine: Optional[str] = None,
+) -> int:
+    """
+    inputs をプリセットで OCR して csv_path へ書き出す。戻り値は終了コード。
+    rerun=True なら、追記でも処理済みの入力を飛ばさずに全件を処理する（記録は更新する）。
+    timing=True なら段ごとの所要時間を表示し、trace を渡すとページごとの所要時間を書き出す。
+    profile を渡すと cProfile の結果（pstats）を保存する。
+    engine はエンジン指定（"paddle" / "null" / "record:FILE" / "replay:FILE" など）。
+    """
+    from core import presets
+    from core.ocr.task import OCRTask
+    from core.ocr.pool import resolve_workers, run_ordered
+    from core.ocr.stream import run_staged
+    from core.ocr.engines import check_engine, get_engine, is_engine_loaded
+    from core.ocr.timing import TimingLog, format_summary, profiled
+
+    try:
+        preset = presets.load(preset_name)
+    except Exception as e:
+        print(f"プリセットを読み込めません: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        engine = check_engine(engine)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    if not preset.rois:
+        print(f"プリセット「{preset.name}」に ROI がありません", file=sys.stderr)
+        return EXIT_USAGE
+
+    def tasks() -> Iterator[Any]:
+        # 複数ページ文書は 1 ページずつのタスクに展開する（画素は読込み段で 1 ページ分だけ復号）
+        first_by_digest: Dict[str, Any] = {}
+        for p in iter_inputs(inputs, recursive):
+            for ref in iter_pages(p):
+                task = OCRTask(source=ref, preset=preset)
+                if not rerun and out.is_done(task):
+                    out.skipped += 1
+                    continue
+
+                if DEDUP_EXACT == "skip" and task.content_digest():
+                    first = first_by_digest.setdefault(task.content_key, ref)
+                    if first != ref:
+                        out.duplicates.append({"name": ref.key, "of": first.key})
+                        continue
+
+                yield task
+
+    workers = resolve_workers(workers)
+    if profile and workers > 1:
+        print("プロファイル計測中のため逐次処理で実行します", file=sys.stderr)
+        workers = 1
+
+    if workers <= 1:
+        # CSV を開く前に確かめる（記録ファイルが無いなど。並列時は各プロセスで生成する）
+        try:
+            get_engine(engine)
+        except Exception as e:
+            print(f"OCR エンジンを用意できません: {e}", file=sys.stderr)
+            return EXIT_FAILED
+
+    timing_log = TimingLog(trace) if (timing or trace) else None
+    out = BatchWriter(csv_path, overwrite, quiet, journal=JOB_JOURNAL_ENABLED, timing=timing_log, engine=engine)
+
+    def process() -> None:
+        if workers > 1:
+            # プロセスプールは投入順に結果を返すため、パスの一覧だけ先に作る
+            task_list = list(tasks())
+            if task_list:
+                for idx, res in run_ordered(task_list, workers, engine=engine):
+                    out.write(task_list[idx], res)
+        else:
+            get_engine(engine)
+            run_staged(
+                tasks(),
+                load=lambda t: load_page(t.source),
+                on_result=lambda idx, t, res: out.write(t, res),
+                engine=engine,
+            )
+
+    t0 = time.perf_counter()
+    interrupted = False
+    write_error: Optional[BaseException] = None
+
+    try:
+        with profiled(profile):
+            process()
+    except KeyboardInterrupt:
+        interrupted = True
+    except Exception:
+        # CSV の書込み失敗は下で報告する
+        if out.out.error is None:
+            raise
+    finally:
+        # 中断・失敗時も、それまでに終わったページの行は書き切る
+        try:
+            out.close()
+        except Exception as e:
+            write_error = e
+
+    if write_error is not None:
+        print(f"CSV書込み失敗: {write_error}", file=sys.stderr)
+        return EXIT_FAILED
+
+    elapsed = max(1e-9, time.perf_counter() - t0)
+
+    print(
+        f"{APP_NAME}: {out.pages} ページ（成功 {out.ok} / 失敗 {len(out.failures)}）"
+        f" {out.rows} 行 -> {csv_path}"
+        f" / {elapsed:.1f} 秒（{out.pages / elapsed:.2f} ページ/秒）",
+        file=sys.stderr,
+    )
+    reg = out.stats.get("registered", 0)
+    reg_failed = out.stats.get("register_failed", 0)
+    if reg or reg_failed:
+        avg = out.stats.get("register_ms", 0.0) / max(1, reg + reg_failed)
+        print(f"  位置合わせ: {reg} ページ / 失敗 {reg_failed}（平均 {avg:.1f} ms/ページ）", file=sys.stderr)
+    # 記録・再生の件数（逐次実行時。並列時は各プロセスのエンジンが数える）
+    eng = get_engine(engine) if is_engine_loaded(engine) else None
+    if hasattr(eng, "recorded"):
+        print(f"  記録: {eng.recorded} ROI -> {eng.path}", file=sys.stderr)
+    if hasattr(eng, "hits"):
+        print(f"  再生: 一致 {eng.hits} ROI / 記録なし {eng.misses} ROI", file=sys.stderr)
+    if out.skipped:
+        print(f"  処理済みのためスキップ: {out.skipped} ページ", file=sys.stderr)
+    for d in out.duplicates:
+        print(f"  重複のためスキップ: {d['name']}（{d['of']} と同じ内容）", file=sys.stderr)
+    for f in out.failures:
+        print(f"  失敗: {f['name']}: {f['error']}", file=sys.stderr)
+
+    if timing_log is not None:
+        if timing:
+            for line in format_summary(timing_log.summary()):
+                print(line, file=sys.stderr)
+        if timing_log.error is not None:
+            print(f"トレースを書き出せません: {timing_log.error}", file=sys.stderr)
+        elif trace:
+            print(f"トレースを保存: {trace}", file=sys.stderr)
+    if profile:
+        print(f"プロファイルを保存: {profile}", file=sys.stderr)
+
+    if interrupted:
+        print("中断されました", file=sys.stderr)
+        return EXIT_INTERRUPTED
+
+    if out.pages == 0 and not out.skipped and not out.duplicates:
+        print("入力画像がありません", file=sys.stderr)
+        return EXIT_USAGE
+
+    return EXIT_FAILED if out.failures else EXIT_OK
+
+
+def run_watch(
+    preset_name: str,
+    csv_path: str,
+    inbox: str,
+    done_dir: Optional[str] = None,
+    failed_dir: Optional[str] = None,
+    quiet: bool = False,
+    engine: Optional[str] = None,
+) -> int:
+    """
+    inbox を監視し続ける（Ctrl+C まで）。戻り値は終了コード。
+    """
+    from core import presets
+    from core.csvio.journal import JobJournal
+    from core.csvio.stream_writer import CSVStreamWriter
+    from core.ocr.engines import check_engine, get_engine
+    from core.ocr.hotfolder import HotFolder
+
+    try:
+        preset = presets.load(preset_name)
+    except Exception as e:
+        print(f"プリセットを読み込めません: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        engine = check_engine(engine)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    if not preset.rois:
+        print(f"プリセット「{preset.name}」に ROI がありません", file=sys.stderr)
+        return EXIT_USAGE
+
+    def log(msg: str) -> None:
+        print(msg, file=sys.stderr, flush=True)
+
+    def on_file(path: str, ok: bool, rows: int, dst: str, error: str) -> None:
+        if quiet:
+            return
+        name = os.path.basename(path)
+        if ok:
+            log(f"OK: {name} -> {rows} 行")
+        else:
+            log(f"失敗: {name} / {error}")
+
+    journal = JobJournal(csv_path, engine=engine) if JOB_JOURNAL_ENABLED else None
+    writer = CSVStreamWriter(csv_path, append=True, journal=journal)
+    folder = HotFolder(
+        inbox,
+        preset,
+        writer,
+        on_file=on_file,
+        on_log=log,
+        done_dir=done_dir,
+        failed_dir=failed_dir,
+        engine=engine,
+    )
+
+    interrupted = False
+    t0 = time.perf_counter()
+
+    def on_sigint(signum, frame) -> None:
+        # 例外にはせず受付だけ止める（処理中のファイルは流し切ってから閉じる）
+        nonlocal interrupted
+        if interrupted:
+            log("終了処理中です。処理中のファイルが終わるまでお待ちください")
+        interrupted = True
+        folder.wake()
+
+    log(f"{APP_NAME}: {inbox} を監視中（Ctrl+C で終了） -> {csv_path}")
+    prev_handler = None
+    try:
+        get_engine(engine)
+        prev_handler = signal.signal(signal.SIGINT, on_sigint)
+        folder.run(should_stop=lambda: interrupted)
+    except KeyboardInterrupt:
+        # エンジンの読込み中に押された場合（まだ何も処理していない）
+        interrupted = True
+    finally:
+        try:
+            writer.close()
+        except Exception as e:
+            log(f"CSV書込み失敗: {e}")
+            return EXIT_FAILED
+        finally:
+            if prev_handler is not None:
+                signal.signal(signal.SIGINT, prev_handler)
+
+    elapsed = max(1e-9, time.perf_counter() - t0)
+    log(
+        f"{APP_NAME}: 監視終了 処理 {folder.files_done} 件 / 失敗 {folder.files_failed} 件"
+        f" / {elapsed:.0f} 秒"
+    )
+    return EXIT_INTERRUPTED if interrupted else EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="formxtract", description=f"{APP_NAME} コマンドライン")
+    sub = ap.add_subparsers(dest="command")
+
+    b = sub.add_parser("batch", help="画像を一括 OCR して CSV へ書き出す")
+    b.add_argument("inputs", nargs="+", metavar="INPUT", help="画像ファイル / ディレクトリ / glob")
+    b.add_argument("--preset", required=True, help="プリセット名")
+    b.add_argument("--csv", required=True, help="出力 CSV")
+    mode = b.add_mutually_exclusive_group()
+    mode.add_argument("--append", dest="overwrite", action="store_false", help="CSV に追記する")
+    mode.add_argument("--overwrite", dest="overwrite", action="store_true", help="CSV を上書きする")
+    b.set_defaults(overwrite=not CSV_APPEND_DEFAULT)
+    b.add_argument("-r", "--recursive", action="store_true", help="ディレクトリを再帰的にたどる")
+    b.add_argument("-j", "--workers", type=int, default=None, help="並列プロセス数（0 で自動）")
+    b.add_argument("--rerun", action="store_true", help="処理済みの入力もやり直す（追記時のジョブ記録を無視）")
+    b.add_argument("-q", "--quiet", action="store_true", help="ページごとの表示を省く")
+    b.add_argument("--timing", action="store_true", help="段ごとの所要時間を表示する")
+    b.add_argument("--trace", default="", metavar="FILE", help="ページ・ROI ごとの所要時間を書き出す（.json: Chrome トレース / 他: JSONL）")
+    b.add_argument("--profile", default="", metavar="FILE", help="cProfile で計測して pstats を保存する")
+    b.add_argument("--engine", default=None, metavar="SPEC", help="OCR エンジン（paddle / null / record:FILE / replay:FILE）")
+
+    w = sub.add_parser("watch", help="受信フォルダを監視して届いた画像を OCR し続ける")
+    w.add_argument("inbox", metavar="INBOX", help="受信フォルダ")
+    w.add_argument("--preset", required=True, help="プリセット名")
+    w.add_argument("--csv", required=True, help="出力 CSV（追記）")
+    w.add_argument("--done", default=None, help="処理済みファイルの移動先（既定: INBOX/done）")
+    w.add_argument("--failed", default=None, help="失敗したファイルの移動先（既定: INBOX/failed）")
+    w.add_argument("-q", "--quiet", action="store_true", help="ファイルごとの表示を省く")
+    w.add_argument("--engine", default=None, metavar="SPEC", help="OCR エンジン（paddle / null / record:FILE / replay:FILE）")
+
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+
+    if args.command == "watch":
+        return run_watch(
+            args.preset,
+            args.csv,
+            args.inbox,
+            done_dir=args.done,
+            failed_dir=args.failed,
+            quiet=args.quiet,
+            engine=args.engine,
+        )
+
+    if args.command != "batch":
+        ap.print_help(sys.stderr)
+        return EXIT_USAGE
+
+    return run_batch(
+        args.preset,
+        args.csv,
+        args.inputs,
+        overwrite=args.overwrite,
+        recursive=args.recursive,
+        workers=args.workers,
+        quiet=args.quiet,
+        rerun=args.rerun,
+        timing=args.timing,
+        trace=args.trace,
+        profile=args.profile,
+        engine=args.engine,
+    )
+
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -2,5 +2,18 @@
 
 from .layout import LayoutPlan
 from .writer import write_rows
+from .results import ResultStore, count_other_presets, materialize_rows, reexport
+from .journal import JobJournal, preset_version
+from .stream_writer import CSVStreamWriter
 
-__all__ = ["LayoutPlan", "write_rows"]
+__all__ = [
+    "LayoutPlan",
+    "write_rows",
+    "CSVStreamWriter",
+    "JobJournal",
+    "preset_version",
+    "ResultStore",
+    "materialize_rows",
+    "count_other_presets",
+    "reexport",
+]
@@ -0,0 +1,204 @@
+# path: core/csvio/journal.py
+# -*- coding: utf-8 -*-
+
+"""
+出力 CSV ごとのジョブ記録（どの入力をどのプリセットで処理し終えたか）。
+
+中断した一括処理を同じ CSV へ追記でやり直すとき、処理済みの入力を飛ばし、
+失敗したものと未処理のものだけを OCR する。
+- 入力は内容ハッシュで識別する（core.image.hashing.source_digest）
+- プリセットは名前と、ROI・レイアウトから作るバージョン（preset_version）で照合する
+- エンジン指定（"paddle" / "null" / "replay:..." など）も照合する（null で流した分を処理済みにしない）
+- 記録は CSV へ行を書いた後に書く（記録があれば行は CSV にある）
+- CSV が無い・空なら記録は無いものとして扱い、古い記録は消す
+  （CSV を消して最初からやり直したときに、全件が処理済みと判定されないように）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from core.app.app_paths import ensure_dir, storage_root
+from .results import ResultStore
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# これ以下の大きさの CSV は空とみなす（BOM だけのもの）
+_EMPTY_CSV_BYTES = 3
+
+
+def preset_version(preset: Any) -> str:
+    """
+    結果に影響するプリセットの中身（ROI・レイアウト・基準サイズ）のハッシュ。名前は含めない。
+    """
+    try:
+        d = dict(preset.to_dict())
+    except Exception:
+        return ""
+
+    d.pop("name", None)
+    raw = json.dumps(d, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def engine_id(spec: Optional[str] = None) -> str:
+    """
+    記録・照合に使うエンジン指定（省略時は OCR_IMPL。core.ocr.engines と同じ正規化）。
+    """
+    from core.ocr.engines import check_engine
+
+    try:
+        return check_engine(spec)
+    except ValueError:
+        return str(spec or "").strip()
+
+
+def make_entry(
+    key: str,
+    task: Any,
+    ok: bool,
+    rows: int,
+    error: str = "",
+) -> Dict[str, Any]:
+    preset = getattr(task, "preset", None)
+    return {
+        "key": key,
+        "name": getattr(task, "display_name", ""),
+        "src_path": getattr(task, "src_path", ""),
+        "preset": getattr(preset, "name", ""),
+        "preset_version": preset_version(preset),
+        "status": STATUS_DONE if ok else STATUS_FAILED,
+        "rows": int(rows),
+        "error": error,
+        "time": time.time(),
+    }
+
+
+class JobJournal:
+    """
+    csv_path に対応する JSON Lines のジョブ記録。同じ key のエントリは最後のものが有効。
+    読込みは最初に使ったとき。追記はスレッドをまたいで行ってよい。
+    engine はこのジョブのエンジン指定。save() するエントリに記録し、is_done() で照合する
+    （エンジンを記録していない古いエントリは既定のエンジン（OCR_IMPL）のものとみなす）。
+    """
+
+    def __init__(self, csv_path: str | Path, root: Optional[Path] = None, engine: Optional[str] = None) -> None:
+        root = Path(root) if root is not None else storage_root() / "journal"
+        self.csv_path = Path(csv_path)
+        self.path = ResultStore(root).path_for(csv_path)
+        self.engine = engine_id(engine)
+        self._default_engine = engine_id(None)
+
+        self._latest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _csv_has_rows(self) -> bool:
+        try:
+            return self.csv_path.stat().st_size > _EMPTY_CSV_BYTES
+        except OSError:
+            return False
+
+    def _load_locked(self) -> Dict[str, Dict[str, Any]]:
+        if not self._csv_has_rows():
+            # 記録の行が CSV に残っていないので、処理済みとはいえない
+            if self._latest or self._latest is None:
+                try:
+                    self.path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._latest = {}
+            return self._latest
+
+        if self._latest is not None:
+            return self._latest
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        e = json.loads(line)
+                    except Exception:
+                        # 書込み途中で切れた行などは読み飛ばす
+                        continue
+                    if e.get("key"):
+                        latest[e["key"]] = e
+
+        self._latest = latest
+        return latest
+
+    def entry(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._load_locked().get(key)
+
+    def is_done(self, key: Optional[str], preset: Any) -> bool:
+        """
+        key の入力が preset（名前とバージョンが同じもの）とこのジョブのエンジンで処理済みか。
+        失敗の記録は False。
+        """
+        if not key:
+            return False
+
+        e = self.entry(key)
+        if e is None or e.get("status") != STATUS_DONE:
+            return False
+
+        return (
+            e.get("preset") == getattr(preset, "name", "")
+            and e.get("preset_version") == preset_version(preset)
+            and (e.get("engine") or self._default_engine) == self.engine
+        )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            out = {STATUS_DONE: 0, STATUS_FAILED: 0}
+            for e in self._load_locked().values():
+                st = e.get("status", "")
+                out[st] = out.get(st, 0) + 1
+            return out
+
+    def save(self, entries: Iterable[Dict[str, Any]], append: bool) -> int:
+        """
+        entries を書く。append=False なら既存の記録を置き換える（CSV を上書きしたとき）。
+        エンジンの無いエントリにはこのジョブのエンジンを記録する。
+        """
+        entries = [e if e.get("engine") else dict(e, engine=self.engine) for e in entries]
+        lines = [json.dumps(e, ensure_ascii=False) + "\n" for e in entries]
+
+        with self._lock:
+            ensure_dir(self.path.parent)
+            latest = self._load_locked() if append else {}
+
+            if append:
+                with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+                    f.writelines(lines)
+            else:
+                tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+                    f.writelines(lines)
+                os.replace(tmp, self.path)
+
+            for e in entries:
+                if e.get("key"):
+                    latest[e["key"]] = e
+            self._latest = latest
+
+        return len(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            self._latest = {}
@@ -0,0 +1,164 @@
+# path: core/csvio/results.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR 結果（画像ごとの正規化済みフィールド値）の保存と、そこからの CSV 再出力。
+
+layout_text や列別ルールを変えても、保存済みのフィールド値から
+行を組み直すだけで済むため、OCR をやり直す必要がない。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.app.app_paths import ensure_dir, storage_root
+from core.postprocess import apply_rules_to_row
+from .layout import LayoutPlan
+from .writer import write_rows
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def materialize_rows(
+    fields: List[str],
+    layout_text: str,
+    rules_by_col: Optional[Dict[int, List[str]]] = None,
+) -> List[List[str]]:
+    """
+    フィールド値（{1} が fields[0]）をレイアウトで行へ展開し、列別ルールを適用する。
+    rules_by_col 省略時は constants.PP_BY_COL。
+    """
+    lp = LayoutPlan(layout_text or "")
+    rows = lp.materialize(fields)
+
+    out_rows = []
+    for row in rows:
+        out_rows.append(apply_rules_to_row(row, rules_by_col))
+
+    return out_rows
+
+
+class ResultStore:
+    """
+    出力 CSV ごとに、画像ごとの結果レコードを JSON Lines で保存する。
+    レコード: {"name", "src_path", "preset", "fields", "ok"}
+    CSV と同じく追記／上書きを行い、CSV の中身と対応させる。
+    """
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self._root = Path(root) if root is not None else storage_root() / "results"
+
+    def path_for(self, csv_path: str | Path) -> Path:
+        p = Path(csv_path).expanduser().resolve()
+        digest = hashlib.sha1(str(p).lower().encode("utf-8")).hexdigest()[:12]
+        stem = _UNSAFE.sub("_", p.stem) or "output"
+        return self._root / f"{stem}-{digest}.jsonl"
+
+    def save(self, csv_path: str | Path, records: List[Dict[str, Any]], append: bool) -> int:
+        """
+        records を保存する。append=False なら既存分を置き換える（原子的に置換）。
+        戻り値は保存件数。
+        """
+        path = self.path_for(csv_path)
+        ensure_dir(path.parent)
+
+        lines = [json.dumps(r, ensure_ascii=False) + "\n" for r in records]
+
+        if append:
+            with open(path, "a", encoding="utf-8", newline="\n") as f:
+                f.writelines(lines)
+            return len(lines)
+
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+                f.writelines(lines)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                if tmp.exists():
+                    tmp.unlink()
+            except Exception:
+                pass
+            raise
+
+        return len(lines)
+
+    def load(self, csv_path: str | Path) -> List[Dict[str, Any]]:
+        path = self.path_for(csv_path)
+        if not path.exists():
+            return []
+
+        out: List[Dict[str, Any]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    out.append(json.loads(line))
+                except Exception:
+                    # 書込み途中で切れた行などは読み飛ばす
+                    continue
+
+        return out
+
+    def has(self, csv_path: str | Path) -> bool:
+        return self.path_for(csv_path).exists()
+
+
+def count_other_presets(records: List[Dict[str, Any]], preset_name: str) -> Dict[str, int]:
+    """
+    preset_name 以外のプリセットで作られた記録の件数（プリセット名 -> 件数）。
+    プリセット名の無い記録は数えない。
+    """
+    out: Dict[str, int] = {}
+    for r in records:
+        name = r.get("preset") or ""
+        if name and name != preset_name:
+            out[name] = out.get(name, 0) + 1
+    return out
+
+
+def reexport(
+    csv_path: str | Path,
+    layout_text: str,
+    rules_by_col: Optional[Dict[int, List[str]]] = None,
+    out_path: Optional[str | Path] = None,
+    store: Optional[ResultStore] = None,
+    preset_name: Optional[str] = None,
+) -> int:
+    """
+    csv_path について保存済みのフィールド値から行を組み直し、CSV を書き直す（OCR なし）。
+    - out_path 省略時は csv_path 自体を上書き
+    - 失敗した画像（ok=False）は元の出力と同じく行を出さない
+    - preset_name を渡すと、別のプリセットの記録が混ざっていれば ValueError（列がずれるため）
+    戻り値は書き込み行数。
+    """
+    store = store or ResultStore()
+    records = store.load(csv_path)
+
+    if preset_name is not None:
+        others = count_other_presets(records, preset_name)
+        if others:
+            detail = ", ".join(f"{k}: {v}件" for k, v in sorted(others.items()))
+            raise ValueError(f"別のプリセットで作られた結果が含まれています（{detail}）")
+
+    rows: List[List[str]] = []
+    for r in records:
+        if not r.get("ok", True):
+            continue
+        rows.extend(materialize_rows(list(r.get("fields") or []), layout_text, rules_by_col))
+
+    dst = Path(out_path) if out_path is not None else Path(csv_path)
+
+    if not rows:
+        return 0
+
+    return write_rows(dst, rows, append=False)
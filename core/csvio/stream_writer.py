@@ -0,0 +1,252 @@
+# path: core/csvio/stream_writer.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR 結果の逐次書出し（専用スレッド）。
+
+ページの結果が届くたびに CSV と ResultStore（再出力用）へ書き足すので、
+途中で落ちても・中断しても、それまでに終わったページの行は残る。
+- 書込みは呼び出し順（呼び出し側はタスク順に渡す）
+- 待ち行列が空になるたびにまとめて flush（OS へ渡す）し、fsync は CSV_FSYNC に従う
+- append=False なら最初の行を書く時に既存の CSV を切り詰める（行が 1 つも無ければ触らない）
+- journal（JobJournal）を渡すと、CSV を flush した後にページごとの処理記録を書く
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.app.constants import (
+    CSV_BOM_UTF8,
+    CSV_NEWLINE,
+    CSV_FSYNC,
+    CSV_FSYNC_INTERVAL_SEC,
+    CSV_WRITER_QUEUE,
+)
+from .journal import JobJournal
+from .results import ResultStore
+from .writer import _write_csv_rows
+
+# 待ち行列の終端を表す番兵
+_END = object()
+
+
+class CSVStreamWriter:
+    """
+    write(rows, record) で 1 ページ分を渡し、close() で書き切る。
+    - rows: CSV に書く行
+    - record: ResultStore へ保存するレコード（None なら保存しない）
+    - entry: ジョブ記録のエントリ（None なら記録しない）
+    書込みに失敗した場合、以降の write() / close() はその例外を送出する。
+    再出力用の結果・ジョブ記録の保存失敗は store_error / journal_error に残すだけで止めない。
+    """
+
+    def __init__(
+        self,
+        csv_path: str | Path,
+        append: bool,
+        store: Optional[ResultStore] = None,
+        journal: Optional[JobJournal] = None,
+        fsync: Optional[str] = None,
+        bom_utf8: bool = CSV_BOM_UTF8,
+        newline: str = CSV_NEWLINE,
+    ) -> None:
+        self.csv_path = Path(csv_path)
+        self.store = store if store is not None else ResultStore()
+        self.journal = journal
+        self.append = bool(append)
+
+        self._csv_append = bool(append)
+        self._store_append = bool(append)
+        self._journal_append = bool(append)
+        self._fsync = (fsync or CSV_FSYNC or "none").lower()
+        self._bom_utf8 = bom_utf8
+        self._newline = newline
+
+        self._fp = None
+        self._last_sync = time.monotonic()
+        self._pending_records: List[Dict[str, Any]] = []
+        self._pending_entries: List[Dict[str, Any]] = []
+
+        self.pages = 0
+        self.rows = 0
+        # 書込みスレッドで CSV・結果・記録の書込みと flush にかかった時間の合計（秒）
+        self.write_sec = 0.0
+        self.store_error: Optional[BaseException] = None
+        self.journal_error: Optional[BaseException] = None
+        self._error: Optional[BaseException] = None
+
+        self._q: "queue.Queue" = queue.Queue(maxsize=max(1, int(CSV_WRITER_QUEUE)))
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="csv-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- 呼び出し側 ----------
+
+    def write(
+        self,
+        rows: List[List[str]],
+        record: Optional[Dict[str, Any]] = None,
+        entry: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise RuntimeError("CSVStreamWriter は閉じられています")
+
+        self._q.put((list(rows or []), record, entry))
+
+    def sync(self, timeout: Optional[float] = None) -> None:
+        """
+        ここまでに渡した分を書き切り、fsync（fsync="none" 以外）まで済むのを待つ。
+        入力ファイルを移動する前など、行が確実に残ってから次へ進みたいときに使う。
+        """
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            return
+
+        done = threading.Event()
+        self._q.put(done)
+        done.wait(timeout)
+
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """
+        待ち行列を書き切ってファイルを閉じる（fsync="none" 以外は fsync してから）。
+        """
+        if not self._closed:
+            self._closed = True
+            self._q.put(_END)
+            self._thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._error
+
+    def __enter__(self) -> "CSVStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- 書込みスレッド ----------
+
+    def _loop(self) -> None:
+        try:
+            while True:
+                item = self._q.get()
+                if item is _END:
+                    break
+
+                if isinstance(item, threading.Event):
+                    # sync() の待ち合わせ
+                    if self._error is None:
+                        try:
+                            self._flush(final=True)
+                        except BaseException as e:
+                            self._error = e
+                    item.set()
+                    continue
+
+                if self._error is None:
+                    t0 = time.perf_counter()
+                    try:
+                        self._write_page(*item)
+                        # 続きが来ていなければここでまとめて OS へ渡す
+                        if self._q.empty():
+                            self._flush(final=False)
+                    except BaseException as e:
+                        self._error = e
+                    self.write_sec += time.perf_counter() - t0
+
+            if self._error is None:
+                try:
+                    self._flush(final=True)
+                except BaseException as e:
+                    self._error = e
+        finally:
+            self._close_file()
+
+    def _open(self) -> None:
+        path = self.csv_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self._csv_append and path.exists() and path.stat().st_size > 0:
+            mode, encoding = "a", "utf-8"
+        else:
+            mode = "a" if self._csv_append else "w"
+            encoding = "utf-8-sig" if self._bom_utf8 else "utf-8"
+
+        self._fp = open(path, mode, encoding=encoding, newline=self._newline)
+
+    def _write_page(
+        self,
+        rows: List[List[str]],
+        record: Optional[Dict[str, Any]],
+        entry: Optional[Dict[str, Any]],
+    ) -> None:
+        if rows:
+            if self._fp is None:
+                self._open()
+            _write_csv_rows(self._fp, rows)
+            self.rows += len(rows)
+
+        if record is not None:
+            self._pending_records.append(record)
+        if entry is not None and self.journal is not None:
+            self._pending_entries.append(entry)
+
+        self.pages += 1
+
+    def _flush(self, final: bool) -> None:
+        if self._fp is not None:
+            self._fp.flush()
+
+            now = time.monotonic()
+            due = (
+                final
+                or self._fsync == "page"
+                or (self._fsync == "interval" and now - self._last_sync >= float(CSV_FSYNC_INTERVAL_SEC))
+            )
+            if due and self._fsync != "none":
+                os.fsync(self._fp.fileno())
+                self._last_sync = now
+
+        if self._pending_records:
+            records, self._pending_records = self._pending_records, []
+            try:
+                self.store.save(self.csv_path, records, append=self._store_append)
+                self._store_append = True
+            except Exception as e:
+                # 再出力用の保存に失敗しても CSV の書込みは続ける
+                self.store_error = e
+
+        # 記録は CSV を OS へ渡した後に書く（記録があれば行は CSV にある）
+        if self._pending_entries:
+            entries, self._pending_entries = self._pending_entries, []
+            try:
+                self.journal.save(entries, append=self._journal_append)
+                self._journal_append = True
+            except Exception as e:
+                self.journal_error = e
+
+    def _close_file(self) -> None:
+        if self._fp is None:
+            return
+
+        try:
+            self._fp.close()
+        except Exception:
+            pass
+        self._fp = None
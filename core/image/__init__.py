@@ -4,12 +4,32 @@
 Image utilities shared across UI and OCR layers.
 """
 
-from .qimage_convert import qimage_to_bgr, bgr_to_rgb
-from .io_utils import is_image_ext, deduplicate_file_list
+from .qimage_convert import qimage_to_bgr, qimage_view, ndarray_to_qimage, bgr_to_rgb
+from .io_utils import is_image_ext, iter_image_files, deduplicate_file_list, read_image_bgr
+from .loader import load_page, decode_image_bytes
+from .page_cache import PageCache
+from .pages import PageRef, iter_pages, count_pages, load_page_ref
+from .hashing import file_digest, source_digest, dhash, hamming, DuplicateIndex
 
 __all__ = [
     "qimage_to_bgr",
+    "qimage_view",
+    "ndarray_to_qimage",
     "bgr_to_rgb",
     "is_image_ext",
+    "iter_image_files",
     "deduplicate_file_list",
+    "read_image_bgr",
+    "load_page",
+    "decode_image_bytes",
+    "PageCache",
+    "PageRef",
+    "iter_pages",
+    "count_pages",
+    "load_page_ref",
+    "file_digest",
+    "source_digest",
+    "dhash",
+    "hamming",
+    "DuplicateIndex",
 ]
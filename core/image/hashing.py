@@ -0,0 +1,247 @@
+# path: core/image/hashing.py
+# -*- coding: utf-8 -*-
+
+"""
+入力の内容ハッシュ（ジョブ記録などで「同じ入力か」を判定する）と、重複ページの検出。
+
+ファイル名や場所ではなく中身で判定するので、移動・改名したファイルも同じものと分かる。
+ファイルのハッシュは (パス, mtime, サイズ) ごとにプロセス内で覚えておき、読み直さない。
+- 完全一致: 内容ハッシュが同じ
+- 近似重複: 縮小画像の dHash（DEDUP_HASH_SIZE^2 bit）のハミング距離が DEDUP_NEAR_BITS 以下
+  （再スキャンや保存形式違い。同じ様式の別記入も近くなり得るので、既定では印を付けるだけ）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import cv2
+
+from core.app.constants import DEDUP_HASH_SIZE, DEDUP_NEAR_BITS
+from .pages import PageRef
+
+_CHUNK = 1024 * 1024
+_MEMO_MAX = 8192
+
+_memo: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_digest(path: str) -> str:
+    """
+    ファイル全体の内容ハッシュ（16 進文字列）。読めなければ例外。
+    """
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    with _memo_lock:
+        hit = _memo.get(memo_key)
+        if hit is not None:
+            _memo.move_to_end(memo_key)
+            return hit
+
+    h = _new_hash()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _memo_lock:
+        _memo[memo_key] = digest
+        while len(_memo) > _MEMO_MAX:
+            _memo.popitem(last=False)
+
+    return digest
+
+
+def source_digest(source: Any) -> Optional[str]:
+    """
+    OCR 入力（パス / PageRef / バイト列 / ndarray）の内容ハッシュ。
+    - PageRef は「ファイルのハッシュ + ページ番号」（同じ文書の別ページは別物）
+    - 判定できない入力（QImage など）や読めないファイルは None
+    """
+    try:
+        if isinstance(source, PageRef):
+            digest = file_digest(source.path)
+            if source.count <= 1 and source.index == 0:
+                return digest
+            return f"{digest}#{source.index + 1}"
+
+        if isinstance(source, (str, os.PathLike)):
+            return file_digest(os.fspath(source))
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            h = _new_hash()
+            h.update(source)
+            return h.hexdigest()
+
+        if isinstance(source, np.ndarray):
+            h = _new_hash()
+            h.update(f"{source.shape}|{source.dtype}|".encode("ascii"))
+            h.update(np.ascontiguousarray(source).data)
+            return h.hexdigest()
+    except Exception:
+        return None
+
+    return None
+
+
+def dhash(img: np.ndarray, size: int = DEDUP_HASH_SIZE) -> int:
+    """
+    差分ハッシュ（size*size bit）。画像を (size+1) x size のグレーに縮め、横に隣り合う画素の大小を並べる。
+    サムネイルから計算してよい（縮小の仕方の違いは数 bit の差に収まる）。
+    """
+    if img.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        img = cv2.cvtColor(img, code)
+
+    small = cv2.resize(img, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# check_add / discard の判定結果: ("exact" | "near", 元の label, 元の key)
+DupHit = Tuple[str, str, str]
+
+
+class DuplicateIndex:
+    """
+    取り込んだページの内容ハッシュと dHash を覚え、完全一致・近似重複を判定する（スレッドセーフ）。
+    近似の候補は、ハッシュを (near_bits + 1) 区間に分けた索引で絞る
+    （距離が near_bits 以下なら、どこか 1 区間は必ず一致する）。
+    key はリストの 1 項目ごとに一意にする（同じファイルを 2 回取り込んだら別の key）。
+    重複と判定した項目も覚えておき、元を discard したら判定し直す（最初の重複が新しい元になる）。
+    """
+
+    def __init__(self, near_bits: int = DEDUP_NEAR_BITS, hash_size: int = DEDUP_HASH_SIZE) -> None:
+        self.near_bits = int(near_bits)
+        nbits = int(hash_size) * int(hash_size)
+        n = max(1, min(nbits, self.near_bits + 1))
+        step = nbits // n
+        self._spans = [(i * step, nbits if i == n - 1 else (i + 1) * step) for i in range(n)]
+
+        self._digests: Dict[str, str] = {}
+        self._key_digest: Dict[str, str] = {}
+        self._hashes: Dict[str, int] = {}
+        self._labels: Dict[str, str] = {}
+        self._buckets: List[Dict[int, Set[str]]] = [{} for _ in self._spans]
+        # 重複と判定した key -> (元の key, label, 内容ハッシュ, dHash)。登録順
+        self._dups: Dict[str, Tuple[str, str, Optional[str], Optional[int]]] = {}
+        self._lock = threading.Lock()
+
+    def _parts(self, dh: int) -> List[int]:
+        return [(dh >> lo) & ((1 << (hi - lo)) - 1) for lo, hi in self._spans]
+
+    def check_add(
+        self,
+        key: str,
+        label: str,
+        digest: Optional[str],
+        dh: Optional[int],
+    ) -> Optional[DupHit]:
+        """
+        既に登録されたページと重複するかを調べる。
+        重複なら ("exact" | "near", 相手の label, 相手の key)、重複でなければ None を返す。
+        完全一致でなければ内容ハッシュは登録する（近似重複のページとの完全一致も「完全一致」と分かるように）。
+        dHash は重複でないページだけを登録する。
+        """
+        with self._lock:
+            hit = self._check_add_locked(key, label, digest, dh)
+            if hit is not None:
+                self._dups[key] = (hit[2], label, digest, dh)
+            return hit
+
+    def _check_add_locked(
+        self,
+        key: str,
+        label: str,
+        digest: Optional[str],
+        dh: Optional[int],
+    ) -> Optional[DupHit]:
+        if digest:
+            other = self._digests.get(digest)
+            if other is not None and other != key:
+                return "exact", self._labels.get(other, other), other
+
+        self._labels[key] = label
+        if digest:
+            self._digests[digest] = key
+            self._key_digest[key] = digest
+
+        if dh is not None and self.near_bits >= 0:
+            seen = set()
+            for i, part in enumerate(self._parts(dh)):
+                for other in self._buckets[i].get(part, ()):
+                    if other in seen or other == key:
+                        continue
+                    seen.add(other)
+                    if hamming(dh, self._hashes[other]) <= self.near_bits:
+                        return "near", self._labels.get(other, other), other
+
+        if dh is not None:
+            self._hashes[key] = dh
+            for i, part in enumerate(self._parts(dh)):
+                self._buckets[i].setdefault(part, set()).add(key)
+
+        return None
+
+    def discard(self, key: str) -> Dict[str, Optional[DupHit]]:
+        """
+        key を忘れる。key を元としていた重複は登録順に判定し直し、
+        {重複だった key: 新しい判定（None なら元になった）} を返す。
+        """
+        with self._lock:
+            self._dups.pop(key, None)
+            self._labels.pop(key, None)
+            digest = self._key_digest.pop(key, None)
+            if digest is not None and self._digests.get(digest) == key:
+                del self._digests[digest]
+
+            dh = self._hashes.pop(key, None)
+            if dh is not None:
+                for i, part in enumerate(self._parts(dh)):
+                    bucket = self._buckets[i].get(part)
+                    if bucket is not None:
+                        bucket.discard(key)
+                        if not bucket:
+                            del self._buckets[i][part]
+
+            orphans = [k for k, v in self._dups.items() if v[0] == key]
+            changed: Dict[str, Optional[DupHit]] = {}
+            for k in orphans:
+                _, label, d, h = self._dups.pop(k)
+                hit = self._check_add_locked(k, label, d, h)
+                if hit is not None:
+                    self._dups[k] = (hit[2], label, d, h)
+                changed[k] = hit
+
+            return changed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._digests.clear()
+            self._key_digest.clear()
+            self._hashes.clear()
+            self._labels.clear()
+            self._dups.clear()
+            for b in self._buckets:
+                b.clear()
+
+    def __len__(self) -> int:
+        return len(self._labels)
@@ -3,20 +3,52 @@
 from __future__ import annotations
 
 import os
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
-from core.app.constants import IMAGE_EXTS, ALLOW_DUPLICATE_DROPS
+import numpy as np
+
+from core.app.constants import IMAGE_EXTS, PDF_EXTS, ALLOW_DUPLICATE_DROPS
 
 
 def is_image_ext(path: str) -> bool:
+    """
+    OCR 入力として扱う拡張子か（画像と PDF）。
+    """
     ext = os.path.splitext(path)[1].lower()
-    return ext in IMAGE_EXTS
+    return ext in IMAGE_EXTS or ext in PDF_EXTS
+
+
+def iter_image_files(paths: Iterable[str], recursive: bool = True) -> Iterator[str]:
+    """
+    ファイル／ディレクトリの混在したパス群を画像ファイルのパスへ展開する。
+    - ディレクトリ: 配下の画像を名前順（recursive=False なら直下のみ）
+    - ファイル: 画像の拡張子なら そのまま
+    逐次 yield するので、大きなフォルダでも最初の結果がすぐ得られる。
+    """
+    for p in paths:
+        if not p:
+            continue
+
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                for f in sorted(files):
+                    if is_image_ext(f):
+                        yield os.path.join(root, f)
+
+                if not recursive:
+                    break
+            continue
+
+        if is_image_ext(p):
+            yield p
 
 
 def deduplicate_file_list(paths: Iterable[str], allow_duplicate: bool | None = None) -> List[str]:
     """
     D&D などで渡ってきたパス群から、画像だけ抽出。
     既定では重複を除外する（constants.ALLOW_DUPLICATE_DROPS 参照）。
+    ここで見るのはパスの文字列だけ。中身の重複は core.image.hashing.DuplicateIndex で判定する。
     """
     if allow_duplicate is None:
         allow_duplicate = bool(ALLOW_DUPLICATE_DROPS)
@@ -42,3 +74,18 @@ def deduplicate_file_list(paths: Iterable[str], allow_duplicate: bool | None = N
         out.append(p)
 
     return out
+
+
+def read_image_bgr(path: str) -> np.ndarray:
+    """
+    画像ファイル -> ndarray(BGR, uint8)。日本語パスも可。
+    QImage で読んだ場合と揃えるため EXIF の回転は適用しない。
+    """
+    import cv2
+
+    buf = np.fromfile(path, dtype=np.uint8)
+    bgr = cv2.imdecode(buf, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    if bgr is None:
+        raise ValueError(f"画像を読み込めません: {path}")
+
+    return bgr
@@ -0,0 +1,76 @@
+# path: core/image/loader.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR 入力（ページ画像）の読み込み。Qt に依存しない。
+
+load_page() はパス / PageRef / バイト列 / ndarray / QImage を受け取り、パイプラインが扱う
+ndarray（BGR・BGRA・グレーのいずれか、uint8）を返す。
+QImage は UI から渡された場合だけ扱い、そのときに限り Qt を使う。
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Union
+
+import numpy as np
+import cv2
+
+from .io_utils import read_image_bgr
+from .pages import PageRef, load_page_ref
+from .qimage_convert import is_qimage, qimage_view
+
+PageSource = Union[str, "os.PathLike[str]", PageRef, bytes, bytearray, memoryview, np.ndarray, Any]
+
+
+def decode_image_bytes(data: Union[bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    エンコード済み画像（PNG/JPEG など）のバイト列 -> ndarray(BGR, uint8)
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    bgr = cv2.imdecode(buf, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    if bgr is None:
+        raise ValueError("画像データを読み込めません")
+
+    return bgr
+
+
+def _check_array(arr: np.ndarray) -> np.ndarray:
+    if arr.dtype != np.uint8:
+        raise ValueError(f"uint8 の画像を渡してください: dtype={arr.dtype}")
+
+    if arr.ndim == 3 and arr.shape[2] == 1:
+        return arr[:, :, 0]
+
+    if arr.ndim == 2 or (arr.ndim == 3 and arr.shape[2] in (3, 4)):
+        return arr
+
+    raise ValueError(f"対応していない画像形状です: {arr.shape}")
+
+
+def load_page(source: PageSource) -> np.ndarray:
+    """
+    ページ画像を ndarray で返す。
+    - str / PathLike: 画像ファイル（日本語パス可）
+    - PageRef: 複数ページ文書の 1 ページ（そのページだけ復号）
+    - bytes / bytearray / memoryview: エンコード済み画像
+    - ndarray: BGR / BGRA / グレー（uint8）をそのまま（コピーしない）
+    - QImage: 画素をコピーせずに参照するビュー
+    """
+    if isinstance(source, np.ndarray):
+        return _check_array(source)
+
+    if isinstance(source, PageRef):
+        return load_page_ref(source)
+
+    if isinstance(source, (str, os.PathLike)):
+        return read_image_bgr(os.fspath(source))
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return decode_image_bytes(source)
+
+    if is_qimage(source):
+        return qimage_view(source)
+
+    raise TypeError(f"画像として扱えない入力です: {type(source).__name__}")
@@ -0,0 +1,129 @@
+# path: core/image/page_cache.py
+# -*- coding: utf-8 -*-
+
+"""
+展開済みページ画像の LRU キャッシュ（容量はバイト数で制限）。
+
+ファイルリストはパスとサムネイルだけを持ち、フル解像度の画像はここから必要な時に取り出す。
+ファイルが更新された（mtime / サイズが変わった）場合は読み直す。
+キーはパス、または PageRef（複数ページ文書の 1 ページ。キーは ref.key）。
+値の型は問わない（UI は QImage、パイプラインは ndarray）。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple, Union
+
+from core.app.constants import PAGE_CACHE_MAX_MB
+from .io_utils import read_image_bgr
+from .pages import PageRef
+
+PageKey = Union[str, PageRef]
+
+
+def _file_sig(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _key_path(source: PageKey) -> Tuple[str, str]:
+    if isinstance(source, PageRef):
+        return source.key, source.path
+    return source, source
+
+
+def _sizeof(value: Any) -> int:
+    n = getattr(value, "nbytes", None)
+    if n is None and hasattr(value, "sizeInBytes"):
+        n = value.sizeInBytes()
+    return int(n or 0)
+
+
+class PageCache:
+    """
+    path / PageRef -> 展開済み画像。
+    - loader(source): 画像を読み込む（既定は read_image_bgr。PageRef を渡すなら対応した loader を指定）
+    - sizeof(value): 保持コスト（既定は nbytes / QImage.sizeInBytes）
+    上限を超えたら最後に使ったのが古いものから捨てる。上限より大きい 1 枚は保持せずに返す。
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        loader: Optional[Callable[[str], Any]] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        if max_bytes is None:
+            max_bytes = int(float(PAGE_CACHE_MAX_MB) * 1024 * 1024)
+
+        self._max_bytes = max(0, int(max_bytes))
+        self._loader = loader or read_image_bgr
+        self._sizeof = sizeof or _sizeof
+
+        self._items: "OrderedDict[str, Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, source: PageKey) -> Any:
+        """
+        source の画像を返す（無ければ読み込んで保持）。読めなければ例外。
+        """
+        key, path = _key_path(source)
+        sig = _file_sig(path)
+
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None and hit[0] == sig:
+                self._items.move_to_end(key)
+                return hit[1]
+
+        # 読込みはロックの外で行う（他スレッドの取得を待たせない）
+        value = self._loader(source)
+        size = self._sizeof(value)
+
+        with self._lock:
+            self._drop_locked(key)
+            if size <= self._max_bytes:
+                self._items[key] = (sig, value, size)
+                self._bytes += size
+                self._evict_locked()
+
+        return value
+
+    def peek(self, source: PageKey) -> Any:
+        """
+        保持していればその画像、無ければ None（読込みはしない）。
+        """
+        key, _ = _key_path(source)
+        with self._lock:
+            hit = self._items.get(key)
+            return hit[1] if hit is not None else None
+
+    def discard(self, source: PageKey) -> None:
+        key, _ = _key_path(source)
+        with self._lock:
+            self._drop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _drop_locked(self, key: str) -> None:
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self._max_bytes and self._items:
+            _, (_, _, size) = self._items.popitem(last=False)
+            self._bytes -= size
@@ -0,0 +1,201 @@
+# path: core/image/pages.py
+# -*- coding: utf-8 -*-
+
+"""
+複数ページ文書（マルチページ TIFF / PDF）のページ単位の参照と読込み。
+
+PageRef は「どのファイルの何ページ目か」だけを持つ小さな値で、pickle でき、
+ページの画素は load_page_ref() を呼んだときに 1 ページ分だけ復号する。
+- TIFF: Pillow で目的のフレームへ seek して復号（文書全体は読まない）
+- PDF : PyMuPDF(fitz) で 1 ページだけ描画（未導入なら読込み時にエラー）
+2 値・グレーのページは BGR に広げずグレー（1 byte/px）のまま返す。
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+import cv2
+
+from core.app.constants import PDF_EXTS, PDF_RENDER_DPI
+from .io_utils import read_image_bgr
+
+_TIFF_EXTS = (".tif", ".tiff")
+
+
+@dataclass(frozen=True)
+class PageRef:
+    """
+    path の index 番目（0 始まり）のページ。count は文書の総ページ数。
+    kind: "image"（単ページ画像）| "tiff" | "pdf"
+    """
+    path: str
+    index: int = 0
+    count: int = 1
+    kind: str = "image"
+
+    @property
+    def key(self) -> str:
+        # キャッシュ等で使う識別子（単ページならパスそのもの）
+        if self.count <= 1 and self.index == 0:
+            return self.path
+        return f"{self.path}#{self.index + 1}"
+
+    @property
+    def display_name(self) -> str:
+        name = os.path.basename(self.path)
+        if self.count <= 1:
+            return name
+        return f"{name} page #{self.index + 1}/{self.count}"
+
+
+def page_kind(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _TIFF_EXTS:
+        return "tiff"
+    if ext in PDF_EXTS:
+        return "pdf"
+    return "image"
+
+
+def _open_pdf(path: str):
+    try:
+        import fitz
+    except ImportError:
+        raise RuntimeError("PDF の読込みには PyMuPDF（pip install pymupdf）が必要です")
+
+    return fitz.open(path)
+
+
+def count_pages(path: str, kind: Optional[str] = None) -> int:
+    """
+    ページ数。TIFF は IFD をたどるだけで画素は復号しない。数えられなければ 1。
+    """
+    kind = kind or page_kind(path)
+
+    try:
+        if kind == "tiff":
+            from PIL import Image
+
+            with Image.open(path) as im:
+                return max(1, int(getattr(im, "n_frames", 1)))
+
+        if kind == "pdf":
+            doc = _open_pdf(path)
+            try:
+                return max(1, int(doc.page_count))
+            finally:
+                doc.close()
+    except Exception:
+        return 1
+
+    return 1
+
+
+def iter_pages(path: str) -> Iterator[PageRef]:
+    """
+    path のページを先頭から 1 つずつ PageRef で返す（画素は読まない）。
+    """
+    kind = page_kind(path)
+    n = count_pages(path, kind) if kind != "image" else 1
+
+    for i in range(n):
+        yield PageRef(path=path, index=i, count=n, kind=kind)
+
+
+def _pil_to_array(im) -> np.ndarray:
+    """
+    Pillow の 1 フレーム -> ndarray（グレー / BGR / BGRA, uint8）
+    """
+    mode = im.mode
+
+    if mode in ("1", "L"):
+        # 2 値は 1bit のまま保持されている。ここで初めてグレー 8bit に展開する
+        return np.asarray(im.convert("L"))
+
+    if mode.startswith("I;16") or mode in ("I", "F"):
+        arr = np.asarray(im, dtype=np.float32)
+        return cv2.normalize(arr, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+    if mode == "LA":
+        return np.asarray(im.convert("L"))
+
+    if mode == "RGBA":
+        return cv2.cvtColor(np.asarray(im), cv2.COLOR_RGBA2BGRA)
+
+    if mode != "RGB":
+        im = im.convert("RGB")
+
+    return cv2.cvtColor(np.asarray(im), cv2.COLOR_RGB2BGR)
+
+
+def _load_tiff_page(ref: PageRef, thumb: int = 0) -> np.ndarray:
+    from PIL import Image
+
+    with Image.open(ref.path) as im:
+        im.seek(ref.index)
+        if thumb > 0:
+            im = im.copy()
+            im.thumbnail((thumb, thumb))
+        return _pil_to_array(im)
+
+
+def _load_pdf_page(ref: PageRef, thumb: int = 0) -> np.ndarray:
+    # PyMuPDF が無い場合の案内は _open_pdf が出す（import はその後で行う）
+    doc = _open_pdf(ref.path)
+    import fitz
+
+    try:
+        page = doc.load_page(ref.index)
+
+        if thumb > 0:
+            r = page.rect
+            zoom = float(thumb) / max(1.0, max(r.width, r.height))
+        else:
+            zoom = float(PDF_RENDER_DPI) / 72.0
+
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+        arr = arr[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+        if pix.n == 1:
+            return arr.copy()
+
+        return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+    finally:
+        doc.close()
+
+
+def load_page_ref(ref: PageRef) -> np.ndarray:
+    """
+    ref の 1 ページだけを復号して ndarray（グレー / BGR / BGRA, uint8）で返す。
+    """
+    if ref.kind == "pdf":
+        return _load_pdf_page(ref)
+
+    if ref.kind == "tiff" and ref.count > 1:
+        return _load_tiff_page(ref)
+
+    return read_image_bgr(ref.path)
+
+
+def load_page_thumbnail(ref: PageRef, size: int) -> np.ndarray:
+    """
+    ref の縮小画像（長辺 size 以下）。複数ページ文書のサムネイル用。
+    """
+    if ref.kind == "pdf":
+        return _load_pdf_page(ref, thumb=size)
+
+    if ref.kind == "tiff":
+        return _load_tiff_page(ref, thumb=size)
+
+    img = read_image_bgr(ref.path)
+    h, w = img.shape[:2]
+    s = float(size) / max(1, max(h, w))
+    if s >= 1.0:
+        return img
+
+    return cv2.resize(img, (max(1, int(w * s)), max(1, int(h * s))), interpolation=cv2.INTER_AREA)
@@ -1,16 +1,39 @@
 # -*- coding: utf-8 -*-
 
+"""
+QImage ⇄ ndarray の変換（UI とパイプラインの境界）。
+PyQt5 は関数内で読み込むので、このモジュールを import しただけでは Qt は読まれない。
+"""
+
 from __future__ import annotations
 
-from PyQt5 import QtGui
+import sys
+from typing import TYPE_CHECKING
+
 import numpy as np
 import cv2
 
+if TYPE_CHECKING:
+    from PyQt5 import QtGui
+
 
-def qimage_to_bgr(qimage: QtGui.QImage) -> np.ndarray:
+def is_qimage(obj) -> bool:
+    """
+    obj が QImage か。Qt が未読込なら QImage は存在し得ないので読み込まずに False。
+    """
+    if "PyQt5.QtGui" not in sys.modules:
+        return False
+
+    from PyQt5 import QtGui
+    return isinstance(obj, QtGui.QImage)
+
+
+def qimage_to_bgr(qimage: "QtGui.QImage") -> np.ndarray:
     """
     QImage(any) -> ndarray(BGR, uint8)
     """
+    from PyQt5 import QtGui
+
     img = qimage.convertToFormat(QtGui.QImage.Format_ARGB32)
     w = img.width()
     h = img.height()
@@ -23,5 +46,86 @@ def qimage_to_bgr(qimage: QtGui.QImage) -> np.ndarray:
     return bgr
 
 
+class _QImageBuffer(np.ndarray):
+    """
+    QImage の画素メモリを直接参照する ndarray。
+    元の QImage を属性で保持するため、スライス（ROI のビュー）が生きている間は解放されない。
+    """
+    _qimage = None
+
+
+def _viewable_formats():
+    """
+    コピーなしで参照できる形式 → チャンネル数
+    """
+    from PyQt5 import QtGui
+
+    return {
+        QtGui.QImage.Format_Grayscale8: 1,
+        QtGui.QImage.Format_RGB32: 4,
+        QtGui.QImage.Format_ARGB32: 4,
+    }
+
+
+def qimage_view(qimage: "QtGui.QImage") -> np.ndarray:
+    """
+    QImage -> ndarray ビュー（読み取り専用、uint8）
+    - Grayscale8: (H, W)
+    - RGB32 / ARGB32: (H, W, 4) の BGRA（リトルエンディアン）
+    - 2 値・インデックスのグレー画像は Grayscale8、その他は ARGB32 に 1 回だけ変換する
+    ページ全体の色変換は行わないので、ROI を切り出してから必要な分だけ変換すること。
+    """
+    from PyQt5 import QtGui
+
+    viewable = _viewable_formats()
+    img = qimage
+    fmt = img.format()
+
+    if fmt not in viewable:
+        if img.isGrayscale():
+            img = img.convertToFormat(QtGui.QImage.Format_Grayscale8)
+        else:
+            img = img.convertToFormat(QtGui.QImage.Format_ARGB32)
+        fmt = img.format()
+
+    ch = viewable[fmt]
+    w = img.width()
+    h = img.height()
+    bpl = img.bytesPerLine()
+
+    # bits() は共有データのデタッチ（全体コピー）を招くため constBits() を使う
+    ptr = img.constBits()
+    ptr.setsize(h * bpl)
+
+    if ch == 1:
+        arr = np.ndarray((h, w), dtype=np.uint8, buffer=ptr, strides=(bpl, 1))
+    else:
+        arr = np.ndarray((h, w, ch), dtype=np.uint8, buffer=ptr, strides=(bpl, ch, 1))
+
+    view = arr.view(_QImageBuffer)
+    view._qimage = img
+    return view
+
+
+def ndarray_to_qimage(arr: np.ndarray) -> "QtGui.QImage":
+    """
+    ndarray（グレー / BGR / BGRA, uint8）-> QImage（データはコピーして持つ）
+    """
+    from PyQt5 import QtGui
+
+    if arr.ndim == 2:
+        arr = np.ascontiguousarray(arr)
+        fmt = QtGui.QImage.Format_Grayscale8
+    elif arr.shape[2] == 4:
+        arr = np.ascontiguousarray(arr)
+        fmt = QtGui.QImage.Format_ARGB32
+    else:
+        arr = cv2.cvtColor(arr, cv2.COLOR_BGR2RGB)
+        fmt = QtGui.QImage.Format_RGB888
+
+    h, w = arr.shape[:2]
+    return QtGui.QImage(arr.data, w, h, arr.strides[0], fmt).copy()
+
+
 def bgr_to_rgb(bgr: np.ndarray) -> np.ndarray:
     return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
@@ -0,0 +1,210 @@
+# path: core/image/register.py
+# -*- coding: utf-8 -*-
+
+"""
+様式の位置合わせ（テンプレート登録）。
+
+プリセットの基準画像から特徴点（ORB）を 1 度だけ取り、サイドカー（.npz）として保存しておく。
+ページごとに縮小画像で特徴点を取って基準と照合し、
+基準座標 → ページ座標の相似変換（拡大縮小・平行移動・回転）を推定する。
+- 特徴点の座標はフル解像度の基準座標で持つ（縮小率が違っても使える）
+- 推定は縮小画像だけで行うので、1 ページあたりの費用は OCR に比べて小さい
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import cv2
+
+from core.app.constants import (
+    REGISTER_FEATURES,
+    REGISTER_MAX_ROTATION_DEG,
+    REGISTER_MAX_SIDE,
+    REGISTER_MIN_INLIERS,
+    REGISTER_RANSAC_PX,
+    REGISTER_RATIO,
+    REGISTER_SCALE_RANGE,
+)
+
+# サイドカーの形式を変えたら上げる（古いものは読まずに作り直しを促す）
+_TEMPLATE_FORMAT = 1
+
+
+@dataclass
+class TemplateFeatures:
+    """
+    基準画像の特徴点。pts は (N, 2) float32 のフル解像度座標、desc は (N, 32) uint8 の ORB 記述子。
+    """
+    width: int
+    height: int
+    pts: np.ndarray
+    desc: np.ndarray
+
+    @property
+    def digest(self) -> str:
+        h = hashlib.blake2b(digest_size=8)
+        h.update(f"{_TEMPLATE_FORMAT}|{self.width}x{self.height}|".encode("ascii"))
+        h.update(np.ascontiguousarray(self.pts).data)
+        h.update(np.ascontiguousarray(self.desc).data)
+        return h.hexdigest()
+
+
+def _small_gray(img: np.ndarray, max_side: int) -> Tuple[np.ndarray, float]:
+    """
+    長辺 max_side 以下のグレー画像とその倍率（縮小してから色変換する）。
+    """
+    h, w = img.shape[:2]
+    s = 1.0
+    if max(h, w) > max_side > 0:
+        s = float(max_side) / float(max(h, w))
+        img = cv2.resize(img, (max(1, int(w * s)), max(1, int(h * s))), interpolation=cv2.INTER_AREA)
+
+    if img.ndim == 2:
+        return img, s
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY), s
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), s
+
+
+def _features(img: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray], float]:
+    """
+    縮小画像の ORB 特徴点 → (フル解像度の座標, 記述子, 縮小率)
+    """
+    small, s = _small_gray(img, int(REGISTER_MAX_SIDE))
+
+    # ORB オブジェクトはスレッド間で共有しない（生成は軽い）
+    orb = cv2.ORB_create(nfeatures=int(REGISTER_FEATURES))
+    kps, desc = orb.detectAndCompute(small, None)
+
+    if not kps or desc is None:
+        return np.empty((0, 2), np.float32), None, s
+
+    pts = np.array([kp.pt for kp in kps], dtype=np.float32) / np.float32(s)
+    return pts, desc, s
+
+
+def build_template(img: np.ndarray) -> TemplateFeatures:
+    """
+    基準画像（グレー / BGR / BGRA）から特徴点を取る。特徴点が少なすぎる画像は ValueError。
+    """
+    pts, desc, _ = _features(img)
+    if desc is None or len(pts) < int(REGISTER_MIN_INLIERS):
+        raise ValueError("基準画像から十分な特徴点が取れません")
+
+    h, w = img.shape[:2]
+    return TemplateFeatures(width=int(w), height=int(h), pts=pts, desc=desc)
+
+
+def estimate_transform(tmpl: TemplateFeatures, img: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+    """
+    基準座標 → img 座標の 2x3 相似変換と、その一致点数を返す。
+    一致が足りない、または倍率・回転が REGISTER_SCALE_RANGE / REGISTER_MAX_ROTATION_DEG を
+    外れる場合は (None, 一致点数)。
+    """
+    pts, desc, s = _features(img)
+    if desc is None or len(pts) < 2:
+        return None, 0
+
+    matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    pairs = matcher.knnMatch(desc, tmpl.desc, k=2)
+
+    src, dst = [], []
+    for pair in pairs:
+        if len(pair) < 2:
+            continue
+        m, n = pair
+        if m.distance < REGISTER_RATIO * n.distance:
+            src.append(tmpl.pts[m.trainIdx])
+            dst.append(pts[m.queryIdx])
+
+    if len(src) < int(REGISTER_MIN_INLIERS):
+        return None, len(src)
+
+    M, inliers = cv2.estimateAffinePartial2D(
+        np.array(src, dtype=np.float32),
+        np.array(dst, dtype=np.float32),
+        method=cv2.RANSAC,
+        ransacReprojThreshold=float(REGISTER_RANSAC_PX) / s,
+    )
+    n_in = int(inliers.sum()) if inliers is not None else 0
+    if M is None or n_in < int(REGISTER_MIN_INLIERS):
+        return None, n_in
+
+    scale = math.hypot(M[0, 0], M[1, 0])
+    angle = math.degrees(math.atan2(M[1, 0], M[0, 0]))
+    lo, hi = REGISTER_SCALE_RANGE
+    if not (lo <= scale <= hi) or abs(angle) > float(REGISTER_MAX_ROTATION_DEG):
+        return None, n_in
+
+    return M, n_in
+
+
+def scale_transform(sx: float, sy: float) -> np.ndarray:
+    """
+    拡大縮小だけの 2x3 変換（位置合わせできないときの基準サイズ比による補正用）。
+    """
+    return np.array([[sx, 0.0, 0.0], [0.0, sy, 0.0]], dtype=np.float64)
+
+
+def is_identity(M: np.ndarray, tol_px: float, width: int, height: int) -> bool:
+    """
+    width x height の範囲で、どの点も tol_px 未満しか動かない変換なら True。
+    """
+    corners = np.array([[0, 0], [width, 0], [0, height], [width, height]], dtype=np.float64)
+    moved = corners @ M[:, :2].T + M[:, 2]
+    return bool(np.abs(moved - corners).max() < tol_px)
+
+
+def map_rect(M: np.ndarray, x: int, y: int, w: int, h: int) -> Tuple[int, int, int, int]:
+    """
+    矩形の四隅を M で写し、その外接矩形（整数）を返す。
+    回転が小さい前提で、傾いた枠を軸に沿った矩形で切り出す。
+    """
+    corners = np.array([[x, y], [x + w, y], [x, y + h], [x + w, y + h]], dtype=np.float64)
+    moved = corners @ M[:, :2].T + M[:, 2]
+
+    x1, y1 = np.floor(moved.min(axis=0))
+    x2, y2 = np.ceil(moved.max(axis=0))
+    return int(x1), int(y1), max(1, int(x2 - x1)), max(1, int(y2 - y1))
+
+
+# ---------- サイドカー ----------
+
+def save_template(path: str, tmpl: TemplateFeatures) -> None:
+    """
+    path（.npz）へ保存する。一時ファイルに書いてから置き換える。
+    """
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        fmt=np.int32(_TEMPLATE_FORMAT),
+        size=np.array([tmpl.width, tmpl.height], dtype=np.int32),
+        pts=tmpl.pts,
+        desc=tmpl.desc,
+    )
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(tmp, path)
+
+
+def load_template(path: str) -> Optional[TemplateFeatures]:
+    """
+    path から読む。無い・形式が古い・壊れている場合は None。
+    """
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["fmt"]) != _TEMPLATE_FORMAT:
+                return None
+            w, h = (int(v) for v in z["size"])
+            return TemplateFeatures(width=w, height=h, pts=z["pts"].astype(np.float32), desc=z["desc"])
+    except Exception:
+        return None
@@ -5,10 +5,28 @@ OCR package:
 - preprocess: image preprocessing helpers
 - engines: concrete OCR engines (paddle, ...)
 - pipeline: ROI → OCR → postprocess → layout materialization
-- worker: background OCR worker (QThread)
+- stream: staged pipeline with bounded queues (load / preprocess / recognize / postprocess)
+- pool: multi-process execution with ordered results
+- task: OCRTask (input source + preset)
+- timing: per-page / per-ROI stage timings, trace export and cProfile switch
+- hotfolder: continuous processing of an inbox folder (HotFolder)
+- worker: background OCR worker / inbox watcher (QThread)
+
+Qt を使うのは worker だけ。OCRWorker / WatchWorker / EngineLoader は参照されたときに読み込むので、
+パイプラインやプロセスプールの子プロセスは Qt なしで動く。
 """
 
 from .pipeline import ocr_single_image
-from .worker import OCRTask, OCRWorker
+from .task import OCRTask
+
+__all__ = ["ocr_single_image", "OCRTask", "OCRWorker", "WatchWorker", "EngineLoader"]
+
+_LAZY_QT = ("OCRWorker", "WatchWorker", "EngineLoader")
+
+
+def __getattr__(name):
+    if name in _LAZY_QT:
+        from . import worker
+        return getattr(worker, name)
 
-__all__ = ["ocr_single_image", "OCRTask", "OCRWorker"]
\ No newline at end of file
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
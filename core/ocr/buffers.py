@@ -0,0 +1,154 @@
+# path: core/ocr/buffers.py
+# -*- coding: utf-8 -*-
+
+"""
+ROI 前処理用の作業領域。
+
+前処理の各段（グレー化・回転・縮小・フィルタ・拡大・3ch 化）は、ここで確保済みの
+平坦なバッファの先頭をビューとして切り出して書き込む。1 組（ROIBuffers）は
+1 ページ分の ROI 出力を保持し、認識が終わるまで返却しない。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.presets.models import Preset
+from core.app.constants import (
+    UPSCALE_FACTOR,
+    UPSCALE_MODE,
+    ADAPTIVE_SCALE_MAX,
+    ROI_MAX_PIXELS,
+    ROI_BUFFERS_KEEP,
+)
+
+
+def _max_scale() -> float:
+    if UPSCALE_MODE == "adaptive":
+        return max(1.0, float(ADAPTIVE_SCALE_MAX))
+    return max(1.0, float(UPSCALE_FACTOR or 1.0))
+
+
+def roi_capacity(w: int, h: int) -> int:
+    """
+    ROI 1 つの前処理で必要になる最大画素数（拡大後、ROI_MAX_PIXELS で頭打ち）。
+    """
+    area = max(0, int(w)) * max(0, int(h))
+    f = _max_scale()
+
+    n = int(area * f * f)
+    if ROI_MAX_PIXELS:
+        # 丸めで上限をわずかに超える分を見込む
+        n = min(n, int(ROI_MAX_PIXELS) + int((w + h) * f) + 1)
+
+    return max(area, n)
+
+
+def _take(buf: np.ndarray, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    buf の先頭を shape のビューとして返す。足りなければ確保し直す（戻り値の 1 つ目）。
+    ページごとの小さな寸法差で確保し直さないよう、拡張時は少し余裕を持たせる。
+    """
+    n = 1
+    for d in shape:
+        n *= int(d)
+
+    if buf.size < n:
+        buf = np.empty(n + n // 4, dtype=buf.dtype)
+
+    return buf, buf[:n].reshape(shape)
+
+
+class ROIBuffers:
+    """
+    1 ページ分の前処理作業領域。
+    - 作業用 2 面（交互に書き込む）とインク判定用マスク: プリセットの最大 ROI に合わせて確保
+    - ROI ごとの出力（3ch）: 実際の出力寸法で初回に確保し、以後は使い回す。認識器へはこのビューを渡す
+    容量が足りない形状を要求されたら、その場で拡張する。
+    """
+
+    def __init__(self) -> None:
+        self._scratch: List[np.ndarray] = [np.empty(0, np.uint8), np.empty(0, np.uint8)]
+        self._mask = np.empty(0, np.bool_)
+        self._out: List[np.ndarray] = []
+        self._turn = 0
+
+    def reserve(self, preset: Preset) -> "ROIBuffers":
+        """
+        preset の最大 ROI に合わせて作業面を確保する（既に足りていれば何もしない）。
+        """
+        caps = [roi_capacity(r.w, r.h) for r in preset.rois]
+        if not caps:
+            return self
+
+        big = max(caps)
+        area = max(max(0, r.w) * max(0, r.h) for r in preset.rois)
+
+        self._scratch = [_take(b, (big,))[0] for b in self._scratch]
+        self._mask = _take(self._mask, (area,))[0]
+        return self
+
+    def scratch(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        直前に渡した面とは別の作業面を返す（前段の出力を読みつつ書き込めるように交互に使う）。
+        """
+        self._turn ^= 1
+        self._scratch[self._turn], view = _take(self._scratch[self._turn], shape)
+        return view
+
+    def mask(self, shape: Tuple[int, ...]) -> np.ndarray:
+        self._mask, view = _take(self._mask, shape)
+        return view
+
+    def out(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        while len(self._out) <= slot:
+            self._out.append(np.empty(0, np.uint8))
+
+        self._out[slot], view = _take(self._out[slot], shape)
+        return view
+
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._scratch) + self._mask.nbytes + sum(b.nbytes for b in self._out)
+
+
+class BufferPool:
+    """
+    ROIBuffers の貸し出し。空きが無ければ新しく作り、返却分は ROI_BUFFERS_KEEP 組まで保持する。
+    段階パイプラインでは前処理段で借り、認識段の後で返す。
+    """
+
+    def __init__(self, keep: Optional[int] = None) -> None:
+        self._keep = max(0, int(ROI_BUFFERS_KEEP if keep is None else keep))
+        self._free: List[ROIBuffers] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, preset: Preset) -> ROIBuffers:
+        with self._lock:
+            bufs = self._free.pop() if self._free else None
+
+        if bufs is None:
+            bufs = ROIBuffers()
+
+        return bufs.reserve(preset)
+
+    def release(self, bufs: Optional[ROIBuffers]) -> None:
+        if bufs is None:
+            return
+
+        with self._lock:
+            if len(self._free) < self._keep:
+                self._free.append(bufs)
+
+
+_pool = BufferPool()
+
+
+def acquire_buffers(preset: Preset) -> ROIBuffers:
+    return _pool.acquire(preset)
+
+
+def release_buffers(bufs: Optional[ROIBuffers]) -> None:
+    _pool.release(bufs)
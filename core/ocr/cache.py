@@ -0,0 +1,217 @@
+# path: core/ocr/cache.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR 結果の永続キャッシュ（内容アドレス方式）。
+
+- キー: 前処理済み ROI 画素のハッシュ + エンジン名 + エンジン/前処理設定の指紋
+- 保存先: storage_root()/cache/ocr_cache.sqlite3（セッションをまたいで有効）
+- 容量: OCR_CACHE_MAX_MB を超えたら最終利用が古いものから削除（LRU）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from core.app.constants import (
+    PADDLE_LANG,
+    PADDLE_USE_ANGLE_CLS,
+    PAGE_ORIENT_AUTO,
+    OCR_REC_ONLY,
+    UPSCALE_FACTOR,
+    UPSCALE_MODE,
+    TEXT_TARGET_HEIGHT,
+    ROI_MAX_PIXELS,
+    PREPROCESS_BILATERAL,
+    PREPROCESS_BINARIZE,
+    OCR_CACHE_ENABLED,
+    OCR_CACHE_MAX_MB,
+)
+from core.app.app_paths import ensure_dir, storage_root
+
+# キャッシュ形式を変えたら上げる（古いエントリは自然に使われなくなる）
+_CACHE_FORMAT = 3
+
+# 1 エントリあたりの固定オーバーヘッド見積り（キー・索引など）
+_ENTRY_OVERHEAD = 96
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ocr_cache_last_used ON ocr_cache(last_used);
+"""
+
+
+def settings_fingerprint() -> str:
+    """
+    認識結果に影響する設定値をまとめた文字列。値が変わればキーも変わる。
+    """
+    parts = [
+        f"fmt={_CACHE_FORMAT}",
+        f"lang={PADDLE_LANG}",
+        # ページ向きを自動補正するときは ROI ごとの角度分類を使わない（pipeline と同じ条件）
+        f"cls={bool(PADDLE_USE_ANGLE_CLS and not PAGE_ORIENT_AUTO)}",
+        f"rec_only={bool(OCR_REC_ONLY)}",
+        f"upscale={UPSCALE_MODE}:{UPSCALE_FACTOR}:{TEXT_TARGET_HEIGHT}:{ROI_MAX_PIXELS}",
+        f"bilateral={bool(PREPROCESS_BILATERAL)}",
+        f"binarize={bool(PREPROCESS_BINARIZE)}",
+    ]
+    return ";".join(parts)
+
+
+class OCRCache:
+    """
+    SQLite による小さな KV キャッシュ。スレッド・プロセスをまたいで共有できる。
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        if path is None:
+            path = ensure_dir(storage_root() / "cache") / "ocr_cache.sqlite3"
+
+        if max_bytes is None:
+            max_bytes = int(float(OCR_CACHE_MAX_MB) * 1024 * 1024)
+
+        self._path = Path(path)
+        self._max_bytes = max(0, int(max_bytes))
+        self._prefix = settings_fingerprint().encode("utf-8")
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(str(self._path), timeout=10.0, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        except Exception:
+            pass
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def key_for(self, img: np.ndarray, engine: str = "") -> str:
+        """
+        engine はエンジンの登録名（同じ画素でもエンジンが違えば別のキー）。
+        """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(self._prefix)
+        h.update(f"|{engine}".encode("utf-8"))
+        h.update(f"|{img.shape}|{img.dtype}|".encode("ascii"))
+        h.update(np.ascontiguousarray(img).data)
+        return h.hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        found: Dict[str, str] = {}
+        now = time.time()
+
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                cur = self._conn.execute(
+                    f"SELECT key, text FROM ocr_cache WHERE key IN ({marks})", chunk
+                )
+                for k, text in cur:
+                    found[k] = text
+
+            if found:
+                self._conn.executemany(
+                    "UPDATE ocr_cache SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        if not items or self._max_bytes <= 0:
+            return
+
+        now = time.time()
+        rows = [
+            (k, t, _ENTRY_OVERHEAD + len(k) + len(t.encode("utf-8")), now)
+            for k, t in items.items()
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr_cache (key, text, size, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+
+        # 上限の 9 割まで古い順に削る（毎回の削除を避ける）
+        target = int(self._max_bytes * 0.9)
+        cur = self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_used ASC")
+
+        victims = []
+        for k, size in cur:
+            if total <= target:
+                break
+            victims.append((k,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", victims)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+_cache_singleton: Optional[OCRCache] = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[OCRCache]:
+    """
+    プロセス内で共有するキャッシュ。無効設定、または開けなかった場合は None。
+    """
+    global _cache_singleton, _cache_failed
+
+    if not OCR_CACHE_ENABLED or _cache_failed:
+        return None
+
+    with _cache_lock:
+        if _cache_singleton is None:
+            try:
+                _cache_singleton = OCRCache()
+            except Exception:
+                # キャッシュは最適化にすぎないので、開けなければ使わない
+                _cache_failed = True
+                return None
+
+        return _cache_singleton
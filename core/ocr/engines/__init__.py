@@ -2,37 +2,185 @@
 
 from __future__ import annotations
 
-from typing import Protocol
-from core.app.constants import OCR_IMPL
+import gc
+import threading
+from typing import Any, Callable, Dict, List, Optional, Protocol
+from core.app.constants import OCR_IMPL, OCR_RECORD_BASE, OCR_REC_ONLY
 
 
 class OCRReadable(Protocol):
-    def read_text(self, img_rgb_uint8) -> str:
+    def read_text(self, img_rgb_uint8, cls: bool = True) -> str:
         """
         img_rgb_uint8: numpy ndarray, uint8, RGB
+        cls: False なら角度分類を省く（ページ単位で向き補正済み）
         returns recognized string (single line, stripped)
         """
         ...
 
 
-_engine_singleton = None
+class OCRBatchReadable(OCRReadable, Protocol):
+    def read_texts(self, imgs_rgb_uint8: List) -> List[str]:
+        """
+        検出なし（認識のみ）で複数 ROI を一括認識する任意拡張。
+        returns texts in the same order as the input
+        """
+        ...
+
+
+class OCROrientable(Protocol):
+    def classify_upside_down(self, imgs_rgb_uint8: List) -> List[bool]:
+        """
+        ページ向き推定用の任意拡張。各画像が 180 度回っていれば True。
+        """
+        ...
+
+
+# 名前 -> factory(引数, **opts)。引数は "replay:記録ファイル" の ":" より後（無ければ ""）
+EngineFactory = Callable[..., Any]
+_factories: Dict[str, EngineFactory] = {}
+
+# 指定（"paddle" / "replay:..." など）ごとの生成済みエンジン
+_engines: Dict[str, Any] = {}
+# 生成・解放の排他（バックグラウンド読込と OCR 実行が同時に get_engine しても 1 回だけ生成）
+_engine_lock = threading.RLock()
+
+
+def register_engine(name: str, factory: EngineFactory, replace: bool = False) -> None:
+    """
+    エンジンを名前で登録する。factory(arg, **opts) は OCRReadable を満たすオブジェクトを返す。
+    - arg: 指定 "name:arg" の ":" より後（記録ファイルのパスなど。無ければ ""）
+    - opts: get_engine() に渡されたキーワード（cpu_threads など）。使わないものは無視してよい
+    結果を OCR キャッシュに入れてはいけないエンジンは属性 cacheable = False を持つ。
+    """
+    name = str(name or "").strip().lower()
+    if not name or ":" in name:
+        raise ValueError(f"エンジン名が不正です: {name!r}")
+
+    with _engine_lock:
+        if name in _factories and not replace:
+            raise ValueError(f"エンジン「{name}」は登録済みです")
+        _factories[name] = factory
+
+
+def engine_names() -> List[str]:
+    with _engine_lock:
+        return sorted(_factories)
+
+
+def _normalize_spec(spec: Optional[str]) -> str:
+    spec = str(spec or OCR_IMPL or "paddle").strip()
+    name, sep, arg = spec.partition(":")
+    return name.strip().lower() + (sep + arg.strip() if sep else "")
+
+
+def check_engine(spec: Optional[str] = None) -> str:
+    """
+    spec の名前が登録済みか確かめ、正規化した指定を返す（エンジンは生成しない）。未登録なら ValueError。
+    """
+    spec = _normalize_spec(spec)
+    name = spec.partition(":")[0]
+    with _engine_lock:
+        if name not in _factories:
+            raise ValueError(f"未登録の OCR エンジンです: {name}（登録済み: {', '.join(engine_names())}）")
+    return spec
+
+
+def _create_engine(spec: str, **opts):
+    name, _, arg = check_engine(spec).partition(":")
+    return _factories[name](arg, **opts)
+
+
+def get_engine(spec: Optional[str] = None, **opts):
+    """
+    spec（"paddle" / "null" / "replay:記録ファイル" / "record:記録ファイル"）のエンジンを返す。
+    省略時は constants.OCR_IMPL。指定ごとに 1 度だけ生成して使い回す。
+    opts は初回生成時のみエンジンの factory へ渡す（例: cpu_threads）
+    """
+    spec = _normalize_spec(spec)
+
+    with _engine_lock:
+        engine = _engines.get(spec)
+        if engine is None:
+            engine = _create_engine(spec, **opts)
+            _engines[spec] = engine
+
+        return engine
+
+
+def is_engine_loaded(spec: Optional[str] = None) -> bool:
+    return _normalize_spec(spec) in _engines
+
+
+def release_engine(spec: Optional[str] = None) -> None:
+    """
+    生成済みのエンジンを破棄する（spec 省略時はすべて）。次回の get_engine() で作り直される。
+    """
+    with _engine_lock:
+        if spec is None:
+            if not _engines:
+                return
+            _engines.clear()
+        elif _engines.pop(_normalize_spec(spec), None) is None:
+            return
+
+        gc.collect()
 
 
-def get_engine():
+def reload_engine(spec: Optional[str] = None, **opts):
     """
-    Select OCR engine by constants.OCR_IMPL
+    設定変更後などにエンジンを作り直して返す。
     """
-    global _engine_singleton
+    with _engine_lock:
+        release_engine(spec)
+        return get_engine(spec, **opts)
 
-    if _engine_singleton is not None:
-        return _engine_singleton
 
-    if OCR_IMPL == "paddle":
-        from .paddle import PaddleEngine
-        _engine_singleton = PaddleEngine()
-        return _engine_singleton
+# ---------- 組み込みエンジン ----------
 
-    # 既定: paddle
+def _paddle(arg: str, **opts):
     from .paddle import PaddleEngine
-    _engine_singleton = PaddleEngine()
-    return _engine_singleton
+    return PaddleEngine(cpu_threads=opts.get("cpu_threads"))
+
+
+def _null(arg: str, **opts):
+    from .null import NullEngine
+    return NullEngine(arg)
+
+
+def _replay(arg: str, **opts):
+    from .replay import ReplayEngine
+    return ReplayEngine(arg)
+
+
+def _record(arg: str, **opts):
+    from .replay import RecordEngine
+
+    base = OCR_RECORD_BASE
+    if _normalize_spec(base).split(":", 1)[0] == "record":
+        raise ValueError("record エンジンの記録元に record は指定できません")
+    return RecordEngine(arg, get_engine(base, **opts))
+
+
+register_engine("paddle", _paddle)
+register_engine("null", _null)
+register_engine("replay", _replay)
+register_engine("record", _record)
+
+
+def warm_up(engine=None) -> None:
+    """
+    ダミーの ROI で 1 回推論し、初回呼び出し時の推論グラフ構築などを前倒しで済ませる。
+    """
+    import numpy as np
+
+    eng = engine if engine is not None else get_engine()
+
+    # 白地に縦線を並べた 1 行分のダミー
+    img = np.full((48, 192, 3), 255, dtype=np.uint8)
+    img[12:36, 16:176:8] = 0
+
+    if OCR_REC_ONLY and hasattr(eng, "read_texts"):
+        eng.read_texts([img])
+        return
+
+    eng.read_text(img)
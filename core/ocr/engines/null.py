@@ -0,0 +1,29 @@
+# path: core/ocr/engines/null.py
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from typing import List
+
+
+class NullEngine:
+    """
+    何も認識しないエンジン（すべて空文字）。モデルが無い環境でも動き、
+    OCR 以外（読込・前処理・書出し）だけを全速で測るときに使う。
+    結果は OCR キャッシュに入れない。
+    """
+
+    name = "null"
+    cacheable = False
+
+    def __init__(self, text: str = "") -> None:
+        self._text = text
+
+    def read_text(self, img_rgb_uint8, cls: bool = True) -> str:
+        return self._text
+
+    def read_texts(self, imgs_rgb_uint8: List) -> List[str]:
+        return [self._text] * len(imgs_rgb_uint8)
+
+    def classify_upside_down(self, imgs_rgb_uint8: List) -> List[bool]:
+        return [False] * len(imgs_rgb_uint8)
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 import numpy as np
 
 from paddleocr import PaddleOCR
@@ -11,26 +11,47 @@ from paddleocr import PaddleOCR
 from core.app.constants import (
     PADDLE_LANG,
     PADDLE_USE_ANGLE_CLS,
+    OCR_REC_BATCH_SIZE,
 )
 
 
+def _rec_text(rec) -> str:
+    """
+    認識結果 (text, score) から text を取り出す。形式が崩れていれば空文字。
+    """
+    try:
+        return str(rec[0] or "").strip()
+    except Exception:
+        return ""
+
+
 class PaddleEngine:
     """
     シンプルな PaddleOCR ラッパ。
     1インスタンスをシングルトンで使い回す前提。
     """
 
-    def __init__(self) -> None:
+    name = "paddle"
+
+    def __init__(self, cpu_threads: Optional[int] = None) -> None:
+        kwargs = {}
+        if cpu_threads:
+            # 複数プロセスで動かすときのスレッド過剰割当を防ぐ
+            kwargs["cpu_threads"] = max(1, int(cpu_threads))
+
         self._ocr = PaddleOCR(
             lang=PADDLE_LANG,
             use_angle_cls=bool(PADDLE_USE_ANGLE_CLS),
+            rec_batch_num=max(1, int(OCR_REC_BATCH_SIZE)),
+            **kwargs,
         )
 
-    def read_text(self, img_rgb_uint8: np.ndarray) -> str:
+    def read_text(self, img_rgb_uint8: np.ndarray, cls: bool = True) -> str:
         """
         img_rgb_uint8: RGB, uint8, HxWx3
+        cls=False なら角度分類を省く（ページ単位で向きを補正済みのとき）
         """
-        res = self._ocr.ocr(img_rgb_uint8, cls=True)
+        res = self._ocr.ocr(img_rgb_uint8, cls=bool(cls))
 
         text = ""
         if res and res[0]:
@@ -38,3 +59,58 @@ class PaddleEngine:
             text = "".join(parts)
 
         return text.strip()
+
+    def read_texts(self, imgs: List[np.ndarray]) -> List[str]:
+        """
+        検出を省略し、ROI 画像群を認識器へ一括で渡す（1 ROI = 1 行前提）。
+        戻り値は imgs と同じ順序・同じ長さ。空画像は "" を返す。
+        """
+        out = [""] * len(imgs)
+
+        idxs = [i for i, im in enumerate(imgs) if im is not None and im.size > 0]
+        if not idxs:
+            return out
+
+        batch = [imgs[i] for i in idxs]
+
+        recognizer = getattr(self._ocr, "text_recognizer", None)
+        if recognizer is None:
+            # 旧版など認識器を直接触れない場合は 1 枚ずつ rec のみで読む
+            for i, im in zip(idxs, batch):
+                out[i] = self._read_rec_only(im)
+            return out
+
+        rec_res, _ = recognizer(batch)
+
+        for i, rec in zip(idxs, rec_res):
+            out[i] = _rec_text(rec)
+
+        return out
+
+    def classify_upside_down(self, imgs: List[np.ndarray]) -> List[bool]:
+        """
+        角度分類器で各画像が 180 度回っているかを一括判定する。
+        分類器が無い場合（use_angle_cls=False）はすべて False。
+        """
+        classifier = getattr(self._ocr, "text_classifier", None)
+        if classifier is None or not imgs:
+            return [False] * len(imgs)
+
+        # 分類器は入力リストの画像を回転して返すので、呼び出し側の配列は渡さない
+        _, cls_res, _ = classifier([im.copy() for im in imgs])
+
+        out = []
+        for r in cls_res:
+            try:
+                out.append(str(r[0]) == "180")
+            except Exception:
+                out.append(False)
+        return out
+
+    def _read_rec_only(self, img_rgb_uint8: np.ndarray) -> str:
+        res = self._ocr.ocr(img_rgb_uint8, det=False, cls=False)
+
+        if not res or not res[0]:
+            return ""
+
+        return _rec_text(res[0][0])
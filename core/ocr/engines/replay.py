@@ -0,0 +1,140 @@
+# path: core/ocr/engines/replay.py
+# -*- coding: utf-8 -*-
+
+"""
+認識結果の記録（record）と再生（replay）。
+
+- RecordEngine: 別のエンジンで認識しつつ、ROI 画像のハッシュと結果を JSON Lines に追記する
+- ReplayEngine: 記録から結果を返す（エンジンもモデルも使わない）。記録に無い ROI は空文字
+キーは前処理済み ROI 画素のハッシュなので、入力・前処理の設定が同じなら同じ結果が返る
+（前処理を変えると一致しなくなる）。ページ向きの判定は再生しない（常に「回っていない」）。
+どちらも結果を OCR キャッシュには入れない（記録漏れ・記録の混入を防ぐ）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def image_key(img: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.shape}|{img.dtype}|".encode("ascii"))
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+
+class RecordEngine:
+    """
+    base で認識し、結果を path へ追記する。複数プロセスから同じ path へ書いてよい（1 行ずつ追記）。
+    """
+
+    name = "record"
+    cacheable = False
+
+    def __init__(self, path: str, base: Any) -> None:
+        if not path:
+            raise ValueError("record エンジンには記録ファイルの指定が必要です（record:パス）")
+
+        self.path = path
+        self.base = base
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+
+    def _record(self, imgs: List[np.ndarray], texts: List[str]) -> None:
+        lines = "".join(
+            json.dumps({"key": image_key(im), "text": t}, ensure_ascii=False) + "\n"
+            for im, t in zip(imgs, texts)
+            if im is not None and im.size > 0
+        )
+        if not lines:
+            return
+
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+                f.write(lines)
+            self.recorded += len(texts)
+
+    def read_text(self, img_rgb_uint8, cls: bool = True) -> str:
+        text = self.base.read_text(img_rgb_uint8, cls=cls)
+        self._record([img_rgb_uint8], [text])
+        return text
+
+    def read_texts(self, imgs_rgb_uint8: List) -> List[str]:
+        if hasattr(self.base, "read_texts"):
+            texts = list(self.base.read_texts(imgs_rgb_uint8))
+        else:
+            texts = [self.base.read_text(im, cls=False) for im in imgs_rgb_uint8]
+        self._record(imgs_rgb_uint8, texts)
+        return texts
+
+    def classify_upside_down(self, imgs_rgb_uint8: List) -> List[bool]:
+        if hasattr(self.base, "classify_upside_down"):
+            return self.base.classify_upside_down(imgs_rgb_uint8)
+        return [False] * len(imgs_rgb_uint8)
+
+
+class ReplayEngine:
+    """
+    RecordEngine の記録から結果を返す。読込みは生成時に 1 回（同じキーは後の行が有効）。
+    hits / misses で一致した ROI 数を数える。
+    """
+
+    name = "replay"
+    cacheable = False
+
+    def __init__(self, path: str) -> None:
+        if not path:
+            raise ValueError("replay エンジンには記録ファイルの指定が必要です（replay:パス）")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"記録ファイルがありません: {path}")
+
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._texts: Dict[str, str] = {}
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    e = json.loads(line)
+                except Exception:
+                    # 書込み途中で切れた行などは読み飛ばす
+                    continue
+                if e.get("key"):
+                    self._texts[e["key"]] = str(e.get("text", ""))
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _lookup(self, img: np.ndarray) -> str:
+        if img is None or img.size == 0:
+            return ""
+
+        text = self._texts.get(image_key(img))
+        if text is None:
+            self.misses += 1
+            return ""
+
+        self.hits += 1
+        return text
+
+    def read_text(self, img_rgb_uint8, cls: bool = True) -> str:
+        return self._lookup(img_rgb_uint8)
+
+    def read_texts(self, imgs_rgb_uint8: List) -> List[str]:
+        return [self._lookup(im) for im in imgs_rgb_uint8]
+
+    def classify_upside_down(self, imgs_rgb_uint8: List) -> List[bool]:
+        return [False] * len(imgs_rgb_uint8)
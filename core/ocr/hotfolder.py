@@ -0,0 +1,285 @@
+# path: core/ocr/hotfolder.py
+# -*- coding: utf-8 -*-
+
+"""
+ホットフォルダ（受信フォルダ）の連続処理。GUI / CLI 共通で Qt には依存しない。
+
+スキャナが受信フォルダへ置いたファイルを、
+1. 書込みが終わる（サイズと更新時刻が WATCH_STABLE_SEC 変わらない）のを待って
+2. 常駐する段階パイプライン（エンジンは生成済みのものを使い回す）へ流し
+3. 行を CSV へ追記し、確実に書けてから done / failed フォルダへ移す
+ジョブ記録で処理済みの内容のファイルは OCR せずに done へ移す。
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.app.constants import (
+    WATCH_DONE_DIR,
+    WATCH_FAILED_DIR,
+    WATCH_POLL_MS,
+    WATCH_STABLE_SEC,
+)
+from core.image.io_utils import iter_image_files
+from core.image.loader import load_page
+from core.image.pages import iter_pages
+from .stream import run_staged
+from .task import OCRTask
+
+# on_file(元のパス, 成否, 行数, 移動先（移せなければ空）, エラー)
+FileCallback = Callable[[str, bool, int, str, str], None]
+
+
+def move_to(path: str, folder: str) -> str:
+    """
+    path を folder へ移す。同名があれば "name_1.ext" のように番号を付ける。戻り値は移動先。
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    base, ext = os.path.splitext(os.path.basename(path))
+    dst = os.path.join(folder, base + ext)
+    n = 1
+    while os.path.exists(dst):
+        dst = os.path.join(folder, f"{base}_{n}{ext}")
+        n += 1
+
+    shutil.move(path, dst)
+    return dst
+
+
+class InboxScanner:
+    """
+    受信フォルダ直下の画像を調べ、書込みが終わったものを返す（サブフォルダは見ない）。
+    (サイズ, 更新時刻) が stable_sec の間変わらず、読込みで開けるファイルを「完了」とみなす。
+    一度返したファイルは forget() されるまで返さない。
+    """
+
+    def __init__(self, inbox: str, stable_sec: float = WATCH_STABLE_SEC) -> None:
+        self.inbox = inbox
+        self.stable_sec = max(0.0, float(stable_sec))
+
+        # path -> ((サイズ, mtime), 最後に変化を見た時刻)
+        self._seen: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._taken: set = set()
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        ready: List[str] = []
+        present = set()
+
+        for p in iter_image_files([self.inbox], recursive=False):
+            present.add(p)
+            if p in self._taken:
+                continue
+
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+
+            prev = self._seen.get(p)
+            if prev is None or prev[0] != sig:
+                self._seen[p] = (sig, now)
+                continue
+
+            if sig[0] <= 0 or now - prev[1] < self.stable_sec:
+                continue
+
+            if not _can_open(p):
+                # 書込み側がまだ掴んでいる（Windows の排他など）
+                continue
+
+            del self._seen[p]
+            self._taken.add(p)
+            ready.append(p)
+
+        # 消えたファイルは忘れる（移動済みのものも含む）
+        for p in list(self._seen):
+            if p not in present:
+                del self._seen[p]
+
+        return ready
+
+    def forget(self, path: str) -> None:
+        self._taken.discard(path)
+        self._seen.pop(path, None)
+
+
+def _can_open(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.read(1)
+    except OSError:
+        return False
+    return True
+
+
+class HotFolder:
+    """
+    inbox を見張り、届いたファイルを OCR して writer（CSVStreamWriter、追記）へ書き足す。
+    - run(should_stop) が処理ループ（呼び出し元スレッドでブロックする）
+    - wake() で次の走査を前倒しする（ファイル監視の通知から呼ぶ。呼ばなくても WATCH_POLL_MS ごとに走査）
+    - on_file(path, ok, rows, 移動先, error) はファイル単位で、移動まで済んでから呼ばれる
+    - engine はエンジン指定（core.ocr.engines.get_engine。省略時は OCR_IMPL）
+    """
+
+    def __init__(
+        self,
+        inbox: str,
+        preset: Any,
+        writer: Any,
+        on_file: Optional[FileCallback] = None,
+        on_log: Optional[Callable[[str], None]] = None,
+        done_dir: Optional[str] = None,
+        failed_dir: Optional[str] = None,
+        stable_sec: float = WATCH_STABLE_SEC,
+        engine: Optional[str] = None,
+    ) -> None:
+        self.inbox = inbox
+        self.engine = engine
+        self.preset = preset
+        self.writer = writer
+        self.done_dir = done_dir or os.path.join(inbox, WATCH_DONE_DIR)
+        self.failed_dir = failed_dir or os.path.join(inbox, WATCH_FAILED_DIR)
+
+        self._on_file = on_file
+        self._on_log = on_log
+        self._scanner = InboxScanner(inbox, stable_sec)
+        self._wake = threading.Event()
+
+        # path -> {"ok", "rows", "error"}（複数ページ文書の途中経過）
+        self._files: Dict[str, Dict[str, Any]] = {}
+
+        self.files_done = 0
+        self.files_failed = 0
+        self._count_lock = threading.Lock()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _log(self, msg: str) -> None:
+        if self._on_log is not None:
+            self._on_log(msg)
+
+    # ---------- 入力 ----------
+
+    def _tasks(self, stopped: Callable[[], bool]) -> Iterator[OCRTask]:
+        """
+        届いたファイルをページ単位のタスクにして返し続ける。stopped() まで終わらない。
+        """
+        interval = max(0.05, float(WATCH_POLL_MS) / 1000.0)
+
+        while not stopped():
+            try:
+                ready = self._scanner.poll()
+            except Exception as e:
+                self._log(f"[error] 受信フォルダを読めません: {self.inbox} / {e}")
+                ready = []
+
+            for path in ready:
+                if stopped():
+                    return
+
+                tasks = [OCRTask(source=ref, preset=self.preset) for ref in iter_pages(path)]
+                if self._already_done(tasks):
+                    self._finish(path, True, 0, "", note="処理済み")
+                    continue
+
+                self._files[path] = {"ok": True, "rows": 0, "error": ""}
+                for t in tasks:
+                    yield t
+
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def _already_done(self, tasks: List[OCRTask]) -> bool:
+        journal = getattr(self.writer, "journal", None)
+        if journal is None or not tasks:
+            return False
+
+        try:
+            return all(journal.is_done(t.content_digest(), t.preset) for t in tasks)
+        except Exception:
+            return False
+
+    # ---------- 結果 ----------
+
+    def _on_result(self, idx: int, t: OCRTask, res: Dict[str, Any]) -> None:
+        from core.csvio.journal import make_entry
+
+        rows = res["rows"] if res["ok"] else []
+        record = {
+            "name": t.display_name,
+            "src_path": t.src_path,
+            "preset": getattr(t.preset, "name", ""),
+            "fields": res.get("fields", []),
+            "ok": bool(res["ok"]),
+        }
+        entry = None
+        if getattr(self.writer, "journal", None) is not None and t.content_digest():
+            entry = make_entry(t.content_key, t, res["ok"], len(rows), res["error"])
+
+        self.writer.write(rows, record, entry)
+
+        state = self._files.setdefault(t.src_path, {"ok": True, "rows": 0, "error": ""})
+        state["rows"] += len(rows)
+        if not res["ok"]:
+            state["ok"] = False
+            state["error"] = state["error"] or res["error"]
+
+        # ページは順に届くので、最後のページで文書 1 件分が終わる
+        ref = t.source
+        if getattr(ref, "index", 0) + 1 >= getattr(ref, "count", 1):
+            self._files.pop(t.src_path, None)
+            # 行が確実に CSV へ残ってから入力を移す
+            self.writer.sync()
+            self._finish(t.src_path, state["ok"], state["rows"], state["error"])
+
+    def _finish(self, path: str, ok: bool, rows: int, error: str, note: str = "") -> None:
+        folder = self.done_dir if ok else self.failed_dir
+        try:
+            dst = move_to(path, folder)
+            self._scanner.forget(path)
+        except Exception as e:
+            # 移せなかったファイルは forget しない（同じファイルを繰り返し処理しない）
+            dst = ""
+            self._log(f"[error] ファイルを移動できません: {path} -> {folder} / {e}")
+
+        # 処理済みの移動は読込み段から、それ以外は書出し段から呼ばれる
+        with self._count_lock:
+            if ok:
+                self.files_done += 1
+            else:
+                self.files_failed += 1
+
+        if note:
+            self._log(f"{note}: {os.path.basename(path)}")
+
+        if self._on_file is not None:
+            self._on_file(path, ok, rows, dst, error)
+
+    # ---------- ループ ----------
+
+    def run(self, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """
+        should_stop() が True になるまで受信フォルダを処理し続ける。
+        止めるときは should_stop を True にしてから wake() すると待たずに抜ける。
+        処理中のファイルは流し切ってから戻る（移動まで済ませる）。
+        """
+        def stopped() -> bool:
+            return bool(should_stop is not None and should_stop())
+
+        os.makedirs(self.inbox, exist_ok=True)
+
+        run_staged(
+            self._tasks(stopped),
+            load=lambda t: load_page(t.source),
+            on_result=self._on_result,
+            engine=self.engine,
+        )
@@ -2,73 +2,441 @@
 
 from __future__ import annotations
 
-from typing import List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+import cv2
 
 from core.presets.models import Preset, ROI
+from core.presets.store import load_template
+from core.image.register import estimate_transform, is_identity, map_rect, scale_transform
 from core.csvio.layout import LayoutPlan
+from core.image.loader import load_page
 from core.ocr.preprocess import (
-    qimage_to_bgr,
-    bgr_to_rgb,
     to_gray,
     bilateral,
     binarize,
-    upscale,
     rotate_if_needed,
     crop_to_roi,
+    analyze_ink,
+    trim_to_bbox,
+    estimate_text_height,
+    roi_scale_factor,
+    resize_by,
+    downscale_gray,
+    is_quarter_turned,
 )
 from core.ocr.engines import get_engine
+from core.ocr.cache import get_cache
+from core.ocr.buffers import ROIBuffers, acquire_buffers, release_buffers
+from core.ocr.timing import span
+from core.app.constants import (
+    OCR_IMPL,
+    OCR_REC_ONLY,
+    PAGE_ORIENT_AUTO,
+    PAGE_ORIENT_MAX_SIDE,
+    PAGE_ORIENT_SAMPLES,
+    REGISTER_ENABLED,
+    PREPROCESS_REUSE_BUFFERS,
+    INK_SKIP_BLANK,
+    INK_TRIM,
+    INK_MIN_PIXELS,
+)
+
+# ポストプロセス（安全系。列別ルールは行へ展開してから適用）
+from core.postprocess import apply_rules_to_row, normalize_global
+
+
+def _count(stats: Optional[Dict[str, Any]], key: str, n: int = 1) -> None:
+    if stats is None:
+        return
+    stats[key] = stats.get(key, 0) + n
+
+
+def _prepare_roi_image(
+    bgr: np.ndarray,
+    roi: ROI,
+    stats: Optional[Dict[str, Any]] = None,
+    bufs: Optional[ROIBuffers] = None,
+    slot: int = 0,
+) -> Optional[np.ndarray]:
+    """
+    ページ(BGR/BGRA/グレー) → ROI抽出（ビュー）→ グレー化 → 回転 → インク解析 → 拡大縮小 / 前処理 → 3ch
+    bufs を渡すと各段は作業領域へ書き込み、戻り値は bufs の ROI 出力（slot 番）のビューになる。
+    この場合、戻り値は bufs を返却するまでの間だけ有効。
+    インクが無い（空欄）と判定した ROI は None を返す（OCR しない）。
+    """
+    with span(stats, "crop", slot):
+        patch = crop_to_roi(bgr, roi.x, roi.y, roi.w, roi.h)
+
+    if patch.size == 0:
+        _count(stats, "ink_blank")
+        return None
+
+    with span(stats, "preprocess", slot):
+        return _preprocess_patch(patch, roi, stats, bufs, slot)
+
 
-# ポストプロセス（安全系と列別ルール）
-# 実装は後続の core/postprocess.py 側に用意
-from core.postprocess import normalize_global, apply_rules_to_row
+def _preprocess_patch(
+    patch: np.ndarray,
+    roi: ROI,
+    stats: Optional[Dict[str, Any]],
+    bufs: Optional[ROIBuffers],
+    slot: int,
+) -> Optional[np.ndarray]:
+    scratch = bufs.scratch if bufs is not None else None
 
+    # 回転は 1ch にしてから行う（画素数は同じで転送量が 1/3〜1/4）
+    gray = to_gray(patch, scratch)
+    gray = rotate_if_needed(gray, roi.orientation, scratch)
 
-def _prepare_roi_image(bgr: np.ndarray, roi: ROI) -> np.ndarray:
+    if INK_SKIP_BLANK or INK_TRIM:
+        mask = bufs.mask(gray.shape) if bufs is not None else None
+        ink, _, bbox = analyze_ink(gray, mask)
+
+        # 面積比では判定しない（広い欄に書かれた「1」1 文字も残す）
+        if INK_SKIP_BLANK and (bbox is None or ink < INK_MIN_PIXELS):
+            _count(stats, "ink_blank")
+            return None
+
+        if INK_TRIM and bbox is not None:
+            trimmed = trim_to_bbox(gray, bbox)
+            if trimmed.shape != gray.shape:
+                _count(stats, "ink_trimmed")
+                _count(stats, "ink_pixels_saved", gray.size - trimmed.size)
+                gray = trimmed
+
+    # 文字高さを目標値へ合わせる倍率（縮小はフィルタ前、拡大はフィルタ後に行い画素数を抑える）
+    mask = bufs.mask(gray.shape) if bufs is not None else None
+    f = roi_scale_factor(gray.shape, estimate_text_height(gray, mask))
+    if f < 1.0:
+        gray = resize_by(gray, f, scratch)
+
+    gray = bilateral(gray, scratch)
+    gray = binarize(gray, scratch)
+
+    if f > 1.0:
+        gray = resize_by(gray, f, scratch)
+
+    # 認識器は 3ch を受け付ける。グレーを複製するだけなので BGR/RGB の区別は不要
+    dst = bufs.out(slot, gray.shape[:2] + (3,)) if bufs is not None else None
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB, dst=dst)
+
+
+def _orientation_samples(gray_small: np.ndarray, preset: Preset, s: float) -> List[np.ndarray]:
     """
-    BGR → ROI抽出 → 回転 → 前処理 → RGB
+    上下判定用に、縮小ページからインクの多い ROI を最大 PAGE_ORIENT_SAMPLES 個切り出す。
     """
-    patch = crop_to_roi(bgr, roi.x, roi.y, roi.w, roi.h)
-    patch = rotate_if_needed(patch, roi.orientation)
+    scored = []
+    for roi in preset.rois:
+        if roi.orientation != "auto":
+            continue
 
-    gray = to_gray(patch)
-    gray = bilateral(gray)
-    gray = binarize(gray)
+        patch = crop_to_roi(
+            gray_small,
+            int(roi.x * s), int(roi.y * s),
+            max(1, int(roi.w * s)), max(1, int(roi.h * s)),
+        )
+        if patch.size == 0:
+            continue
 
-    proc = gray
-    proc = upscale(proc)
+        ink, _, bbox = analyze_ink(patch)
+        if bbox is None or ink < INK_MIN_PIXELS:
+            continue
 
-    if proc.ndim == 2:
-        proc = np.stack([proc, proc, proc], axis=2)
+        scored.append((ink, trim_to_bbox(patch, bbox)))
 
-    rgb = bgr_to_rgb(proc)
-    return rgb
+    scored.sort(key=lambda x: x[0], reverse=True)
 
+    return [
+        cv2.cvtColor(np.ascontiguousarray(p), cv2.COLOR_GRAY2RGB)
+        for _, p in scored[:max(1, int(PAGE_ORIENT_SAMPLES))]
+    ]
 
-def ocr_single_image(qimage, preset: Preset) -> List[List[str]]:
+
+def orient_page(
+    bgr: np.ndarray,
+    preset: Preset,
+    engine=None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> np.ndarray:
     """
-    1画像からプリセット順でフィールドを読み、レイアウトに従って行へ展開して返す。
-    - ROIごとの値は normalize_global() を通す
-    - 展開後の行は apply_rules_to_row() で列別ルールを適用
+    ページ単位の向き補正。orientation="auto" の ROI があるときだけ行う。
+    1) 縮小画像で 90/270 度回りかを判定（基準サイズ or 投影プロファイル）
+    2) エンジンが角度分類を持てば、数個の ROI をまとめて 1 回分類し上下を判定
+    回転が必要ならページを 1 回だけ回して返す。
     """
-    engine = get_engine()
+    if not PAGE_ORIENT_AUTO:
+        return bgr
 
-    bgr = qimage_to_bgr(qimage)
+    if not any(r.orientation == "auto" for r in preset.rois):
+        return bgr
 
-    fields: List[str] = []
-    for roi in preset.rois:
-        rgb = _prepare_roi_image(bgr, roi)
-        text = engine.read_text(rgb)
-        text = normalize_global(text)
-        fields.append(text)
+    small, s = downscale_gray(bgr, PAGE_ORIENT_MAX_SIDE)
 
-    lp = LayoutPlan(preset.layout_text or "")
-    rows = lp.materialize(fields)
+    angle = 0
+    if is_quarter_turned(small, preset.image_w, preset.image_h):
+        angle = 90
+        small = rotate_if_needed(small, "90")
 
-    # 列ごとの追加ルール適用（constants.PP_BY_COL を参照）
-    out_rows = []
-    for row in rows:
-        out_rows.append(apply_rules_to_row(row))
+    if engine is not None and hasattr(engine, "classify_upside_down"):
+        samples = _orientation_samples(small, preset, s)
+        if samples:
+            flags = engine.classify_upside_down(samples)
+            if sum(1 for f in flags if f) * 2 > len(flags):
+                angle = (angle + 180) % 360
 
-    return out_rows
+    if angle == 0:
+        return bgr
+
+    _count(stats, "page_rotated")
+    return rotate_if_needed(bgr, str(angle))
+
+
+def _size_transform(bgr: np.ndarray, preset: Preset) -> Optional[np.ndarray]:
+    """
+    位置合わせできないときの補正。ページと基準の縦横比が同じ（2% 以内）でサイズだけ違えば、
+    解像度違いとみなして ROI を拡大縮小する。
+    """
+    iw, ih = int(preset.image_w or 0), int(preset.image_h or 0)
+    h, w = bgr.shape[:2]
+    if iw <= 0 or ih <= 0 or (w == iw and h == ih):
+        return None
+
+    sx, sy = float(w) / iw, float(h) / ih
+    if abs(sx - sy) > 0.02 * max(sx, sy):
+        return None
+
+    return scale_transform(sx, sy)
+
+
+def register_rois(
+    bgr: np.ndarray,
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+) -> List[ROI]:
+    """
+    ページを様式（プリセットの基準画像）に位置合わせし、ページ上の ROI を返す。
+    - 基準の特徴点（サイドカー）があれば縮小画像で相似変換を推定して ROI を写す
+    - 無い・推定できなければ基準サイズとの比で拡大縮小だけ補正する
+    - どちらも要らなければ preset.rois をそのまま返す
+    stats には registered / register_failed / register_ms（推定にかかった時間の合計）を加算する。
+    """
+    if not REGISTER_ENABLED or not preset.rois:
+        return preset.rois
+
+    M = None
+    tmpl = load_template(preset)
+    if tmpl is not None:
+        t0 = time.perf_counter()
+        M, _ = estimate_transform(tmpl, bgr)
+        _count(stats, "register_ms", (time.perf_counter() - t0) * 1000.0)
+        _count(stats, "registered" if M is not None else "register_failed")
+
+    if M is None:
+        M = _size_transform(bgr, preset)
+        if M is None:
+            return preset.rois
+
+    h, w = bgr.shape[:2]
+    if is_identity(M, 1.0, w, h):
+        return preset.rois
+
+    return [
+        ROI(*map_rect(M, r.x, r.y, r.w, r.h), orientation=r.orientation)
+        for r in preset.rois
+    ]
+
+
+def prepare_rois(
+    bgr: np.ndarray,
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+    engine=None,
+    buffers: Optional[ROIBuffers] = None,
+) -> List[Optional[np.ndarray]]:
+    """
+    ページの向きを補正して様式に位置合わせし、プリセット順に ROI を切り出して前処理済みの 3ch 画像を返す。
+    空欄と判定した ROI は None。engine は向き推定（上下判定）にのみ使う。
+    buffers（acquire_buffers() で借りたもの）を渡すと、結果はその中のビューになる。
+    """
+    with span(stats, "orient"):
+        bgr = orient_page(bgr, preset, engine, stats)
+    with span(stats, "register"):
+        rois = register_rois(bgr, preset, stats)
+    return [_prepare_roi_image(bgr, roi, stats, buffers, i) for i, roi in enumerate(rois)]
+
+
+def _recognize_uncached(
+    engine,
+    imgs: List[np.ndarray],
+    stats: Optional[Dict[str, Any]] = None,
+    slots: Optional[List[int]] = None,
+) -> List[str]:
+    """
+    slots は imgs の各画像の ROI 番号（計測用）。一括認識はページ単位の 1 区間として記録する。
+    """
+    if not imgs:
+        return []
+
+    if OCR_REC_ONLY and hasattr(engine, "read_texts"):
+        with span(stats, "recognize"):
+            return list(engine.read_texts(imgs))
+
+    slots = slots if slots is not None else list(range(len(imgs)))
+    texts = []
+    for img, slot in zip(imgs, slots):
+        with span(stats, "recognize", slot):
+            # 向きをページ単位で補正済みなら ROI ごとの角度分類は省く
+            if PAGE_ORIENT_AUTO:
+                texts.append(engine.read_text(img, cls=False))
+            else:
+                texts.append(engine.read_text(img))
+    return texts
+
+
+def recognize_rois(
+    engine,
+    imgs: List[Optional[np.ndarray]],
+    stats: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
+) -> List[str]:
+    """
+    ROI 画像群を認識する（None の ROI は空欄として "" を返す）。
+    - OCR_REC_ONLY かつエンジンが read_texts を持てば、認識のみで一括処理
+    - それ以外は ROI ごとに read_text（det+cls+rec のフル経路）
+    - OCR キャッシュが有効なら、既知の切り出しはエンジンに渡さない（use_cache=False で読み書きしない）
+      エンジンが cacheable = False（null / record / replay など）ならキャッシュを使わない
+    stats を渡すと cache_hit / cache_miss を加算する。
+    """
+    texts = [""] * len(imgs)
+    todo = [i for i, img in enumerate(imgs) if img is not None]
+    if not todo:
+        return texts
+
+    cache = get_cache() if use_cache and getattr(engine, "cacheable", True) else None
+    if cache is None:
+        rec = _recognize_uncached(engine, [imgs[i] for i in todo], stats, todo)
+        for i, t in zip(todo, rec):
+            texts[i] = t
+        return texts
+
+    with span(stats, "cache"):
+        name = getattr(engine, "name", "") or OCR_IMPL
+        keys = {i: cache.key_for(imgs[i], name) for i in todo}
+        found = cache.get_many(keys.values())
+
+    miss = [i for i in todo if keys[i] not in found]
+    _count(stats, "cache_hit", len(todo) - len(miss))
+    _count(stats, "cache_miss", len(miss))
+
+    for i in todo:
+        texts[i] = found.get(keys[i], "")
+
+    if not miss:
+        return texts
+
+    rec = _recognize_uncached(engine, [imgs[i] for i in miss], stats, miss)
+
+    fresh: Dict[str, str] = {}
+    for i, t in zip(miss, rec):
+        texts[i] = t
+        fresh[keys[i]] = t
+
+    try:
+        with span(stats, "cache"):
+            cache.put_many(fresh)
+    except Exception:
+        # キャッシュ書込み失敗は結果に影響させない
+        pass
+
+    return texts
+
+
+def fields_from_texts(texts: List[str], stats: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    ROIごとの認識結果に normalize_global() を通す（再出力用に保存する生フィールド値）。
+    """
+    with span(stats, "normalize"):
+        return [normalize_global(t) for t in texts]
+
+
+def rows_from_fields(
+    fields: List[str],
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+) -> List[List[str]]:
+    """
+    フィールド値をレイアウトに従って行へ展開し、列別ルールを適用する
+    （core.csvio.results.materialize_rows と同じ処理を、段ごとに計測しながら行う）。
+    """
+    with span(stats, "layout"):
+        rows = LayoutPlan(preset.layout_text or "").materialize(fields)
+
+    with span(stats, "rules"):
+        return [apply_rules_to_row(row) for row in rows]
+
+
+def postprocess_texts(
+    texts: List[str],
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[str], List[List[str]]]:
+    """
+    認識結果 → (正規化済みフィールド, CSV 行)
+    """
+    fields = fields_from_texts(texts, stats)
+    return fields, rows_from_fields(fields, preset, stats)
+
+
+def ocr_bgr_fields(
+    bgr: np.ndarray,
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+    engine: Optional[str] = None,
+) -> List[str]:
+    """
+    ページ画像（BGR / BGRA / グレー）からプリセット順でフィールドを読み、正規化済みの値を返す。
+    stats を渡すとページ単位の集計値（キャッシュ命中数など）を加算する。
+    engine はエンジン指定（core.ocr.engines.get_engine。省略時は OCR_IMPL）。
+    """
+    engine = get_engine(engine)
+
+    bufs = acquire_buffers(preset) if PREPROCESS_REUSE_BUFFERS else None
+    try:
+        imgs = prepare_rois(bgr, preset, stats, engine, bufs)
+        texts = recognize_rois(engine, imgs, stats)
+    finally:
+        release_buffers(bufs)
+
+    return fields_from_texts(texts, stats)
+
+
+def ocr_bgr_image(
+    bgr: np.ndarray,
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+    engine: Optional[str] = None,
+) -> List[List[str]]:
+    """
+    ページ画像（BGR / BGRA / グレー）からプリセット順でフィールドを読み、レイアウトに従って行へ展開して返す。
+    """
+    fields = ocr_bgr_fields(bgr, preset, stats, engine)
+    return rows_from_fields(fields, preset, stats)
+
+
+def ocr_single_image(
+    source,
+    preset: Preset,
+    stats: Optional[Dict[str, Any]] = None,
+    engine: Optional[str] = None,
+) -> List[List[str]]:
+    """
+    1画像（パス / バイト列 / ndarray / QImage）を読み込んで ocr_bgr_image() に渡す。
+    QImage の画素はコピーせずに参照する。
+    stats を渡すと集計値と段ごとの所要時間（core.ocr.timing）を記録する。
+    """
+    with span(stats, "load"):
+        page = load_page(source)
+    return ocr_bgr_image(page, preset, stats, engine)
@@ -0,0 +1,242 @@
+# path: core/ocr/pool.py
+# -*- coding: utf-8 -*-
+
+"""
+マルチプロセス OCR 実行。
+
+- 各ワーカープロセスは起動時に自前のエンジンを生成（ウォーム）して使い回す
+- 画像はファイルパス、または共有メモリ経由で受け渡す（画像本体は pickle しない）
+- 完了順はバラバラだが、呼び出し側にはタスク順に並べ直して返す
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.app.constants import OCR_WORKERS, OCR_POOL_INFLIGHT_PER_WORKER
+
+
+def resolve_workers(n: Optional[int] = None) -> int:
+    """
+    プロセス数を決定する。None は constants.OCR_WORKERS、0 以下は CPU コア数から自動。
+    """
+    if n is None:
+        n = OCR_WORKERS
+
+    try:
+        n = int(n)
+    except Exception:
+        n = 1
+
+    if n <= 0:
+        n = max(1, (os.cpu_count() or 1) - 1)
+
+    return n
+
+
+# ---------- 子プロセス側 ----------
+
+# このワーカープロセスが使うエンジン指定（_init_process で決まる）
+_engine_spec: Optional[str] = None
+
+
+def _init_process(cpu_threads: int, engine: Optional[str] = None) -> None:
+    """
+    ワーカープロセスの初期化。エンジンをここで生成して初回の待ちを前倒しする。
+    """
+    global _engine_spec
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(cpu_threads))
+
+    from core.ocr.engines import get_engine
+    _engine_spec = engine
+    get_engine(engine, cpu_threads=cpu_threads)
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    """
+    既存の共有メモリに接続する。後始末（unlink）は親プロセスの責務。
+    プール子プロセスは親と resource_tracker を共有するため、登録はそのままでよい。
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    from core.image.loader import load_page
+    from core.ocr.pipeline import ocr_bgr_fields, rows_from_fields
+    from core.ocr.timing import span
+
+    stats: Dict[str, Any] = {}
+    preset = job["preset"]
+
+    src = job.get("source")
+    if src:
+        with span(stats, "load"):
+            bgr = load_page(src)
+        fields = ocr_bgr_fields(bgr, preset, stats, _engine_spec)
+    else:
+        shm = _attach_shm(job["shm"])
+        try:
+            bgr = np.ndarray(job["shape"], dtype=np.uint8, buffer=shm.buf)
+            fields = ocr_bgr_fields(bgr, preset, stats, _engine_spec)
+            del bgr
+        finally:
+            shm.close()
+
+    return {"rows": rows_from_fields(fields, preset, stats), "fields": fields, "stats": stats}
+
+
+# ---------- 親プロセス側 ----------
+
+def _make_job(task) -> Tuple[Dict[str, Any], Optional[shared_memory.SharedMemory]]:
+    """
+    OCRTask からジョブ辞書を作る。
+    入力がファイル（パス / PageRef）ならそれを渡して子プロセスで読ませ、
+    それ以外（ndarray / QImage など）は共有メモリへ画素を置く。
+    """
+    from core.image.loader import load_page
+    from core.image.pages import PageRef
+
+    source = task.source
+    if isinstance(source, PageRef) or (isinstance(source, (str, os.PathLike)) and os.path.isfile(source)):
+        return {"source": source, "preset": task.preset}, None
+
+    src_path = getattr(task, "src_path", "") or ""
+    if src_path and os.path.isfile(src_path) and source is None:
+        return {"source": src_path, "preset": task.preset}, None
+
+    # 色変換はせず、読み込んだ画素（QImage なら BGRA / グレー）をそのまま共有メモリへ写す
+    page = load_page(task.source)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, page.nbytes))
+    view = np.ndarray(page.shape, dtype=np.uint8, buffer=shm.buf)
+    view[...] = page
+    del view
+
+    job = {"shm": shm.name, "shape": page.shape, "preset": task.preset}
+    return job, shm
+
+
+def _release_shm(shm: Optional[shared_memory.SharedMemory]) -> None:
+    if shm is None:
+        return
+
+    try:
+        shm.close()
+    except Exception:
+        pass
+
+    try:
+        shm.unlink()
+    except Exception:
+        pass
+
+
+def run_ordered(
+    tasks: List[Any],
+    workers: int,
+    on_complete: Optional[Callable[[int], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    engine: Optional[str] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    tasks をプロセスプールで OCR し、(タスク番号, 結果) をタスク順に yield する。
+    - 結果は {"rows": [...], "fields": [...], "ok": bool, "error": str, "stats": {...}}
+    - on_complete(完了件数) は完了順に呼ばれる（進捗表示用）
+    - should_stop() が True になったら未着手分を取り消して終了する
+    - engine はエンジン指定（各ワーカープロセスが同じ指定で生成する）
+    """
+    total = len(tasks)
+    workers = max(1, min(int(workers), total))
+    max_inflight = workers * max(1, int(OCR_POOL_INFLIGHT_PER_WORKER))
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    ctx = mp.get_context("spawn")
+
+    pending: Dict[Any, Tuple[int, Optional[shared_memory.SharedMemory]]] = {}
+    ready: Dict[int, Dict[str, Any]] = {}
+    next_submit = 0
+    next_yield = 0
+    completed = 0
+    stopped = False
+
+    ex = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_process,
+        initargs=(cpu_threads, engine),
+    )
+
+    try:
+        while True:
+            if should_stop is not None and should_stop():
+                stopped = True
+
+            while not stopped and next_submit < total and len(pending) < max_inflight:
+                i = next_submit
+                next_submit += 1
+
+                try:
+                    job, shm = _make_job(tasks[i])
+                except Exception as e:
+                    ready[i] = {"rows": [], "fields": [], "ok": False, "error": str(e), "stats": {}}
+                    completed += 1
+                    if on_complete is not None:
+                        on_complete(completed)
+                    continue
+
+                try:
+                    fut = ex.submit(_run_job, job)
+                except Exception:
+                    _release_shm(shm)
+                    raise
+
+                pending[fut] = (i, shm)
+
+            while next_yield in ready:
+                yield next_yield, ready.pop(next_yield)
+                next_yield += 1
+
+            if not pending:
+                if stopped or next_submit >= total:
+                    break
+                continue
+
+            finished, _ = wait(list(pending.keys()), return_when=FIRST_COMPLETED)
+
+            for fut in finished:
+                i, shm = pending.pop(fut)
+                _release_shm(shm)
+
+                try:
+                    out = fut.result()
+                    ready[i] = {
+                        "rows": out["rows"],
+                        "fields": out["fields"],
+                        "ok": True,
+                        "error": "",
+                        "stats": out["stats"],
+                    }
+                except Exception as e:
+                    ready[i] = {"rows": [], "fields": [], "ok": False, "error": str(e), "stats": {}}
+
+                completed += 1
+                if on_complete is not None:
+                    on_complete(completed)
+
+    finally:
+        for fut in list(pending.keys()):
+            fut.cancel()
+
+        ex.shutdown(wait=True, cancel_futures=True)
+
+        for _, shm in pending.values():
+            _release_shm(shm)
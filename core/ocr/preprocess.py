@@ -2,93 +2,147 @@
 
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 import numpy as np
 import cv2
-from PyQt5 import QtGui
 
 from core.app.constants import (
     PREPROCESS_BILATERAL,
     PREPROCESS_BINARIZE,
     UPSCALE_FACTOR,
+    UPSCALE_MODE,
+    TEXT_TARGET_HEIGHT,
+    ADAPTIVE_SCALE_MIN,
+    ADAPTIVE_SCALE_MAX,
+    ROI_MAX_PIXELS,
+    INK_THRESHOLD,
+    INK_RULE_RATIO,
+    INK_RULE_BORDER,
+    INK_RULE_MIN_ASPECT,
+    INK_TRIM_MARGIN,
 )
 
 
-def qimage_to_bgr(qimage: QtGui.QImage) -> np.ndarray:
-    """
-    QImage(任意) -> ndarray(BGR, uint8)
-    """
-    img = qimage.convertToFormat(QtGui.QImage.Format_ARGB32)
-    w = img.width()
-    h = img.height()
+def bgr_to_rgb(bgr: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
-    ptr = img.bits()
-    ptr.setsize(h * w * 4)
 
-    arr = np.frombuffer(ptr, np.uint8).reshape((h, w, 4))
-    bgr = cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR)
-    return bgr
+# 出力先バッファを確保する関数（形状 -> 書込み先の ndarray）。None なら都度確保
+Alloc = Optional[Callable[[Tuple[int, ...]], np.ndarray]]
 
 
-def bgr_to_rgb(bgr: np.ndarray) -> np.ndarray:
-    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+def _dst(alloc: Alloc, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+    # 実際に書き込む直前にだけ呼ぶ（交互に使う作業面の順番を崩さないため）
+    return alloc(shape) if alloc is not None else None
 
 
-def to_gray(bgr: np.ndarray) -> np.ndarray:
-    return cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+def to_gray(img: np.ndarray, alloc: Alloc = None) -> np.ndarray:
+    """
+    BGR / BGRA / グレースケール -> グレースケール
+    （グレースケールはそのまま返す。BGRA は BGR を経由せず直接変換）
+    """
+    if img.ndim == 2:
+        return img
 
+    code = cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(img, code, dst=_dst(alloc, img.shape[:2]))
 
-def bilateral(gray: np.ndarray) -> np.ndarray:
+
+def bilateral(gray: np.ndarray, alloc: Alloc = None) -> np.ndarray:
     if not PREPROCESS_BILATERAL:
         return gray
 
     # 7, 50, 50 は無難な既定。必要なら constants で拡張
-    return cv2.bilateralFilter(gray, 7, 50, 50)
+    return cv2.bilateralFilter(gray, 7, 50, 50, dst=_dst(alloc, gray.shape))
 
 
-def binarize(gray: np.ndarray) -> np.ndarray:
+def binarize(gray: np.ndarray, alloc: Alloc = None) -> np.ndarray:
     if not PREPROCESS_BINARIZE:
         return gray
 
     # Otsu 二値化
-    _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_OTSU | cv2.THRESH_BINARY)
+    _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_OTSU | cv2.THRESH_BINARY, dst=_dst(alloc, gray.shape))
     return th
 
 
-def upscale(img: np.ndarray) -> np.ndarray:
-    if UPSCALE_FACTOR is None:
-        return img
+def downscale_gray(img: np.ndarray, max_side: int) -> Tuple[np.ndarray, float]:
+    """
+    長辺が max_side 以下になるよう縮小したグレースケール画像と、その倍率を返す。
+    （先に縮小してから色変換するので、フル解像度での変換は行わない）
+    """
+    h, w = img.shape[:2]
+    side = max(h, w)
+    if side <= 0 or side <= max_side:
+        return to_gray(img), 1.0
 
-    if UPSCALE_FACTOR <= 1.0:
-        return img
+    s = float(max_side) / float(side)
+    small = cv2.resize(img, (max(1, int(w * s)), max(1, int(h * s))), interpolation=cv2.INTER_AREA)
+    return to_gray(small), s
 
-    h, w = img.shape[:2]
-    nh = int(round(h * UPSCALE_FACTOR))
-    nw = int(round(w * UPSCALE_FACTOR))
 
-    if nh <= 0 or nw <= 0:
-        return img
+def _gap_fraction(profile: np.ndarray) -> float:
+    """
+    インクのある範囲内で、インクが 0 の行（または列）が占める割合。
+    """
+    nz = np.flatnonzero(profile)
+    if nz.size == 0:
+        return 0.0
 
-    return cv2.resize(img, (nw, nh), interpolation=cv2.INTER_CUBIC)
+    seg = profile[nz[0]:nz[-1] + 1]
+    return float(np.count_nonzero(seg == 0)) / float(seg.size)
 
 
-def rotate_if_needed(img: np.ndarray, orientation: str) -> np.ndarray:
-    if orientation == "0" or orientation == "auto":
-        return img
+def is_quarter_turned(gray_small: np.ndarray, ref_w: int = 0, ref_h: int = 0, ratio: float = 1.5) -> bool:
+    """
+    ページが 90/270 度回っているか。
+    - 基準サイズ (ref_w, ref_h) があれば縦横の向きを比べる
+    - 無い（または正方形に近い）場合は投影プロファイルで判定:
+      横書きなら行間にインクの無い「行」が多く、インクの無い「列」は少ない
+    """
+    h, w = gray_small.shape[:2]
+    if h <= 0 or w <= 0:
+        return False
 
-    if orientation == "90":
-        return cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+    if ref_w > 0 and ref_h > 0:
+        ref_ar = ref_w / float(ref_h)
+        ar = w / float(h)
+        if abs(ref_ar - 1.0) > 0.05 and abs(ar - 1.0) > 0.05:
+            return (ref_ar > 1.0) != (ar > 1.0)
 
-    if orientation == "180":
-        return cv2.rotate(img, cv2.ROTATE_180)
+    row_counts, col_counts = _ink_profiles(gray_small)
+    if row_counts.sum() <= 0:
+        return False
 
-    if orientation == "270":
-        return cv2.rotate(img, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    row_gap = _gap_fraction(row_counts)
+    col_gap = _gap_fraction(col_counts)
+    return col_gap > 0.1 and col_gap > row_gap * ratio
 
-    return img
+
+_ROTATE_CODES = {
+    "90": cv2.ROTATE_90_CLOCKWISE,
+    "180": cv2.ROTATE_180,
+    "270": cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+def rotate_if_needed(img: np.ndarray, orientation: str, alloc: Alloc = None) -> np.ndarray:
+    """
+    orientation（時計回りの角度）だけ回転する。"auto" はページ単位で補正済みの前提で何もしない。
+    alloc を渡すと回転後の形状で出力先を確保して書き込む。
+    """
+    code = _ROTATE_CODES.get(orientation)
+    if code is None:
+        return img
+
+    h, w = img.shape[:2]
+    shape = (h, w) if orientation == "180" else (w, h)
+    return cv2.rotate(img, code, dst=_dst(alloc, shape + img.shape[2:]))
 
 
 def crop_to_roi(img: np.ndarray, x: int, y: int, w: int, h: int) -> np.ndarray:
+    """
+    ROI を切り出す。コピーせずビューを返す（後段の変換で新しい配列になる）。
+    """
     ih, iw = img.shape[:2]
 
     x1 = max(0, min(x, iw - 1))
@@ -97,6 +151,164 @@ def crop_to_roi(img: np.ndarray, x: int, y: int, w: int, h: int) -> np.ndarray:
     y2 = max(0, min(y + h, ih))
 
     if x2 <= x1 or y2 <= y1:
-        return img[0:0, 0:0].copy()
+        return img[0:0, 0:0]
+
+    return img[y1:y2, x1:x2]
+
+
+def _border_band(n: int) -> np.ndarray:
+    """
+    長さ n の軸で、端から INK_RULE_BORDER の帯に入る位置を True にした bool 配列。
+    """
+    band = np.zeros(n, dtype=bool)
+    k = max(1, int(round(n * INK_RULE_BORDER)))
+    band[:k] = True
+    band[-k:] = True
+    return band
+
+
+def _ink_profiles(gray: np.ndarray, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    行ごと・列ごとのインク画素数。罫線とみなした行・列は 0 にする。罫線とみなすのは、
+    ほぼ全幅/全高にわたり、かつ ROI の端の帯にあるか ROI の短い辺に比べて十分長い行・列だけ
+    （枠いっぱいに書かれた「一」「1」「-」を罫線として消さないため）。
+    mask（gray と同形状の bool 配列）を渡すと作業領域として使う。
+    """
+    h, w = gray.shape[:2]
+    mask = np.less(gray, INK_THRESHOLD, out=mask)
+
+    row_counts = np.count_nonzero(mask, axis=1)
+    col_counts = np.count_nonzero(mask, axis=0)
+
+    rule_rows = row_counts >= w * INK_RULE_RATIO
+    rule_cols = col_counts >= h * INK_RULE_RATIO
+
+    if rule_rows.any() and w < h * INK_RULE_MIN_ASPECT:
+        rule_rows &= _border_band(h)
+    if rule_cols.any() and h < w * INK_RULE_MIN_ASPECT:
+        rule_cols &= _border_band(w)
+
+    if rule_rows.any() or rule_cols.any():
+        mask[rule_rows, :] = False
+        mask[:, rule_cols] = False
+        row_counts = np.count_nonzero(mask, axis=1)
+        col_counts = np.count_nonzero(mask, axis=0)
+
+    return row_counts, col_counts
+
+
+def analyze_ink(
+    gray: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[int, float, Optional[Tuple[int, int, int, int]]]:
+    """
+    グレースケール ROI のインク量を測る（OCR 前の安価な判定用）。
+    - INK_THRESHOLD より暗い画素をインクとみなす
+    - 枠線（罫線）とみなした行・列は数えない（枠だけの ROI はインク 0）
+    戻り値: (インク画素数, インク画素の割合, 外接矩形 (x, y, w, h) or None)
+    """
+    h, w = gray.shape[:2]
+    if h <= 0 or w <= 0:
+        return 0, 0.0, None
+
+    row_counts, col_counts = _ink_profiles(gray, mask)
+
+    ink = int(row_counts.sum())
+    ratio = ink / float(h * w)
+
+    if ink <= 0:
+        return 0, 0.0, None
+
+    ys = np.flatnonzero(row_counts)
+    xs = np.flatnonzero(col_counts)
+
+    x1, x2 = int(xs[0]), int(xs[-1]) + 1
+    y1, y2 = int(ys[0]), int(ys[-1]) + 1
+    return ink, ratio, (x1, y1, x2 - x1, y2 - y1)
+
+
+def trim_to_bbox(img: np.ndarray, bbox: Tuple[int, int, int, int], margin: Optional[int] = None) -> np.ndarray:
+    """
+    bbox の周りに margin を残して切り詰める（ビュー。コピーしない）。
+    """
+    if margin is None:
+        margin = INK_TRIM_MARGIN
+
+    ih, iw = img.shape[:2]
+    x, y, w, h = bbox
+
+    x1 = max(0, x - margin)
+    y1 = max(0, y - margin)
+    x2 = min(iw, x + w + margin)
+    y2 = min(ih, y + h + margin)
+
+    return img[y1:y2, x1:x2]
+
+
+def estimate_text_height(gray: np.ndarray, mask: Optional[np.ndarray] = None) -> int:
+    """
+    文字高さ(px)の推定。インクのある行が連続する帯を文字行とみなし、その高さの中央値を返す。
+    1 行の ROI ならインクの外接高さとほぼ同じ。推定できなければ 0。
+    """
+    if gray.size == 0:
+        return 0
+
+    row_counts, _ = _ink_profiles(gray, mask)
+    on = row_counts > 0
+    if not on.any():
+        return 0
+
+    # 行の ON/OFF の切替点から帯の長さを求める
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], on.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[0::2]
+
+    # 1〜2px の帯はノイズ（点・かすれ）として除く
+    heights = heights[heights > 2]
+    if heights.size == 0:
+        return 0
+
+    return int(np.median(heights))
+
+
+def roi_scale_factor(shape: Tuple[int, ...], text_h: int) -> float:
+    """
+    ROI の拡大縮小倍率。
+    - UPSCALE_MODE="fixed" なら UPSCALE_FACTOR（1 未満は等倍）
+    - "adaptive" なら文字高さを TEXT_TARGET_HEIGHT に合わせる
+    どちらも拡大後の画素数が ROI_MAX_PIXELS を超えないよう抑える。
+    """
+    h, w = shape[:2]
+    if h <= 0 or w <= 0:
+        return 1.0
+
+    if UPSCALE_MODE == "adaptive":
+        if text_h <= 0:
+            f = 1.0
+        else:
+            f = float(TEXT_TARGET_HEIGHT) / float(text_h)
+            f = max(ADAPTIVE_SCALE_MIN, min(ADAPTIVE_SCALE_MAX, f))
+    else:
+        f = float(UPSCALE_FACTOR or 1.0)
+        if f <= 1.0:
+            f = 1.0
+
+    if ROI_MAX_PIXELS and h * w * f * f > ROI_MAX_PIXELS:
+        f = (ROI_MAX_PIXELS / float(h * w)) ** 0.5
+
+    return f
+
+
+def resize_by(img: np.ndarray, f: float, alloc: Alloc = None) -> np.ndarray:
+    """
+    倍率 f でリサイズ（縮小は INTER_AREA、拡大は INTER_CUBIC）。ほぼ等倍ならそのまま。
+    alloc を渡すとリサイズ後の形状で出力先を確保して書き込む。
+    """
+    if abs(f - 1.0) < 0.05:
+        return img
+
+    h, w = img.shape[:2]
+    nh = max(1, int(round(h * f)))
+    nw = max(1, int(round(w * f)))
 
-    return img[y1:y2, x1:x2].copy()
+    interp = cv2.INTER_AREA if f < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(img, (nw, nh), dst=_dst(alloc, (nh, nw) + img.shape[2:]), interpolation=interp)
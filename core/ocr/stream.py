@@ -0,0 +1,172 @@
+# path: core/ocr/stream.py
+# -*- coding: utf-8 -*-
+
+"""
+段階パイプライン（逐次モード用）。
+
+読込 → 前処理 → 認識 → 後処理 → 書出し を別スレッドの段に分け、
+上限付きキューでつなぐ。ページ N の認識中にページ N+1 の読込・前処理が進み、
+キュー長の上限により投入ファイル数に関わらずメモリ使用量は一定に収まる。
+
+各段は 1 スレッドなので、結果はタスク順のまま書出し段へ届く。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from core.app.constants import OCR_STAGE_QUEUE_SIZE, PREPROCESS_REUSE_BUFFERS
+from core.ocr.buffers import acquire_buffers, release_buffers
+from core.ocr.engines import get_engine
+from core.ocr.pipeline import prepare_rois, recognize_rois, postprocess_texts
+from core.ocr.timing import span, thread_target
+
+# 段の終端を表す番兵
+_END = object()
+
+
+def _new_item(index: int, task: Any) -> Dict[str, Any]:
+    return {"index": index, "task": task, "data": None, "error": "", "stats": {}}
+
+
+def _stage_thread(
+    name: str,
+    fn: Callable[[Any, Any, Dict[str, Any]], Any],
+    q_in: "queue.Queue",
+    q_out: "queue.Queue",
+) -> threading.Thread:
+    """
+    q_in から取り出した項目に fn(task, data, stats) を適用して q_out へ流す段を作る。
+    前段で失敗した項目は処理せずそのまま流す。
+    """
+    def loop() -> None:
+        while True:
+            item = q_in.get()
+            if item is _END:
+                q_out.put(_END)
+                return
+
+            if not item["error"]:
+                try:
+                    item["data"] = fn(item["task"], item["data"], item["stats"])
+                except Exception as e:
+                    item["data"] = None
+                    item["error"] = str(e) or e.__class__.__name__
+
+            q_out.put(item)
+
+    return threading.Thread(target=thread_target(loop), name=f"ocr-{name}", daemon=True)
+
+
+def run_staged(
+    tasks: Iterable[Any],
+    load: Callable[[Any], Any],
+    on_result: Callable[[int, Any, Dict[str, Any]], None],
+    should_stop: Optional[Callable[[], bool]] = None,
+    queue_size: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> None:
+    """
+    tasks を段階パイプラインで OCR する。
+    - load(task) はページ画像（BGR）を返す
+    - on_result(index, task, {"rows", "fields", "ok", "error", "stats"}) は呼び出し元スレッドで
+      タスク順に呼ばれる（書出し段）
+    - should_stop() が True になったら以降のタスクを投入しない（処理中の分は流し切る）
+    - engine はエンジン指定（core.ocr.engines.get_engine。省略時は OCR_IMPL）
+    """
+    size = max(1, int(queue_size or OCR_STAGE_QUEUE_SIZE))
+
+    q_loaded: "queue.Queue" = queue.Queue(maxsize=size)
+    q_prepared: "queue.Queue" = queue.Queue(maxsize=size)
+    q_recognized: "queue.Queue" = queue.Queue(maxsize=size)
+    q_done: "queue.Queue" = queue.Queue(maxsize=size)
+
+    abort = threading.Event()
+
+    def stopped() -> bool:
+        if abort.is_set():
+            return True
+        return bool(should_stop is not None and should_stop())
+
+    def produce() -> None:
+        try:
+            for i, t in enumerate(tasks):
+                if stopped():
+                    break
+
+                item = _new_item(i, t)
+                try:
+                    with span(item["stats"], "load"):
+                        item["data"] = load(t)
+                except Exception as e:
+                    item["error"] = str(e) or e.__class__.__name__
+
+                q_loaded.put(item)
+        finally:
+            q_loaded.put(_END)
+
+    engine_box: Dict[str, Any] = {}
+    spec = engine
+
+    def engine() -> Any:
+        if "engine" not in engine_box:
+            engine_box["engine"] = get_engine(spec)
+        return engine_box["engine"]
+
+    # 前処理の作業領域は前処理段で借り、認識段が読み終えたら返す
+    def prepare(task: Any, bgr: Any, stats: Dict[str, Any]) -> Any:
+        bufs = acquire_buffers(task.preset) if PREPROCESS_REUSE_BUFFERS else None
+        try:
+            return prepare_rois(bgr, task.preset, stats, engine(), bufs), bufs
+        except Exception:
+            release_buffers(bufs)
+            raise
+
+    def recognize(task: Any, data: Any, stats: Dict[str, Any]) -> Any:
+        imgs, bufs = data
+        try:
+            return recognize_rois(engine(), imgs, stats)
+        finally:
+            release_buffers(bufs)
+
+    threads = [
+        threading.Thread(target=thread_target(produce), name="ocr-load", daemon=True),
+        _stage_thread("preprocess", prepare, q_loaded, q_prepared),
+        _stage_thread("recognize", recognize, q_prepared, q_recognized),
+        _stage_thread("postprocess", lambda t, texts, st: postprocess_texts(texts, t.preset, st), q_recognized, q_done),
+    ]
+
+    for th in threads:
+        th.start()
+
+    failure: Optional[BaseException] = None
+
+    # 書出し段（呼び出し元スレッド）
+    while True:
+        item = q_done.get()
+        if item is _END:
+            break
+
+        if failure is not None:
+            # 書出しで例外が出た後は残りを読み捨てて各段を終わらせる
+            continue
+
+        if item["error"]:
+            res = {"rows": [], "fields": [], "ok": False, "error": item["error"], "stats": item["stats"]}
+        else:
+            fields, rows = item["data"]
+            res = {"rows": rows, "fields": fields, "ok": True, "error": "", "stats": item["stats"]}
+
+        try:
+            on_result(item["index"], item["task"], res)
+        except BaseException as e:
+            failure = e
+            abort.set()
+
+    for th in threads:
+        th.join()
+
+    if failure is not None:
+        raise failure
@@ -0,0 +1,50 @@
+# path: core/ocr/task.py
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class OCRTask:
+    """
+    OCR の単位処理。
+    - source: 入力画像。パス / PageRef / バイト列 / ndarray / QImage（core.image.loader.load_page が解釈）
+    - preset: 使用プリセット
+    - display_name: ログ/進捗表示用（ファイル名や "page #1/3" など）
+    - src_path: 元ファイルのパス（source がパス / PageRef なら省略時に補う）
+    - content_key: 入力の内容ハッシュ（ジョブ記録用。未計算なら空で、content_digest() が補う）
+    """
+    source: Any
+    preset: Any
+    display_name: str = ""
+    src_path: str = ""
+    content_key: str = ""
+
+    def __post_init__(self) -> None:
+        from core.image.pages import PageRef
+
+        if isinstance(self.source, PageRef):
+            if not self.src_path:
+                self.src_path = self.source.path
+            if not self.display_name:
+                self.display_name = self.source.display_name
+
+        if not self.src_path and isinstance(self.source, (str, os.PathLike)):
+            self.src_path = os.fspath(self.source)
+
+        if not self.display_name and self.src_path:
+            self.display_name = os.path.basename(self.src_path)
+
+    def content_digest(self) -> str:
+        """
+        入力の内容ハッシュ（一度計算したら content_key に保持）。判定できなければ空文字。
+        """
+        if not self.content_key:
+            from core.image.hashing import source_digest
+
+            self.content_key = source_digest(self.source) or ""
+        return self.content_key
@@ -0,0 +1,290 @@
+# path: core/ocr/timing.py
+# -*- coding: utf-8 -*-
+
+"""
+OCR パイプラインの段ごとの所要時間の計測と、トレース・プロファイルの出力。
+
+- span(stats, 段名, roi) で囲んだ区間を、ページごとの stats["spans"] に
+  (段名, ROI 番号（ページ単位は -1）, 開始, 所要秒, pid, tid) として積む
+  （stats はページの集計値と一緒に段階パイプライン / プロセスプールから届く）
+- TimingLog はページごとの区間を集計し、必要なら JSONL（1 ページ 1 行）か
+  Chrome トレース（chrome://tracing / Perfetto で開ける JSON）へ書き出す
+- profiled(path) は呼び出し元スレッドと段のスレッドを cProfile で計測して pstats を保存する
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.app.constants import TIMING_ENABLED
+
+SPANS = "spans"
+
+# 集計・表示の順（ここに無い段名は後ろへ）
+STAGES = (
+    "load", "orient", "register", "crop", "preprocess",
+    "cache", "recognize", "normalize", "layout", "rules", "write",
+)
+
+Span = Tuple[str, int, float, float, int, int]
+
+
+@contextlib.contextmanager
+def span(stats: Optional[Dict[str, Any]], stage: str, roi: int = -1) -> Iterator[None]:
+    """
+    囲んだ区間の所要時間を stats へ記録する。stats が None か TIMING_ENABLED=False なら何もしない。
+    """
+    if stats is None or not TIMING_ENABLED:
+        yield
+        return
+
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.setdefault(SPANS, []).append(
+            (stage, roi, t0, time.perf_counter() - t0, os.getpid(), threading.get_ident())
+        )
+
+
+def pop_spans(stats: Optional[Dict[str, Any]]) -> List[Span]:
+    """
+    stats から区間を取り出す（残りは数値だけになり、そのまま足し合わせられる）。
+    """
+    if not stats:
+        return []
+    return list(stats.pop(SPANS, None) or [])
+
+
+def _stage_order(name: str) -> Tuple[int, str]:
+    try:
+        return STAGES.index(name), name
+    except ValueError:
+        return len(STAGES), name
+
+
+class TimingLog:
+    """
+    ページごとの区間を段ごとに集計する。path を渡すとページごとに書き出す。
+    - 拡張子 .json: Chrome トレース形式（区間 1 つが 1 イベント）
+    - それ以外    : JSONL（{"name", "total_ms", "stages": {段: ms}, "rois": {ROI 番号: {段: ms}}}）
+    書出しに失敗しても OCR は止めない（error に残して以降は書かない）。
+    """
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path or ""
+        self.chrome = self.path.lower().endswith(".json")
+        self.error: Optional[BaseException] = None
+
+        self.pages = 0
+        # 段 -> [回数, 合計秒, 最大秒]
+        self._totals: Dict[str, List[float]] = {}
+        self._t0 = time.perf_counter()
+
+        self._f = None
+        self._first_event = True
+        if self.path:
+            try:
+                d = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(d, exist_ok=True)
+                self._f = open(self.path, "w", encoding="utf-8", newline="\n")
+                if self.chrome:
+                    self._f.write("[\n")
+            except Exception as e:
+                self.error = e
+                self._f = None
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        """
+        区間を伴わない合計値を足す（別スレッドで測った CSV 書込みなど）。
+        """
+        t = self._totals.setdefault(stage, [0, 0.0, 0.0])
+        t[0] += count
+        t[1] += seconds
+        t[2] = max(t[2], seconds / max(1, count))
+
+    def add_page(self, name: str, spans: List[Span]) -> None:
+        self.pages += 1
+
+        stages: Dict[str, float] = {}
+        rois: Dict[int, Dict[str, float]] = {}
+        for stage, roi, _, dur, _, _ in spans:
+            self.add(stage, dur)
+            stages[stage] = stages.get(stage, 0.0) + dur
+            if roi >= 0:
+                per = rois.setdefault(roi, {})
+                per[stage] = per.get(stage, 0.0) + dur
+
+        if self._f is None:
+            return
+
+        try:
+            if self.chrome:
+                self._write_events(name, spans)
+            else:
+                rec = {
+                    "name": name,
+                    "total_ms": round(sum(stages.values()) * 1000.0, 3),
+                    "stages": {k: round(v * 1000.0, 3) for k, v in sorted(stages.items(), key=lambda kv: _stage_order(kv[0]))},
+                    "rois": {str(i): {k: round(v * 1000.0, 3) for k, v in per.items()} for i, per in sorted(rois.items())},
+                }
+                self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except Exception as e:
+            self.error = e
+            self._close_file()
+
+    def _write_events(self, name: str, spans: List[Span]) -> None:
+        for stage, roi, start, dur, pid, tid in spans:
+            ev = {
+                "name": stage,
+                "cat": "ocr",
+                "ph": "X",
+                "ts": round(start * 1e6, 1),
+                "dur": round(dur * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": {"page": name} if roi < 0 else {"page": name, "roi": roi},
+            }
+            self._f.write(("" if self._first_event else ",\n") + json.dumps(ev, ensure_ascii=False))
+            self._first_event = False
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        {"pages", "wall_ms", "stages": {段: {"count", "total_ms", "avg_ms", "max_ms"}}}
+        """
+        stages = {}
+        for stage in sorted(self._totals, key=_stage_order):
+            n, total, peak = self._totals[stage]
+            stages[stage] = {
+                "count": int(n),
+                "total_ms": total * 1000.0,
+                "avg_ms": total * 1000.0 / max(1, n),
+                "max_ms": peak * 1000.0,
+            }
+
+        return {
+            "pages": self.pages,
+            "wall_ms": (time.perf_counter() - self._t0) * 1000.0,
+            "stages": stages,
+        }
+
+    def _close_file(self) -> None:
+        if self._f is None:
+            return
+        try:
+            if self.chrome:
+                self._f.write("\n]\n")
+            self._f.close()
+        except Exception as e:
+            self.error = self.error or e
+        self._f = None
+
+    def close(self) -> None:
+        self._close_file()
+
+
+def format_summary(summary: Dict[str, Any]) -> List[str]:
+    """
+    TimingLog.summary() をログ用の行にする。段は並行に進むので、割合は段の合計時間に対する比。
+    """
+    stages = summary.get("stages") or {}
+    pages = int(summary.get("pages", 0))
+    if not stages or pages <= 0:
+        return []
+
+    grand = sum(s["total_ms"] for s in stages.values()) or 1.0
+    lines = [f"段ごとの所要時間: {pages} ページ / 経過 {summary.get('wall_ms', 0.0) / 1000.0:.1f} 秒"]
+    for stage, s in stages.items():
+        lines.append(
+            f"  {stage:<10} 合計 {s['total_ms']:9.1f} ms"
+            f" / ページ平均 {s['total_ms'] / pages:7.2f} ms"
+            f" / 1回 最大 {s['max_ms']:7.2f} ms（{s['count']} 回）"
+            f" / {s['total_ms'] * 100.0 / grand:4.1f}%"
+        )
+    return lines
+
+
+# ---------- cProfile ----------
+
+# 3.12 以降の cProfile は sys.monitoring の上にあり、1 つのプロファイラが全スレッドを見る
+# （2 つ目を有効にすると ValueError）。それより前はスレッドごとにプロファイラが要る
+_PER_THREAD = sys.version_info < (3, 12)
+
+
+class _ThreadProfiles:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.profiles: List[cProfile.Profile] = []
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        def run(*args: Any, **kwargs: Any) -> Any:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                # 別のプロファイラが有効（計測できなくてもスレッドの本体は必ず動かす）
+                return fn(*args, **kwargs)
+
+            with self._lock:
+                self.profiles.append(prof)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.disable()
+
+        return run
+
+
+_active: Optional[_ThreadProfiles] = None
+
+
+def thread_target(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    スレッドの本体を渡す。profiled() の中で作られたスレッドならそのスレッドも計測する。
+    （3.11 までの cProfile は有効にしたスレッドしか見ないため。3.12 以降は何もしない）
+    """
+    active = _active
+    return active.wrap(fn) if active is not None and _PER_THREAD else fn
+
+
+@contextlib.contextmanager
+def profiled(path: str) -> Iterator[None]:
+    """
+    path が空でなければ、囲んだ区間を cProfile で計測して pstats 形式で path へ保存する。
+    プロセスプールの子プロセスは計測しない（呼び出し側で逐次実行にする）。
+    """
+    global _active
+
+    if not path:
+        yield
+        return
+
+    profiles = _ThreadProfiles()
+    main = cProfile.Profile()
+    _active = profiles
+    main.enable()
+    try:
+        yield
+    finally:
+        main.disable()
+        _active = None
+
+        st = pstats.Stats(main)
+        for prof in profiles.profiles:
+            try:
+                st.add(prof)
+            except Exception:
+                # 計測中に終わらなかったスレッド分は捨てる
+                pass
+
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        st.dump_stats(path)
@@ -3,77 +3,352 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
 
 from PyQt5 import QtCore
 
-from core.ocr.pipeline import ocr_single_image
-from core.app.constants import ALLOW_INTERRUPT
-
-
-@dataclass
-class OCRTask:
-    """
-    OCR の単位処理。
-    - qimage: 入力画像 (QImage)
-    - preset: 使用プリセット
-    - display_name: ログ/進捗表示用（ファイル名や "page #1/3" など）
-    """
-    qimage: Any
-    preset: Any
-    display_name: str = ""
+from core.image.loader import load_page
+from core.ocr.task import OCRTask
+from core.ocr.pool import resolve_workers, run_ordered
+from core.ocr.stream import run_staged
+from core.ocr.engines import get_engine, reload_engine, warm_up
+from core.ocr.timing import TimingLog, pop_spans, profiled
+from core.app.constants import ALLOW_INTERRUPT, PROFILE_PATH, TIMING_ENABLED, TIMING_TRACE_PATH
 
 
 class OCRWorker(QtCore.QThread):
     """
-    OCR をバックグラウンドで順次実行するワーカー。
+    OCR をバックグラウンドで実行するワーカー。
+    - workers > 1 ならプロセスプールで並列実行（結果はタスク順に並べ直す）
+    - それ以外、またはプール起動に失敗した場合は 1 プロセス内の段階パイプライン
     進捗は 0..100 の整数で通知。
+    writer（CSVStreamWriter）を渡すと 1 件終わるたびにタスク順で書き足し、終了時に閉じる。
+    writer がジョブ記録付きの追記なら、同じプリセットで処理済みの入力は飛ばす（失敗分は再実行）。
+    段ごとの所要時間は sig_timing（core.ocr.timing.TimingLog.summary() の dict）で sig_done の前に通知する。
+    engine はエンジン指定（"paddle" / "null" / "replay:記録ファイル" など。省略時は OCR_IMPL）。
     完了時は processed の一覧（dictの配列）を sig_done で返す。
     """
 
     sig_progress = QtCore.pyqtSignal(int)
     sig_log = QtCore.pyqtSignal(str)
+    sig_timing = QtCore.pyqtSignal(dict)
     sig_done = QtCore.pyqtSignal(list)
 
-    def __init__(self, tasks: List[OCRTask]):
+    def __init__(
+        self,
+        tasks: List[OCRTask],
+        workers: Optional[int] = None,
+        writer: Any = None,
+        engine: Optional[str] = None,
+    ):
         super().__init__()
         self._tasks = tasks or []
+        self._engine = engine
+        self._workers = resolve_workers(workers)
+        self._writer = writer
+        self._stats: Dict[str, Any] = {}
+        self._timing: Optional[TimingLog] = None
 
     def run(self) -> None:
+        if not PROFILE_PATH:
+            self._run()
+            return
+
+        try:
+            with profiled(PROFILE_PATH):
+                self._run()
+            self.sig_log.emit(f"プロファイルを保存: {PROFILE_PATH}")
+        except Exception as e:
+            self.sig_log.emit(f"[warn] プロファイルを保存できません: {e}")
+
+    def _run(self) -> None:
+        self._tasks = self._skip_done(self._tasks)
         total = len(self._tasks)
 
         if total <= 0:
+            self._close_writer()
             self.sig_progress.emit(100)
             self.sig_done.emit([])
             return
 
         processed: List[Dict[str, Any]] = []
+        if TIMING_ENABLED:
+            self._timing = TimingLog(TIMING_TRACE_PATH)
 
-        for i, t in enumerate(self._tasks, start=1):
-            if ALLOW_INTERRUPT and self.isInterruptionRequested():
-                self.sig_log.emit("処理が中断されました")
-                break
-
+        if self._workers > 1 and total > 1 and PROFILE_PATH:
+            self.sig_log.emit("プロファイル計測中のため逐次処理で実行します")
+        elif self._workers > 1 and total > 1:
             try:
-                rows = ocr_single_image(t.qimage, t.preset)
-                processed.append({
-                    "name": t.display_name or f"item#{i}",
-                    "rows": rows,
-                    "ok": True,
-                    "error": "",
-                })
-                self.sig_log.emit(f"OCR OK: {t.display_name or f'item#{i}'} -> {len(rows)} 行")
+                self._run_pool(processed)
             except Exception as e:
-                processed.append({
-                    "name": t.display_name or f"item#{i}",
-                    "rows": [],
-                    "ok": False,
-                    "error": str(e),
-                })
-                self.sig_log.emit(f"OCR 失敗: {t.display_name or f'item#{i}'} / {e}")
+                self.sig_log.emit(f"並列OCRに失敗したため逐次処理に切り替えます: {e}")
 
-            pct = int(i * 100 / total)
-            self.sig_progress.emit(pct)
+        if len(processed) < total and not self._interrupted():
+            self._run_serial(processed, start=len(processed))
 
+        self._close_writer()
+        self._log_summary()
+        self._finish_timing()
         self.sig_done.emit(processed)
+
+    def _interrupted(self) -> bool:
+        return bool(ALLOW_INTERRUPT and self.isInterruptionRequested())
+
+    def _journal(self) -> Any:
+        return getattr(self._writer, "journal", None) if self._writer is not None else None
+
+    def _skip_done(self, tasks: List[OCRTask]) -> List[OCRTask]:
+        """
+        ジョブ記録で処理済みのタスクを除く。CSV を上書きする場合は何も除かない。
+        """
+        journal = self._journal()
+        if journal is None or not self._writer.append:
+            return tasks
+
+        remaining = []
+        skipped = 0
+        for t in tasks:
+            if self._interrupted():
+                # 中断時は残りを判定せずに渡す（すぐ止まる）
+                remaining.append(t)
+                continue
+            try:
+                done = journal.is_done(t.content_digest(), t.preset)
+            except Exception:
+                done = False
+            if done:
+                skipped += 1
+            else:
+                remaining.append(t)
+
+        if skipped:
+            self.sig_log.emit(f"処理済みのためスキップ: {skipped}件（残り {len(remaining)}件）")
+
+        return remaining
+
+    def _close_writer(self) -> None:
+        # 書き残しの flush / fsync もこのスレッドで待つ（GUI スレッドは待たせない）
+        if self._writer is None:
+            return
+
+        try:
+            self._writer.close()
+        except Exception as e:
+            self.sig_log.emit(f"[error] CSV書込み失敗: {e}")
+
+    def _finish_timing(self) -> None:
+        timing = self._timing
+        if timing is None:
+            return
+
+        if self._writer is not None and self._writer.pages:
+            timing.add("write", self._writer.write_sec, self._writer.pages)
+        timing.close()
+
+        if timing.error is not None:
+            self.sig_log.emit(f"[warn] トレースを書き出せません: {timing.error}")
+        elif timing.path:
+            self.sig_log.emit(f"トレースを保存: {timing.path}")
+
+        self.sig_timing.emit(timing.summary())
+
+    def _write(self, t: OCRTask, res: Dict[str, Any]) -> None:
+        if self._writer is None or self._writer.error is not None:
+            return
+
+        record = {
+            "name": t.display_name,
+            "src_path": t.src_path,
+            "preset": getattr(t.preset, "name", ""),
+            "fields": res.get("fields", []),
+            "ok": bool(res["ok"]),
+        }
+        entry = None
+        if self._journal() is not None:
+            from core.csvio.journal import make_entry
+
+            key = t.content_digest()
+            if key:
+                entry = make_entry(key, t, res["ok"], len(res["rows"]) if res["ok"] else 0, res["error"])
+
+        try:
+            self._writer.write(res["rows"] if res["ok"] else [], record, entry)
+        except Exception as e:
+            # 書けないまま OCR を続けても結果が残らないので止める
+            self.sig_log.emit(f"[error] CSV書込み失敗のため中断します: {e}")
+            self.requestInterruption()
+
+    def _record(self, processed: List[Dict[str, Any]], i: int, t: OCRTask, res: Dict[str, Any]) -> None:
+        name = t.display_name or f"item#{i}"
+        spans = pop_spans(res.get("stats"))
+        if self._timing is not None:
+            self._timing.add_page(name, spans)
+
+        processed.append({
+            "name": name,
+            "src_path": t.src_path,
+            "preset": getattr(t.preset, "name", ""),
+            "fields": res.get("fields", []),
+            "rows": res["rows"],
+            "ok": res["ok"],
+            "error": res["error"],
+        })
+        self._write(t, res)
+
+        for k, v in (res.get("stats") or {}).items():
+            self._stats[k] = self._stats.get(k, 0) + v
+
+        if res["ok"]:
+            self.sig_log.emit(f"OCR OK: {name} -> {len(res['rows'])} 行")
+        else:
+            self.sig_log.emit(f"OCR 失敗: {name} / {res['error']}")
+
+    def _log_summary(self) -> None:
+        st = self._stats
+
+        hit = st.get("cache_hit", 0)
+        miss = st.get("cache_miss", 0)
+        if hit or miss:
+            self.sig_log.emit(f"OCRキャッシュ: ヒット {hit} / ミス {miss}")
+
+        rotated = st.get("page_rotated", 0)
+        if rotated:
+            self.sig_log.emit(f"向き補正: {rotated} ページを回転")
+
+        reg = st.get("registered", 0)
+        reg_failed = st.get("register_failed", 0)
+        if reg or reg_failed:
+            avg = st.get("register_ms", 0.0) / max(1, reg + reg_failed)
+            self.sig_log.emit(f"位置合わせ: {reg} ページ / 失敗 {reg_failed}（平均 {avg:.1f} ms/ページ）")
+
+        blank = st.get("ink_blank", 0)
+        trimmed = st.get("ink_trimmed", 0)
+        if blank or trimmed:
+            saved = st.get("ink_pixels_saved", 0)
+            self.sig_log.emit(f"インク解析: 空欄スキップ {blank} / トリム {trimmed}（削減 {saved:,} 画素）")
+
+    def _run_serial(self, processed: List[Dict[str, Any]], start: int = 0) -> None:
+        """
+        1 プロセス内で段階パイプライン（読込/前処理/認識/後処理を並行）として実行する。
+        """
+        total = len(self._tasks)
+
+        def on_result(idx: int, t: OCRTask, res: Dict[str, Any]) -> None:
+            i = start + idx + 1
+            self._record(processed, i, t, res)
+            self.sig_progress.emit(int(i * 100 / total))
+
+        run_staged(
+            self._tasks[start:],
+            load=lambda t: load_page(t.source),
+            on_result=on_result,
+            should_stop=self._interrupted,
+            engine=self._engine,
+        )
+
+        if len(processed) < total and self._interrupted():
+            self.sig_log.emit("処理が中断されました")
+
+    def _run_pool(self, processed: List[Dict[str, Any]]) -> None:
+        total = len(self._tasks)
+        self.sig_log.emit(f"並列OCR: {min(self._workers, total)} プロセス")
+
+        def on_complete(n: int) -> None:
+            self.sig_progress.emit(int(n * 100 / total))
+
+        results = run_ordered(
+            self._tasks,
+            self._workers,
+            on_complete=on_complete,
+            should_stop=self._interrupted,
+            engine=self._engine,
+        )
+
+        for idx, res in results:
+            self._record(processed, idx + 1, self._tasks[idx], res)
+
+        if self._interrupted():
+            self.sig_log.emit("処理が中断されました")
+
+
+class WatchWorker(QtCore.QThread):
+    """
+    受信フォルダを監視し続けるワーカー（core.ocr.hotfolder.HotFolder を常駐させる）。
+    エンジンは 1 度だけ用意して使い回し、結果は writer（CSVStreamWriter）へ追記する。
+    - sig_file(元のパス, 成否, 行数, 移動先): ファイル 1 件の処理と移動が済むたび
+    - stop() で受付を止め、処理中のファイルを終えてから終了する（writer も閉じる）
+    """
+
+    sig_log = QtCore.pyqtSignal(str)
+    sig_file = QtCore.pyqtSignal(str, bool, int, str)
+
+    def __init__(self, inbox: str, preset: Any, writer: Any, parent=None, engine: Optional[str] = None):
+        super().__init__(parent)
+        from core.ocr.hotfolder import HotFolder
+
+        self._writer = writer
+        self._engine = engine
+        self._stop = False
+        self.folder = HotFolder(
+            inbox,
+            preset,
+            writer,
+            on_file=self._on_file,
+            on_log=self.sig_log.emit,
+            engine=engine,
+        )
+
+    def wake(self) -> None:
+        """
+        受信フォルダの変更通知を受けたときに呼ぶ（次の走査を前倒しする）。
+        """
+        self.folder.wake()
+
+    def stop(self) -> None:
+        self._stop = True
+        self.folder.wake()
+
+    def _on_file(self, path: str, ok: bool, rows: int, dst: str, error: str) -> None:
+        name = os.path.basename(path)
+        if ok:
+            self.sig_log.emit(f"監視: {name} -> {rows} 行")
+        else:
+            self.sig_log.emit(f"監視: 失敗 {name} / {error}")
+        self.sig_file.emit(path, ok, rows, dst)
+
+    def run(self) -> None:
+        try:
+            warm_up(get_engine(self._engine))
+            self.folder.run(should_stop=lambda: self._stop)
+        except Exception as e:
+            self.sig_log.emit(f"[error] フォルダ監視が停止しました: {e}")
+        finally:
+            try:
+                self._writer.close()
+            except Exception as e:
+                self.sig_log.emit(f"[error] CSV書込み失敗: {e}")
+
+
+class EngineLoader(QtCore.QThread):
+    """
+    OCR エンジンをバックグラウンドで生成し、ダミー推論でウォームアップする。
+    reload=True なら既存エンジンを破棄して作り直す（設定変更時）。
+    完了時に sig_ready(成功可否, メッセージ) を通知。
+    """
+
+    sig_ready = QtCore.pyqtSignal(bool, str)
+
+    def __init__(self, reload: bool = False, parent=None):
+        super().__init__(parent)
+        self._reload = bool(reload)
+
+    def run(self) -> None:
+        try:
+            engine = reload_engine() if self._reload else get_engine()
+            warm_up(engine)
+        except Exception as e:
+            self.sig_ready.emit(False, str(e))
+            return
+
+        self.sig_ready.emit(True, "")
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import Dict, List, Optional
 
 from core.app.constants import (
     PP_TRIM,
@@ -140,9 +140,13 @@ _RULES_MAP = {
 }
 
 
-def apply_rules_to_row(row: List[str]) -> List[str]:
+def apply_rules_to_row(
+    row: List[str],
+    rules_by_col: Optional[Dict[int, List[str]]] = None,
+) -> List[str]:
     """
-    constants.PP_BY_COL に従って、列ごとに追加ルールを適用する。
+    列ごとに追加ルールを適用する。
+    rules_by_col 省略時は constants.PP_BY_COL に従う。
     未設定列や未知ルールは無視。
     """
     if not row:
@@ -150,10 +154,13 @@ def apply_rules_to_row(row: List[str]) -> List[str]:
 
     out = list(row)
 
-    if not PP_BY_COL:
+    if rules_by_col is None:
+        rules_by_col = PP_BY_COL
+
+    if not rules_by_col:
         return out
 
-    for col_idx, rules in PP_BY_COL.items():
+    for col_idx, rules in rules_by_col.items():
         if not isinstance(col_idx, int):
             continue
 
@@ -9,6 +9,7 @@ from .store import (
     delete,
     rename,
     exists,
+    load_template,
 )
 
 __all__ = [
@@ -21,4 +22,5 @@ __all__ = [
     "delete",
     "rename",
     "exists",
+    "load_template",
 ]
@@ -12,7 +12,7 @@ class ROI:
     y: int
     w: int
     h: int
-    orientation: str = "auto"   # "auto" | "0" | "90" | "180" | "270"
+    orientation: str = "auto"   # "auto"（ページ単位で推定）| "0" | "90" | "180" | "270"
 
 
 @dataclass
@@ -25,6 +25,8 @@ class Preset:
     image_h: int = 0
     rois: List[ROI] = field(default_factory=list)
     layout_text: str = "{1}{2}{3}"
+    # 位置合わせ用の基準特徴点（サイドカー）の指紋。空なら位置合わせしない
+    template: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -33,6 +35,7 @@ class Preset:
             "image_h": self.image_h,
             "rois": [asdict(r) for r in self.rois],
             "layout_text": self.layout_text,
+            "template": self.template,
         }
 
     @staticmethod
@@ -45,4 +48,5 @@ class Preset:
             image_h=int(d.get("image_h", 0) or 0),
             rois=rois,
             layout_text=str(d.get("layout_text", "{1}{2}{3}")),
+            template=str(d.get("template", "") or ""),
         )
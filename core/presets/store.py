@@ -5,12 +5,16 @@ from __future__ import annotations
 import json
 import os
 import shutil
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.app.app_paths import presets_dir, ensure_dir
 from .models import Preset
 
+# 位置合わせ用サイドカーの拡張子（"<stem>.tmpl.npz"。list_names の *.json には掛からない）
+_TEMPLATE_SUFFIX = ".tmpl.npz"
+
 
 def _normalize_name(name_or_stem: str) -> str:
     """
@@ -26,6 +30,17 @@ def _preset_path(stem: str) -> Path:
     return presets_dir() / f"{stem}.json"
 
 
+def _template_path(stem: str) -> Path:
+    return presets_dir() / f"{stem}{_TEMPLATE_SUFFIX}"
+
+
+def _remove_template(stem: str) -> None:
+    try:
+        _template_path(stem).unlink()
+    except FileNotFoundError:
+        pass
+
+
 def exists(name_or_stem: str) -> bool:
     stem = _normalize_name(name_or_stem)
     return _preset_path(stem).exists()
@@ -68,21 +83,73 @@ def _atomic_write_json(path: Path, payload: dict) -> None:
     os.replace(tmp, path)
 
 
-def save(preset: Preset, name_or_stem: str) -> None:
+def save(preset: Preset, name_or_stem: str, reference: Any = None) -> None:
     """
     指定名で JSON 保存。上書き保存。
     - JSON 内の "name" は参考として name を入れる
+    - reference（ROI を置いた基準画像の ndarray）を渡すと、位置合わせ用の特徴点を取り直して
+      サイドカーに保存し preset.template を更新する。取れなければ位置合わせなしで保存する
+    - reference が無ければ既存のサイドカーをそのまま使う（無ければ位置合わせなし）
     """
     stem = _normalize_name(name_or_stem)
     p = _preset_path(stem)
     ensure_dir(p.parent)
 
+    if reference is not None:
+        from core.image.register import build_template, save_template
+
+        try:
+            tmpl = build_template(reference)
+            save_template(str(_template_path(stem)), tmpl)
+            preset.template = tmpl.digest
+        except Exception:
+            preset.template = ""
+    elif preset.template and not _template_path(stem).exists():
+        preset.template = ""
+
+    if not preset.template:
+        _remove_template(stem)
+
     payload = preset.to_dict()
     payload["name"] = stem
 
     _atomic_write_json(p, payload)
 
 
+_tmpl_memo: Dict[str, Tuple[int, Any]] = {}
+_tmpl_lock = threading.Lock()
+
+
+def load_template(preset: Preset) -> Optional[Any]:
+    """
+    preset の位置合わせ用特徴点（core.image.register.TemplateFeatures）。
+    サイドカーが無い・指紋が preset.template と合わない場合は None。
+    ファイルの更新時刻ごとにプロセス内で覚えておく（ページごとに読み直さない）。
+    """
+    if not preset.template or not preset.name:
+        return None
+
+    from core.image.register import load_template as _load_file
+
+    path = str(_template_path(_normalize_name(preset.name)))
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    with _tmpl_lock:
+        hit = _tmpl_memo.get(path)
+        if hit is not None and hit[0] == mtime:
+            tmpl = hit[1]
+        else:
+            tmpl = _load_file(path)
+            _tmpl_memo[path] = (mtime, tmpl)
+
+    if tmpl is None or tmpl.digest != preset.template:
+        return None
+    return tmpl
+
+
 def _unique_copy_name(base_stem: str) -> str:
     """
     複製時の自動採番:
@@ -115,6 +182,8 @@ def duplicate(name_or_stem: str) -> str:
     dst = _preset_path(new_stem)
 
     shutil.copy2(str(src), str(dst))
+    if _template_path(stem).exists():
+        shutil.copy2(str(_template_path(stem)), str(_template_path(new_stem)))
 
     # JSON 内の name をファイル名に合わせて更新（任意）
     try:
@@ -135,6 +204,7 @@ def delete(name_or_stem: str) -> None:
         raise FileNotFoundError(f"Preset not found: {p}")
 
     p.unlink()
+    _remove_template(stem)
 
 
 def rename(old_name: str, new_name: str) -> str:
@@ -162,6 +232,8 @@ def rename(old_name: str, new_name: str) -> str:
 
     dst = _preset_path(final_stem)
     src.rename(dst)
+    if _template_path(old_stem).exists():
+        _template_path(old_stem).rename(_template_path(final_stem))
 
     # JSON 内の name をファイル名に合わせて更新（任意）
     try:
@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import sys
-from PyQt5 import QtWidgets
-
-from core.app import C, DataStore
-from ui import MainView
+import multiprocessing
 
 
 def main():
+    # GUI 関連はここで読む（batch サブコマンドではウィンドウ系を読み込まない）
+    from PyQt5 import QtWidgets
+
+    from core.app import C, DataStore
+    from ui import MainView
+
     app = QtWidgets.QApplication(sys.argv)
 
     ds = DataStore()
@@ -20,4 +23,13 @@ def main():
 
 
 if __name__ == "__main__":
+    # 並列 OCR（spawn）を frozen 実行ファイルでも動かすため
+    multiprocessing.freeze_support()
+
+    # python main.py batch --preset NAME --csv out.csv INPUT...（ヘッドレス）
+    # python main.py watch --preset NAME --csv out.csv INBOX（ヘッドレスのフォルダ監視）
+    if len(sys.argv) > 1 and sys.argv[1] in ("batch", "watch"):
+        from core.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
     main()
@@ -0,0 +1,191 @@
+# path: ui/ingest.py
+# -*- coding: utf-8 -*-
+
+"""
+ファイル取込み（D&D されたファイル・フォルダ）をバックグラウンドで行う。
+
+走査 → 画像の拡張子で絞り込み → ページ展開 → サムネイル生成（スレッドプール）を
+GUI スレッドの外で行い、INGEST_BATCH 件ずつ sig_batch で渡す。リストへの追加だけが GUI スレッドで行われる。
+マルチページ TIFF / PDF は 1 ページ 1 項目（PageRef）として追加する。
+サムネイルと同じスレッドで内容ハッシュとサムネイルの dHash も作り、取り込み済みのページと
+重複するもの（同じファイルの別名保存・再スキャン）に OCR の前に印を付ける。
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt5 import QtCore, QtGui
+
+from core.app import C
+from core.image.io_utils import iter_image_files
+from core.image.hashing import DuplicateIndex, dhash, source_digest
+from core.image.pages import PageRef, iter_pages, load_page_thumbnail
+from core.image.qimage_convert import ndarray_to_qimage, qimage_view
+
+# 重複索引の key（同じファイルを 2 回取り込んでも項目ごとに別の key にする）
+_dup_keys = itertools.count(1)
+
+
+def read_thumbnail(path: str, size: int = C.LIST_THUMB_SIZE) -> QtGui.QImage:
+    """
+    サムネイルを読む。QImageReader の縮小読込みを使い、フル解像度では展開しない
+    （JPEG などは縮小したまま復号される）。読めなければ null の QImage。
+    QImage なので GUI スレッド以外で呼んでよい。
+    """
+    reader = QtGui.QImageReader(path)
+    full = reader.size()
+
+    if full.isValid() and (full.width() > size or full.height() > size):
+        reader.setScaledSize(full.scaled(size, size, QtCore.Qt.KeepAspectRatio))
+
+    img = reader.read()
+    if img.isNull():
+        return img
+
+    if img.width() > size or img.height() > size:
+        img = img.scaled(size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+    return img
+
+
+def _thumb_or_none(ref: PageRef) -> Optional[QtGui.QImage]:
+    try:
+        if ref.kind == "image":
+            img = read_thumbnail(ref.path)
+        else:
+            # 複数ページ文書は目的のページだけを縮小して復号する
+            img = ndarray_to_qimage(load_page_thumbnail(ref, C.LIST_THUMB_SIZE))
+    except Exception:
+        return None
+    return None if img.isNull() else img
+
+
+def _dedup_enabled() -> bool:
+    return C.DEDUP_EXACT != "off" or C.DEDUP_NEAR != "off"
+
+
+def _ingest_one(ref: PageRef) -> Optional[Tuple[QtGui.QImage, Optional[str], Optional[int]]]:
+    """
+    1 ページ分の (サムネイル, 内容ハッシュ, dHash)。サムネイルが作れなければ None。
+    dHash はサムネイルから作るので、フル解像度の復号は増えない。
+    """
+    img = _thumb_or_none(ref)
+    if img is None:
+        return None
+
+    if not _dedup_enabled():
+        return img, None, None
+
+    digest = source_digest(ref) if C.DEDUP_EXACT != "off" else None
+    dh = None
+    if C.DEDUP_NEAR != "off":
+        try:
+            dh = dhash(qimage_view(img.convertToFormat(QtGui.QImage.Format_Grayscale8)))
+        except Exception:
+            dh = None
+
+    return img, digest, dh
+
+
+class IngestWorker(QtCore.QThread):
+    """
+    paths（ファイル・フォルダ混在）を取り込む。
+    - sig_batch([(PageRef, thumb QImage, dup, dup_key), ...]): 読めたページを INGEST_BATCH 件ずつ
+      dup は重複なら {"kind": "exact" | "near", "of": 相手の表示名}、それ以外は None
+      dup_key は重複索引での項目の key（項目を消すときに DuplicateIndex.discard へ渡す。判定しなければ ""）
+    - sig_progress(処理済み, 見つかった件数): 件数はページ単位。走査中は見つかった件数も増えていく
+    - sig_done(追加件数, 読めなかった件数, うち重複の件数)
+    """
+
+    sig_batch = QtCore.pyqtSignal(list)
+    sig_progress = QtCore.pyqtSignal(int, int)
+    sig_done = QtCore.pyqtSignal(int, int, int)
+
+    def __init__(self, paths: List[str], dups: Optional[DuplicateIndex] = None, parent=None):
+        super().__init__(parent)
+        self._paths = list(paths)
+        # 取り込み済みページの索引（MainView が持つ。渡されなければこの取込みの中だけで判定）
+        self._dups = dups if dups is not None else DuplicateIndex()
+
+    def _check_dup(
+        self,
+        ref: PageRef,
+        digest: Optional[str],
+        dh: Optional[int],
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        # 投入順に判定するので、先に取り込んだ方が「元」になる
+        if digest is None and dh is None:
+            return None, ""
+
+        key = f"{ref.key}#{next(_dup_keys)}"
+        hit = self._dups.check_add(key, ref.display_name, digest, dh)
+        if hit is None:
+            return None, key
+
+        kind, of, _ = hit
+        return {"kind": kind, "of": of}, key
+
+    def _threads(self) -> int:
+        n = int(C.INGEST_THREADS or 0)
+        if n <= 0:
+            n = min(8, os.cpu_count() or 1)
+        return max(1, n)
+
+    def run(self) -> None:
+        batch_size = max(1, int(C.INGEST_BATCH))
+
+        added = 0
+        failed = 0
+        dups = 0
+        found = 0
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self._threads(), thread_name_prefix="ingest") as ex:
+            chunk: List[PageRef] = []
+
+            def flush() -> None:
+                nonlocal added, failed, dups, done
+                # map は投入順に結果を返すので、リストの並びはドロップ順のまま
+                batch = []
+                for ref, got in zip(chunk, ex.map(_ingest_one, chunk)):
+                    if got is None:
+                        failed += 1
+                    else:
+                        img, digest, dh = got
+                        dup, key = self._check_dup(ref, digest, dh)
+                        if dup is not None:
+                            dups += 1
+                        batch.append((ref, img, dup, key))
+
+                done += len(chunk)
+                chunk.clear()
+
+                if batch:
+                    added += len(batch)
+                    self.sig_batch.emit(batch)
+                self.sig_progress.emit(done, found)
+
+            seen = set()
+            for p in iter_image_files(self._paths, recursive=True):
+                if self.isInterruptionRequested():
+                    break
+
+                if not C.ALLOW_DUPLICATE_DROPS:
+                    if p in seen:
+                        continue
+                    seen.add(p)
+
+                for ref in iter_pages(p):
+                    found += 1
+                    chunk.append(ref)
+                    if len(chunk) >= batch_size:
+                        flush()
+
+            if chunk and not self.isInterruptionRequested():
+                flush()
+
+        self.sig_done.emit(added, failed, dups)
@@ -9,7 +9,11 @@ from typing import List, Optional
 from PyQt5 import QtWidgets, QtGui, QtCore
 
 from core.app import C, DataStore, bind_with_datastore, presets_dir
-from core.image.io_utils import deduplicate_file_list, is_image_ext
+from core.image.hashing import DuplicateIndex
+from core.image.loader import load_page
+from core.image.page_cache import PageCache
+from core.image.pages import PageRef, load_page_ref
+from core.image.qimage_convert import ndarray_to_qimage
 from core.presets import (
     list_names as preset_list_names,
     load as preset_load,
@@ -19,14 +23,48 @@ from core.presets import (
     rename as preset_rename,
     Preset,
 )
-from core.ocr import OCRTask, OCRWorker
+from core.ocr import OCRTask, OCRWorker, WatchWorker, EngineLoader
+from core.ocr.pool import resolve_workers
+from core.ocr.timing import format_summary
+from core.csvio import CSVStreamWriter, JobJournal, ResultStore, count_other_presets, reexport
 
 from ui.preset import PresetEditorDialog
+from ui.ingest import IngestWorker
+from ui.preview_cache import PreviewCache, PreviewRenderer
+
+
+def read_page_qimage(ref: PageRef) -> QtGui.QImage:
+    """
+    ページ画像をフル解像度で読む（PageCache の loader）。
+    複数ページ文書は該当ページだけを復号する。
+    """
+    if ref.kind == "image":
+        img = QtGui.QImage(ref.path)
+    else:
+        img = ndarray_to_qimage(load_page_ref(ref))
+
+    if img.isNull():
+        raise ValueError(f"画像を読み込めません: {ref.display_name}")
+    return img
+
+
+def payload_ref(payload: Optional[dict]) -> Optional[PageRef]:
+    """
+    リスト項目のページ参照。無ければ None。
+    """
+    payload = payload or {}
+    ref = payload.get("ref")
+    if ref is not None:
+        return ref
+
+    path = payload.get("src_path", "")
+    return PageRef(path) if path else None
 
 
 class FileListWidget(QtWidgets.QListWidget):
     request_preview = QtCore.pyqtSignal(object)
     request_delete_rows = QtCore.pyqtSignal(list)
+    request_add_paths = QtCore.pyqtSignal(list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -36,17 +74,72 @@ class FileListWidget(QtWidgets.QListWidget):
         self.viewport().setAcceptDrops(True)
         self.setDragEnabled(False)
         self.setDragDropMode(QtWidgets.QAbstractItemView.DropOnly)
+        self.setIconSize(QtCore.QSize(C.LIST_THUMB_SIZE, C.LIST_THUMB_SIZE))
 
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self._on_ctx)
         self.itemSelectionChanged.connect(self._emit_preview)
 
-    def add_qimage(self, qimg: QtGui.QImage, name: str, src_path: Optional[str] = None):
+    def add_file(
+        self,
+        src,
+        thumb: Optional[QtGui.QImage] = None,
+        name: str = "",
+        dup: Optional[dict] = None,
+        dup_key: str = "",
+    ):
+        """
+        リストに 1 件（1 ページ）追加する。src はパスまたは PageRef。
+        項目が持つのはページ参照とサムネイルだけで、
+        フル解像度の画像は必要な時に MainView.pages（LRU）から読む。
+        dup（{"kind": "exact" | "near", "of": 表示名}）があれば重複の印を付ける。
+        dup_key は重複索引（MainView.dups）での項目の key。
+        """
+        ref = src if isinstance(src, PageRef) else PageRef(src)
+        name = name or ref.display_name
         item = QtWidgets.QListWidgetItem(name)
-        payload = {"qimage": qimg, "name": name, "src_path": src_path or ""}
+        if thumb is not None and not thumb.isNull():
+            item.setIcon(QtGui.QIcon(QtGui.QPixmap.fromImage(thumb)))
+
+        payload = {"name": name, "src_path": ref.path, "ref": ref, "dup": dup, "dup_key": dup_key}
         item.setData(QtCore.Qt.UserRole, payload)
+        self.set_dup(item, dup)
+
         self.addItem(item)
 
+    def set_dup(self, item: QtWidgets.QListWidgetItem, dup: Optional[dict]) -> None:
+        """
+        項目の重複の印を付け直す（dup が None なら外す）。
+        """
+        payload = dict(item.data(QtCore.Qt.UserRole) or {})
+        payload["dup"] = dup
+        item.setData(QtCore.Qt.UserRole, payload)
+
+        name = payload.get("name", "")
+        path = payload.get("src_path", "")
+        if not dup:
+            item.setText(name)
+            item.setData(QtCore.Qt.ForegroundRole, None)
+            item.setToolTip(path)
+            return
+
+        exact = dup.get("kind") == "exact"
+        item.setText(f"{name} [{'重複' if exact else '類似'}]")
+        item.setForeground(QtGui.QBrush(QtGui.QColor("gray")))
+        what = "内容が同じ" if exact else "見た目がほぼ同じ"
+        item.setToolTip(f"{path}\n「{dup.get('of', '')}」と{what}ページです")
+
+    def add_files(self, batch: list):
+        """
+        [(PageRef, thumb, dup, dup_key), ...] をまとめて追加する（取込みスレッドからの一括追加用）。
+        """
+        self.setUpdatesEnabled(False)
+        try:
+            for ref, thumb, dup, dup_key in batch:
+                self.add_file(ref, thumb, dup=dup, dup_key=dup_key)
+        finally:
+            self.setUpdatesEnabled(True)
+
     def current_payload(self):
         it = self.currentItem()
         if not it:
@@ -98,33 +191,16 @@ class FileListWidget(QtWidgets.QListWidget):
             e.ignore()
             return
 
+        # 走査・サムネイル生成は MainView が取込みスレッドで行う（ここでは画像を開かない）
         paths = [u.toLocalFile() for u in e.mimeData().urls()]
-        paths = deduplicate_file_list(paths)
+        paths = [p for p in paths if p]
 
         if not paths:
             e.ignore()
             return
 
-        loaded = 0
-        for p in paths:
-            try:
-                if not is_image_ext(p):
-                    continue
-
-                qimg = QtGui.QImage(p)
-                if qimg.isNull():
-                    continue
-
-                name = os.path.basename(p)
-                self.add_qimage(qimg, name=name, src_path=p)
-                loaded += 1
-            except Exception:
-                pass
-
-        if loaded > 0:
-            e.acceptProposedAction()
-        else:
-            e.ignore()
+        self.request_add_paths.emit(paths)
+        e.acceptProposedAction()
 
     # ---- Deleteキー対応 ----
     def keyPressEvent(self, e: QtGui.QKeyEvent):
@@ -143,10 +219,22 @@ class MainView(QtWidgets.QMainWindow):
         self.ds = datastore
         self.setWindowTitle(f"{C.APP_NAME} {C.APP_VERSION}")
 
+        # 展開済みページ（プリセット編集用）。容量上限付き LRU
+        self.pages = PageCache(loader=read_page_qimage)
+
+        # プレビューは事前縮小した画像から表示する（縮小はバックグラウンド）
+        self.preview_cache = PreviewCache()
+
+        # 取り込んだページの内容ハッシュ / dHash（重複ページの検出用）
+        self.dups = DuplicateIndex()
+        self._preview_renderer = PreviewRenderer(parent=self)
+        self._preview_renderer.sig_ready.connect(self._on_preview_ready)
+
         # 左：ファイルリスト
         self.listw = FileListWidget()
         self.listw.request_preview.connect(self.on_preview)
         self.listw.request_delete_rows.connect(self.on_delete_rows)
+        self.listw.request_add_paths.connect(self.start_ingest)
 
         # 右：プリセット＋プレビュー
         self.combo_preset = QtWidgets.QComboBox()
@@ -158,6 +246,13 @@ class MainView(QtWidgets.QMainWindow):
         self.preview = QtWidgets.QLabel(alignment=QtCore.Qt.AlignCenter)
         self.preview.setMinimumSize(500, 360)
         self.preview.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.preview.installEventFilter(self)
+
+        # ウィンドウ／スプリッタのリサイズ中は描き直さず、止まってから 1 回だけ描く
+        self._preview_timer = QtCore.QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(int(C.PREVIEW_DEBOUNCE_MS))
+        self._preview_timer.timeout.connect(self._refresh_preview)
 
         # ボタン（指定の配置）
         # 左リスト上：削除／クリア（横に広げて均等割り）
@@ -169,7 +264,9 @@ class MainView(QtWidgets.QMainWindow):
         # プレビュー下：一括OCR／一項目OCR（横に広げて中央で均等割り）
         self.btn_ocr_all  = QtWidgets.QPushButton("一括OCR")
         self.btn_ocr_one  = QtWidgets.QPushButton("一項目OCR")
-        for b in (self.btn_ocr_all, self.btn_ocr_one):
+        self.btn_reexport = QtWidgets.QPushButton("CSV再出力")
+        self.btn_reexport.setToolTip("保存済みのOCR結果から、現在のプリセットのレイアウトでCSVを作り直します（OCRなし）")
+        for b in (self.btn_ocr_all, self.btn_ocr_one, self.btn_reexport):
             b.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
 
         # CSV UI
@@ -179,6 +276,17 @@ class MainView(QtWidgets.QMainWindow):
         self.chk_append = QtWidgets.QCheckBox("指定したCSVに追記する")
         self.chk_append.setChecked(bool(self.ds.get("csv_append", C.CSV_APPEND_DEFAULT)))
 
+        # フォルダ監視 UI（受信フォルダに届いたファイルを自動で OCR して CSV へ追記）
+        self.lbl_watch_dir = QtWidgets.QLabel("監視フォルダ：")
+        self.edit_watch = QtWidgets.QLineEdit(self.ds.get("watch_dir", ""))
+        self.btn_watch_dir = QtWidgets.QPushButton("参照")
+        self.btn_watch = QtWidgets.QPushButton("監視開始")
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.setToolTip(
+            f"届いたファイルを現在のプリセットで OCR して保存先 CSV へ追記し、"
+            f"受信フォルダ内の「{C.WATCH_DONE_DIR}」「{C.WATCH_FAILED_DIR}」へ移します"
+        )
+
         # 進捗・ログ
         self.progress = QtWidgets.QProgressBar()
         self.log = QtWidgets.QTextEdit()
@@ -197,6 +305,7 @@ class MainView(QtWidgets.QMainWindow):
         hocr = QtWidgets.QHBoxLayout()
         hocr.addWidget(self.btn_ocr_all, 1)
         hocr.addWidget(self.btn_ocr_one, 1)
+        hocr.addWidget(self.btn_reexport, 1)
 
         # CSV列（参照の右隣に「指定したCSVに追記する」）
         hcsv = QtWidgets.QHBoxLayout()
@@ -206,12 +315,21 @@ class MainView(QtWidgets.QMainWindow):
         hcsv.addSpacing(8)
         hcsv.addWidget(self.chk_append)
 
+        # 監視フォルダ列
+        hwatch = QtWidgets.QHBoxLayout()
+        hwatch.addWidget(self.lbl_watch_dir)
+        hwatch.addWidget(self.edit_watch, 1)
+        hwatch.addWidget(self.btn_watch_dir)
+        hwatch.addSpacing(8)
+        hwatch.addWidget(self.btn_watch)
+
         # 右ペインまとめ
         right = QtWidgets.QVBoxLayout()
         right.addLayout(top)
         right.addWidget(self.preview, 4)
         right.addLayout(hocr)
         right.addLayout(hcsv)
+        right.addLayout(hwatch)
         right.addWidget(self.progress)
         right.addWidget(self.log, 2)
 
@@ -252,6 +370,9 @@ class MainView(QtWidgets.QMainWindow):
         self.btn_del.clicked.connect(self.on_preset_del)
         self.btn_ocr_one.clicked.connect(self.on_ocr_one)
         self.btn_ocr_all.clicked.connect(self.on_ocr_all)
+        self.btn_reexport.clicked.connect(self.on_reexport)
+        self.btn_watch_dir.clicked.connect(self.on_browse_watch)
+        self.btn_watch.toggled.connect(self.on_toggle_watch)
 
         # ファイル監視（プリセットフォルダの変更を即反映）
         self._watcher = QtCore.QFileSystemWatcher(self)
@@ -266,22 +387,200 @@ class MainView(QtWidgets.QMainWindow):
 
         self.worker: Optional[OCRWorker] = None
 
+        # OCR エンジンの状態表示（ウィンドウ表示直後にバックグラウンドで読込）
+        self.lbl_engine = QtWidgets.QLabel("OCRエンジン: 未読込")
+        self.statusBar().addPermanentWidget(self.lbl_engine)
+        self._engine_loader: Optional[EngineLoader] = None
+        self._engine_warmup_started = False
+
+        # ファイル取込みの進捗（取込み中だけ表示）
+        self.lbl_ingest = QtWidgets.QLabel("")
+        self.prog_ingest = QtWidgets.QProgressBar()
+        self.prog_ingest.setMaximumWidth(200)
+        self.statusBar().addWidget(self.lbl_ingest)
+        self.statusBar().addWidget(self.prog_ingest)
+        self.lbl_ingest.hide()
+        self.prog_ingest.hide()
+        self._ingest: Optional[IngestWorker] = None
+        self._ingest_queue: List[List[str]] = []
+
+        # フォルダ監視（監視中だけ表示）
+        self.lbl_watch = QtWidgets.QLabel("")
+        self.statusBar().addWidget(self.lbl_watch)
+        self.lbl_watch.hide()
+        self._watch: Optional[WatchWorker] = None
+        self._watch_counts = [0, 0]
+        self._inbox_watcher = QtCore.QFileSystemWatcher(self)
+        self._inbox_watcher.directoryChanged.connect(self._on_inbox_changed)
+
+    # ========== OCR エンジン ==========
+    def showEvent(self, e: QtGui.QShowEvent):
+        super().showEvent(e)
+
+        if not self._engine_warmup_started:
+            self._engine_warmup_started = True
+            QtCore.QTimer.singleShot(0, self._start_engine_loader)
+
+    def closeEvent(self, e: QtGui.QCloseEvent):
+        self._ingest_queue.clear()
+        if self._ingest is not None and self._ingest.isRunning():
+            self._ingest.requestInterruption()
+            self._ingest.wait()
+        self._preview_renderer.stop()
+        self._preview_renderer.wait()
+        if self._engine_loader is not None and self._engine_loader.isRunning():
+            self._engine_loader.wait()
+        if self.worker is not None and self.worker.isRunning():
+            # 処理中のページまでを CSV へ書き切ってから閉じる
+            self.worker.requestInterruption()
+            self.worker.wait()
+        if self._watch is not None and self._watch.isRunning():
+            self._watch.stop()
+            self._watch.wait()
+        super().closeEvent(e)
+
+    # ----- ファイル取込み -----
+    def start_ingest(self, paths: List[str]):
+        """
+        ファイル・フォルダを取り込む。走査とサムネイル生成はバックグラウンドで行い、
+        読めたものから順にリストへ追加する。取込み中に来た分は終わってから続けて処理する。
+        """
+        if not paths:
+            return
+
+        if self._ingest is not None and self._ingest.isRunning():
+            self._ingest_queue.append(list(paths))
+            return
+
+        self._ingest = IngestWorker(paths, dups=self.dups, parent=self)
+        self._ingest.sig_batch.connect(self.listw.add_files)
+        self._ingest.sig_progress.connect(self._on_ingest_progress)
+        self._ingest.sig_done.connect(self._on_ingest_done)
+        self._ingest.finished.connect(self._on_ingest_finished)
+
+        self.lbl_ingest.setText("取込み中…")
+        self.prog_ingest.setRange(0, 0)
+        self.lbl_ingest.show()
+        self.prog_ingest.show()
+        self._ingest.start()
+
+    def _on_ingest_progress(self, done: int, found: int):
+        self.prog_ingest.setRange(0, max(1, found))
+        self.prog_ingest.setValue(done)
+        self.lbl_ingest.setText(f"取込み中 {done}/{found}")
+
+    def _on_ingest_done(self, added: int, failed: int, dups: int):
+        msg = f"取込み: {added}件"
+        if dups:
+            msg += f"（うち重複・類似 {dups}件）"
+        if failed:
+            msg += f"（読込失敗 {failed}件）"
+        self.log.append(msg)
+
+    def _on_ingest_finished(self):
+        # スレッド終了後に次の取込みへ（sig_done の時点ではまだ isRunning() が True）
+        if self._ingest_queue:
+            self.start_ingest(self._ingest_queue.pop(0))
+            return
+
+        self.lbl_ingest.hide()
+        self.prog_ingest.hide()
+
+    def _start_engine_loader(self):
+        if self._engine_loader is not None and self._engine_loader.isRunning():
+            return
+
+        if resolve_workers() > 1:
+            # 並列モードでは各ワーカープロセスが自前のエンジンを読み込む
+            self.lbl_engine.setText("OCRエンジン: 並列モード")
+            return
+
+        self.lbl_engine.setText("OCRエンジン: 読込中…")
+        self._engine_loader = EngineLoader(parent=self)
+        self._engine_loader.sig_ready.connect(self._on_engine_ready)
+        self._engine_loader.start()
+
+    def _on_engine_ready(self, ok: bool, message: str):
+        if ok:
+            self.lbl_engine.setText("OCRエンジン: 準備完了")
+            return
+
+        self.lbl_engine.setText("OCRエンジン: 読込失敗")
+        self.log.append(f"[error] OCRエンジンの読込に失敗: {message}")
+
     # ========== UI handlers ==========
+    def _page_image(self, payload: Optional[dict]) -> Optional[QtGui.QImage]:
+        """
+        項目のページ画像（フル解像度）。読めなければ None。
+        """
+        ref = payload_ref(payload)
+        if ref is None:
+            return None
+
+        try:
+            return self.pages.get(ref)
+        except Exception as e:
+            self.log.append(f"[error] 画像を読み込めません: {ref.display_name} / {e}")
+            return None
+
     def on_preview(self, payload: dict):
-        qimage: QtGui.QImage = payload.get("qimage")
-        if not isinstance(qimage, QtGui.QImage) or qimage.isNull():
+        ref = payload_ref(payload)
+        if ref is None:
             self.preview.clear()
             return
 
-        pix = QtGui.QPixmap.fromImage(qimage)
-        self.preview.setPixmap(
-            pix.scaled(self.preview.size(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-        )
+        pix = self.preview_cache.pixmap_for(ref, self.preview.size())
+        if pix is not None:
+            self.preview.setPixmap(pix)
+        else:
+            # 縮小版ができるまではサムネイルを仮表示
+            it = self.listw.currentItem()
+            icon = it.icon() if it is not None else QtGui.QIcon()
+            if icon.isNull():
+                self.preview.clear()
+            else:
+                thumb = icon.pixmap(self.listw.iconSize())
+                self.preview.setPixmap(thumb.scaled(self.preview.size(), QtCore.Qt.KeepAspectRatio))
+
+        self._prefetch_previews()
+
+    def _prefetch_previews(self):
+        """
+        選択項目と前後 PREVIEW_PREFETCH 件のうち、縮小版の無いものを作らせる。
+        """
+        row = self.listw.currentRow()
+        if row < 0:
+            return
+
+        rows = [row]
+        for d in range(1, int(C.PREVIEW_PREFETCH) + 1):
+            rows.extend([row + d, row - d])
+
+        refs = []
+        for r in rows:
+            it = self.listw.item(r) if 0 <= r < self.listw.count() else None
+            ref = payload_ref(it.data(QtCore.Qt.UserRole) if it is not None else None)
+            if ref is not None and not self.preview_cache.has(ref):
+                refs.append(ref)
+
+        if refs:
+            self._preview_renderer.request(refs)
 
-    def resizeEvent(self, e: QtGui.QResizeEvent):
-        super().resizeEvent(e)
+    def _on_preview_ready(self, ref: PageRef, full: QtCore.QSize, images: dict):
+        self.preview_cache.put(ref, full, images)
+
+        # 読めなかったときは仮表示のまま（表示し直すと同じページをまた作らせてしまう）
+        if images and payload_ref(self.listw.current_payload()) == ref:
+            self._refresh_preview()
+
+    def _refresh_preview(self):
         self.on_preview(self.listw.current_payload() or {})
 
+    def eventFilter(self, obj, e):
+        if obj is self.preview and e.type() == QtCore.QEvent.Resize:
+            self._preview_timer.start()
+        return super().eventFilter(obj, e)
+
     def on_browse_csv(self):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "CSV保存先", "", "CSV (*.csv)")
         if path:
@@ -290,10 +589,34 @@ class MainView(QtWidgets.QMainWindow):
             self.ds.save()
 
     def on_delete_rows(self, rows_desc: List[int]):
+        changed = {}
         for r in rows_desc:
             it = self.listw.takeItem(r)
+            if it is not None:
+                pl = it.data(QtCore.Qt.UserRole) or {}
+                ref = payload_ref(pl)
+                if ref is not None:
+                    self.pages.discard(ref)
+                    self.preview_cache.discard(ref)
+                if pl.get("dup_key"):
+                    changed.update(self.dups.discard(pl["dup_key"]))
+                    changed.pop(pl["dup_key"], None)
             del it
 
+        if changed:
+            self._update_dups(changed)
+
+    def _update_dups(self, changed: dict):
+        """
+        元を消したことで判定が変わった項目の印を付け直す（最初の重複は元になり、印が外れる）。
+        """
+        for i in range(self.listw.count()):
+            it = self.listw.item(i)
+            key = (it.data(QtCore.Qt.UserRole) or {}).get("dup_key")
+            if key in changed:
+                hit = changed[key]
+                self.listw.set_dup(it, {"kind": hit[0], "of": hit[1]} if hit is not None else None)
+
     def _ui_delete_selected(self):
         rows = self.listw.selected_rows_desc()
         if rows:
@@ -325,15 +648,29 @@ class MainView(QtWidgets.QMainWindow):
         return self.combo_preset.itemText(ix)
 
     # ----- Preset ops -----
+    def _save_preset(self, preset: Preset, name: str, base_img: Optional[QtGui.QImage]) -> None:
+        """
+        プリセットを保存する。ROI を置いた基準画像があれば位置合わせ用の特徴点も取り直す。
+        """
+        reference = None
+        if base_img is not None and not base_img.isNull():
+            try:
+                reference = load_page(base_img)
+            except Exception:
+                reference = None
+
+        preset_save(preset, name, reference=reference)
+
+        if reference is not None and not preset.template:
+            self.log.append(f"位置合わせ: 基準画像から特徴点が取れないため無効です（{name}）")
+
     def on_preset_new(self):
-        payload = self.listw.current_payload()
+        base_img = self._page_image(self.listw.current_payload())
 
-        if not payload or not isinstance(payload.get("qimage"), QtGui.QImage) or payload["qimage"].isNull():
+        if base_img is None or base_img.isNull():
             QtWidgets.QMessageBox.information(self, C.APP_NAME, "エディタを開くには画像を一つ選択してください。")
             return
 
-        base_img = payload["qimage"]
-
         try:
             dlg = PresetEditorDialog(base_image=base_img, preset=None, parent=self, datastore=self.ds)
             if dlg.exec_() != QtWidgets.QDialog.Accepted:
@@ -346,7 +683,7 @@ class MainView(QtWidgets.QMainWindow):
                 return
 
             self.log.append(f"プリセット作成: {result_name}")
-            preset_save(result_preset, result_name)
+            self._save_preset(result_preset, result_name, base_img)
             self.refresh_preset_combo(result_name)
         except Exception as e:
             QtWidgets.QMessageBox.warning(self, C.APP_NAME, f"[error] プリセット作成に失敗: {e}")
@@ -363,8 +700,7 @@ class MainView(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, C.APP_NAME, f"プリセット読込に失敗: {e}")
             return
 
-        payload = self.listw.current_payload()
-        base_img = payload.get("qimage") if payload else None
+        base_img = self._page_image(self.listw.current_payload())
 
         try:
             dlg = PresetEditorDialog(base_image=base_img, preset=p, parent=self, datastore=self.ds)
@@ -375,14 +711,14 @@ class MainView(QtWidgets.QMainWindow):
 
             if result_name != name:
                 final_name = preset_rename(name, result_name)
-                preset_save(result_preset, final_name)
+                self._save_preset(result_preset, final_name, base_img)
                 self.refresh_preset_combo(final_name)
                 self.log.append(f"プリセット改名: {name} → {final_name}")
                 self.ds.set("last_preset_name", final_name)
                 self.ds.save()
                 return
 
-            preset_save(result_preset, name)
+            self._save_preset(result_preset, name, base_img)
             self.refresh_preset_combo(name)
             self.log.append(f"プリセット更新: {name}")
         except Exception as e:
@@ -464,7 +800,12 @@ class MainView(QtWidgets.QMainWindow):
             self.log.append("CSV保存先を指定してください")
             return
 
-        tasks = [OCRTask(qimage=payloads[0]["qimage"], preset=p, display_name=payloads[0]["name"])]
+        tasks = [OCRTask(
+            source=payload_ref(payloads[0]),
+            preset=p,
+            display_name=payloads[0]["name"],
+            src_path=payloads[0].get("src_path", ""),
+        )]
         self._run_worker(tasks, csv_path)
 
     def on_ocr_all(self):
@@ -478,11 +819,23 @@ class MainView(QtWidgets.QMainWindow):
             return
 
         tasks = []
+        skipped = 0
         for i in range(self.listw.count()):
             it = self.listw.item(i)
             pl = it.data(QtCore.Qt.UserRole)
+            if pl and self._skip_duplicate(pl):
+                skipped += 1
+                continue
             if pl:
-                tasks.append(OCRTask(qimage=pl["qimage"], preset=p, display_name=pl["name"]))
+                tasks.append(OCRTask(
+                    source=payload_ref(pl),
+                    preset=p,
+                    display_name=pl["name"],
+                    src_path=pl.get("src_path", ""),
+                ))
+
+        if skipped:
+            self.log.append(f"重複ページのためスキップ: {skipped}件（一項目OCRなら処理できます）")
 
         if not tasks:
             self.log.append("リストが空です")
@@ -490,35 +843,58 @@ class MainView(QtWidgets.QMainWindow):
 
         self._run_worker(tasks, csv_path)
 
+    def _skip_duplicate(self, payload: dict) -> bool:
+        """
+        一括OCRで飛ばす重複ページか（DEDUP_EXACT / DEDUP_NEAR が "skip" の種類）。
+        """
+        dup = payload.get("dup")
+        if not dup:
+            return False
+        action = C.DEDUP_EXACT if dup.get("kind") == "exact" else C.DEDUP_NEAR
+        return action == "skip"
+
     def _run_worker(self, tasks: List[OCRTask], csv_path: str):
         if hasattr(self, "worker") and self.worker and self.worker.isRunning():
             self.log.append("処理中です")
             return
 
+        if self._watch is not None and self._watch.isRunning():
+            self.log.append("フォルダ監視中です。先に監視を停止してください")
+            return
+
+        # 結果は 1 件終わるたびにワーカー側で CSV へ書き足す（途中で止まっても残る）
+        # 追記ならジョブ記録を見て、この CSV へ処理済みの入力は飛ばす
+        appended = bool(self.chk_append.isChecked())
+        journal = JobJournal(csv_path) if C.JOB_JOURNAL_ENABLED else None
+        writer = CSVStreamWriter(csv_path, append=appended, journal=journal)
+
         self.progress.setValue(0)
-        self.worker = OCRWorker(tasks)
+        self.worker = OCRWorker(tasks, writer=writer)
         self.worker.sig_progress.connect(self.progress.setValue)
         self.worker.sig_log.connect(self.log.append)
-        self.worker.sig_done.connect(lambda processed: self._on_worker_done(processed, csv_path))
+        self.worker.sig_timing.connect(self._on_worker_timing)
+        self.worker.sig_done.connect(lambda processed: self._on_worker_done(processed, writer, appended))
         self.worker.start()
         self.log.append(f"OCR開始: {len(tasks)}件")
 
-    def _on_worker_done(self, processed: List[dict], csv_path: str):
-        rows = []
-        for it in processed:
-            for r in it.get("rows", []):
-                rows.append(r)
-
-        if rows:
-            try:
-                appended = bool(self.chk_append.isChecked())
-                from core.csvio.writer import write_rows
-                n = write_rows(csv_path, rows, append=appended)
-                self.log.append(f"CSVへ{'追記' if appended else '上書き'}: {n}行 -> {csv_path}")
-            except Exception as e:
-                self.log.append(f"[error] CSV書込み失敗: {e}")
-        else:
-            self.log.append("書き込む行がありません")
+    def _on_worker_timing(self, summary: dict):
+        if not C.TIMING_LOG_SUMMARY:
+            return
+        for line in format_summary(summary):
+            self.log.append(line)
+
+    def _on_worker_done(self, processed: List[dict], writer: CSVStreamWriter, appended: bool):
+        # ワーカーが writer を閉じ終えてから呼ばれる（書込み失敗はワーカーがログ済み）
+        if writer.error is None:
+            if writer.rows:
+                self.log.append(f"CSVへ{'追記' if appended else '上書き'}: {writer.rows}行 -> {writer.csv_path}")
+            else:
+                self.log.append("書き込む行がありません")
+
+        if writer.store_error is not None:
+            self.log.append(f"[warn] OCR結果の保存に失敗（再出力は利用できません）: {writer.store_error}")
+        if writer.journal_error is not None:
+            self.log.append(f"[warn] 処理記録の保存に失敗（次回の再開時に再処理されます）: {writer.journal_error}")
 
         self.ds.set("csv_append", bool(self.chk_append.isChecked()))
         self.ds.set("last_csv_path", self.edit_csv.text().strip())
@@ -526,3 +902,161 @@ class MainView(QtWidgets.QMainWindow):
         self.ds.save()
 
         self.log.append("OCR完了")
+
+    # ----- フォルダ監視 -----
+    def on_browse_watch(self):
+        path = QtWidgets.QFileDialog.getExistingDirectory(self, "監視フォルダ", self.edit_watch.text().strip())
+        if path:
+            self.edit_watch.setText(path)
+            self.ds.set("watch_dir", path)
+            self.ds.save()
+
+    def on_toggle_watch(self, checked: bool):
+        if checked:
+            if not self._start_watch():
+                self.btn_watch.blockSignals(True)
+                self.btn_watch.setChecked(False)
+                self.btn_watch.blockSignals(False)
+        else:
+            self._stop_watch()
+
+    def _start_watch(self) -> bool:
+        """
+        受信フォルダの監視を始める。常駐ワーカーがエンジンを使い回し、結果は保存先 CSV へ追記する。
+        """
+        if self._watch is not None and self._watch.isRunning():
+            return True
+
+        if self.worker and self.worker.isRunning():
+            self.log.append("処理中です")
+            return False
+
+        inbox = self.edit_watch.text().strip()
+        if not inbox:
+            self.log.append("監視フォルダを指定してください")
+            return False
+
+        csv_path = self.edit_csv.text().strip()
+        if not csv_path:
+            self.log.append("CSV保存先を指定してください")
+            return False
+
+        p = self._load_current_preset()
+        if not p:
+            return False
+
+        try:
+            os.makedirs(inbox, exist_ok=True)
+        except Exception as e:
+            self.log.append(f"[error] 監視フォルダを作成できません: {inbox} / {e}")
+            return False
+
+        # 監視の結果は常に追記（処理済みの入力はジョブ記録で飛ばす）
+        journal = JobJournal(csv_path) if C.JOB_JOURNAL_ENABLED else None
+        writer = CSVStreamWriter(csv_path, append=True, journal=journal)
+
+        self._watch = WatchWorker(inbox, p, writer, parent=self)
+        self._watch.sig_log.connect(self.log.append)
+        self._watch.sig_file.connect(self._on_watch_file)
+        self._watch.finished.connect(self._on_watch_finished)
+
+        self._inbox_watcher.addPath(inbox)
+        self._watch_counts = [0, 0]
+        self._set_watch_ui(True)
+        self._update_watch_status()
+
+        self.ds.set("watch_dir", inbox)
+        self.ds.set("last_csv_path", csv_path)
+        self.ds.set("last_preset_name", self._current_preset_name())
+        self.ds.save()
+
+        self._watch.start()
+        self.log.append(f"フォルダ監視開始: {inbox} -> {csv_path}")
+        return True
+
+    def _stop_watch(self):
+        if self._watch is None or not self._watch.isRunning():
+            return
+        # 処理中のファイルを終えてから止まる（finished で UI を戻す）
+        self.btn_watch.setEnabled(False)
+        self.lbl_watch.setText("監視停止中…")
+        self._watch.stop()
+
+    def _set_watch_ui(self, watching: bool):
+        self.btn_watch.setText("監視停止" if watching else "監視開始")
+        self.btn_watch.setEnabled(True)
+        for w in (self.edit_watch, self.btn_watch_dir, self.edit_csv, self.btn_csv,
+                  self.btn_ocr_all, self.btn_ocr_one, self.btn_reexport):
+            w.setEnabled(not watching)
+        self.lbl_watch.setVisible(watching)
+
+    def _on_inbox_changed(self, _path: str):
+        if self._watch is not None:
+            self._watch.wake()
+
+    def _on_watch_file(self, path: str, ok: bool, rows: int, dst: str):
+        self._watch_counts[0 if ok else 1] += 1
+        self._update_watch_status()
+
+    def _update_watch_status(self):
+        done, failed = self._watch_counts
+        self.lbl_watch.setText(f"監視中: 処理 {done}件 / 失敗 {failed}件")
+
+    def _on_watch_finished(self):
+        dirs = self._inbox_watcher.directories()
+        if dirs:
+            self._inbox_watcher.removePaths(dirs)
+
+        self._set_watch_ui(False)
+        self.btn_watch.blockSignals(True)
+        self.btn_watch.setChecked(False)
+        self.btn_watch.blockSignals(False)
+
+        done, failed = self._watch_counts
+        self.log.append(f"フォルダ監視終了: 処理 {done}件 / 失敗 {failed}件")
+
+    # ----- 再出力 -----
+    def on_reexport(self):
+        p = self._load_current_preset()
+        if not p:
+            return
+
+        csv_path = self.edit_csv.text().strip()
+        if not csv_path:
+            self.log.append("CSV保存先を指定してください")
+            return
+
+        if self.worker and self.worker.isRunning():
+            self.log.append("処理中です")
+            return
+
+        store = ResultStore()
+        records = store.load(csv_path)
+        if not records:
+            self.log.append("このCSVに対する保存済みのOCR結果がありません。先にOCRを実行してください")
+            return
+
+        # 別のプリセットで追記した結果を今のレイアウトで組み直すと列がずれる
+        others = count_other_presets(records, p.name)
+        if others:
+            detail = ", ".join(f"「{k}」{v}件" for k, v in sorted(others.items()))
+            self.log.append(
+                f"別のプリセットで作られた結果（{detail}）が含まれるため、"
+                f"プリセット「{p.name}」では再出力できません"
+            )
+            return
+
+        msg = (
+            f"保存済みの {len(records)} 件の結果から、プリセット「{p.name}」のレイアウトでCSVを作り直します。\n"
+            f"{csv_path} は上書きされます。よろしいですか？"
+        )
+        if QtWidgets.QMessageBox.question(self, C.APP_NAME, msg) != QtWidgets.QMessageBox.Yes:
+            return
+
+        try:
+            n = reexport(csv_path, p.layout_text, store=store, preset_name=p.name)
+        except Exception as e:
+            self.log.append(f"[error] CSV再出力失敗: {e}")
+            return
+
+        self.log.append(f"CSV再出力: {n}行 -> {csv_path}")
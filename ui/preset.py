@@ -695,6 +695,7 @@ class PresetEditorDialog(QtWidgets.QDialog):
             image_h=self._preset.image_h,
             rois=[ROI(x=r.x, y=r.y, w=r.w, h=r.h, orientation=r.orientation) for r in self._preset.rois],
             layout_text=self.edit_layout.toPlainText(),
+            template=self._preset.template,
         )
 
     def _snapshot_push(self):
@@ -719,6 +720,7 @@ class PresetEditorDialog(QtWidgets.QDialog):
             image_h=snap.image_h,
             rois=[ROI(x=r.x, y=r.y, w=r.w, h=r.h, orientation=r.orientation) for r in snap.rois],
             layout_text=snap.layout_text,
+            template=snap.template,
         )
 
         self.edit_name.setText(self._preset.name or "preset")
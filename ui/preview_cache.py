@@ -0,0 +1,224 @@
+# path: ui/preview_cache.py
+# -*- coding: utf-8 -*-
+
+"""
+プレビュー表示用の事前縮小キャッシュ。
+
+- PreviewRenderer: バックグラウンドで画像を縮小読込みし、PREVIEW_SIZES の各サイズを作る
+- PreviewCache: ページごとの縮小済み QPixmap（GUI スレッド専用）。容量上限付き LRU
+ページはパス、または PageRef（複数ページ文書の 1 ページ。キーは ref.key）で指定する。
+表示時は表示サイズ以上で最小のものを選んで最後の縮小だけを行うので、
+フル解像度の画像を GUI スレッドで展開・縮小することはない。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+from PyQt5 import QtCore, QtGui
+
+from core.app import C
+from core.image.pages import PageRef, load_page_thumbnail
+from core.image.qimage_convert import ndarray_to_qimage
+
+PageKey = Union[str, PageRef]
+
+# 読めなかったページの記録の上限（古いものから忘れる）
+_MAX_FAILED = 4096
+
+
+def _file_sig(path: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0, 0
+    return st.st_mtime_ns, st.st_size
+
+
+def _key_path(source: PageKey) -> Tuple[str, str]:
+    if isinstance(source, PageRef):
+        return source.key, source.path
+    return source, source
+
+
+def _read_scaled(source: PageKey, top: int) -> Tuple[QtCore.QSize, QtGui.QImage]:
+    """
+    source を長辺 top 以下で読む。戻り値: (元画像のサイズ（不明なら無効な QSize）, QImage)
+    """
+    if isinstance(source, PageRef) and source.kind != "image":
+        # 複数ページ文書は目的のページだけを縮小して復号する
+        return QtCore.QSize(), ndarray_to_qimage(load_page_thumbnail(source, top))
+
+    path = source.path if isinstance(source, PageRef) else source
+    reader = QtGui.QImageReader(path)
+    full = reader.size()
+
+    if full.isValid() and max(full.width(), full.height()) > top:
+        reader.setScaledSize(full.scaled(top, top, QtCore.Qt.KeepAspectRatio))
+
+    return full, reader.read()
+
+
+def render_previews(source: PageKey, sizes=None) -> Tuple[QtCore.QSize, Dict[int, QtGui.QImage]]:
+    """
+    source（パス / PageRef）を最大サイズまで縮小読込みし、各サイズの縮小版を作る（GUI スレッド以外で呼べる）。
+    戻り値: (元画像のサイズ, {長辺: QImage})。読めなければ空の dict。
+    """
+    sizes = sorted(int(s) for s in (sizes or C.PREVIEW_SIZES))
+
+    full, img = _read_scaled(source, sizes[-1])
+    if img.isNull():
+        return full, {}
+
+    if not full.isValid():
+        full = img.size()
+
+    out: Dict[int, QtGui.QImage] = {}
+    src = img
+    # 大きい方から順に縮小（毎回フル解像度から縮めない）
+    for s in reversed(sizes):
+        if max(src.width(), src.height()) > s:
+            src = src.scaled(s, s, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        out[s] = src
+
+    return full, out
+
+
+class PreviewRenderer(QtCore.QThread):
+    """
+    request(pages) で渡された順に縮小版を作り、sig_ready(パス / PageRef, 元サイズ, {長辺: QImage}) で返す。
+    新しい request が来たら未着手の分は捨てる（選択を素早く移動したときに古い分を作らない）。
+    """
+
+    sig_ready = QtCore.pyqtSignal(object, QtCore.QSize, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending: List[PageKey] = []
+        self._cond = threading.Condition()
+        self._stop = False
+
+    def request(self, pages: List[PageKey]) -> None:
+        with self._cond:
+            self._pending = [p for p in pages if p]
+            self._cond.notify()
+
+        if not self.isRunning():
+            self.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._pending = []
+            self._cond.notify()
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                source = self._pending.pop(0)
+
+            try:
+                full, images = render_previews(source)
+            except Exception:
+                full, images = QtCore.QSize(), {}
+
+            self.sig_ready.emit(source, full, images)
+
+
+class PreviewCache:
+    """
+    キー -> (ファイル署名, 元サイズ, {長辺: QPixmap})。GUI スレッドからのみ使う。
+    各メソッドはパス / PageRef を受け取る。
+    読めなかったページはファイル署名と一緒に覚え、ファイルが変わるまで has() は True を返す
+    （消えた・移動した・壊れたファイルを作らせ続けない）。
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        if max_bytes is None:
+            max_bytes = int(float(C.PREVIEW_CACHE_MAX_MB) * 1024 * 1024)
+
+        self._max_bytes = max(0, int(max_bytes))
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        # キー -> 読めなかったときのファイル署名
+        self._failed: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+
+    def has(self, source: PageKey) -> bool:
+        """
+        縮小版がある、または今のファイルが読めないと分かっていれば True。
+        """
+        key, path = _key_path(source)
+        sig = _file_sig(path)
+
+        hit = self._items.get(key)
+        if hit is not None and hit[0] == sig:
+            return True
+
+        return self._failed.get(key) == sig
+
+    def put(self, source: PageKey, full: QtCore.QSize, images: Dict[int, QtGui.QImage]) -> None:
+        """
+        images が空なら読めなかったものとして記録する。
+        """
+        key, path = _key_path(source)
+        self.discard(key)
+        if not images:
+            self._failed[key] = _file_sig(path)
+            while len(self._failed) > _MAX_FAILED:
+                self._failed.popitem(last=False)
+            return
+
+        pixmaps = {s: QtGui.QPixmap.fromImage(img) for s, img in images.items()}
+        size = sum(img.sizeInBytes() for img in images.values())
+
+        self._items[key] = (_file_sig(path), QtCore.QSize(full), pixmaps, size)
+        self._bytes += size
+
+        while self._bytes > self._max_bytes and len(self._items) > 1:
+            _, old = self._items.popitem(last=False)
+            self._bytes -= old[3]
+
+    def pixmap_for(self, source: PageKey, target: QtCore.QSize) -> Optional[QtGui.QPixmap]:
+        """
+        target に収まるよう縮小した QPixmap。無ければ None。
+        表示サイズ以上で最小の縮小版から縮めるので、拡大表示でぼやけることもない。
+        """
+        key, path = _key_path(source)
+        hit = self._items.get(key)
+        if hit is None or hit[0] != _file_sig(path):
+            return None
+
+        self._items.move_to_end(key)
+        _, full, pixmaps, _ = hit
+
+        fw, fh = max(1, full.width()), max(1, full.height())
+        fit = min(target.width() / float(fw), target.height() / float(fh))
+        need = max(fw, fh) * fit
+
+        sizes = sorted(pixmaps.keys())
+        pick = sizes[-1]
+        for s in sizes:
+            if s >= need:
+                pick = s
+                break
+
+        return pixmaps[pick].scaled(target, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+    def discard(self, source: PageKey) -> None:
+        key = _key_path(source)[0]
+        self._failed.pop(key, None)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old[3]
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._failed.clear()
+        self._bytes = 0